@@ -0,0 +1,208 @@
+# benchmarks/bench.py
+"""
+Microbenchmarks for the jersey compiler. Standard library only.
+
+    python -m benchmarks.bench                          # run everything, print a table
+    python -m benchmarks.bench --out baseline.json      # ... and save a baseline
+    python -m benchmarks.bench --compare baseline.json  # flag regressions vs a baseline
+    python -m benchmarks.bench --filter checker --quick
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.semantic.checks import validate_jersey, JerseySpec, TextPlacement
+from src.interpreter.svg import render_svg, _pattern_layer, clip_region, RenderOptions
+
+EXAMPLE = (ROOT / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+# (small, typical, worst) arguments per pattern, picked from the limits in
+# src/semantic/checks.py: "small" is the cheapest legal input, "worst" the densest.
+# Extra keys cover variants of a pattern (camo's "blocks" engine).
+PATTERN_CASES: Dict[str, Dict[str, list]] = {
+    "stripes":       {"small": [1, 2],          "typical": [6, 20],        "worst": [50, 120]},
+    "hoops":         {"small": [1, 2],          "typical": [6, 20],        "worst": [50, 120]},
+    "sash":          {"small": [0, 10],         "typical": [30, 80],       "worst": [85, 200]},
+    "checker":       {"small": [200, 200],      "typical": [10, 10],       "worst": [5, 5]},
+    "gradient":      {"small": ["down", 10],    "typical": ["down", 70],   "worst": ["center", 200]},
+    "brush":         {"small": [200, 5],        "typical": [50, 15],       "worst": [1, 200]},
+    "waves":         {"small": [200, 100],      "typical": [10, 40],       "worst": [2, 1]},
+    "camo":          {"small": [100, 0],        "typical": [12, 50],       "worst": [1, 100],
+                      "worst_blocks": [1, 100, "blocks"]},
+    "halftone_dots": {"small": [100, 100],      "typical": [6, 12],        "worst": [1, 1]},
+    "topo":          {"small": [1, 100],        "typical": [12, 18],       "worst": [100, 1]},
+    "half_split":    {"small": ["vertical", 50], "typical": ["vertical", 50], "worst": ["horizontal", 1]},
+}
+
+
+def spec_with_pattern(ident: str, args: list) -> JerseySpec:
+    return JerseySpec(
+        team=TextPlacement(text="Bench FC", x=365, y=190, size=18),
+        player=TextPlacement(text="BENCH", x=365, y=85, size=24),
+        number=TextPlacement(text=10, x=365, y=155, size=75),
+        sponsor=TextPlacement(text="NOVA", x=115, y=125, size=30),
+        primary="#0B3D91", secondary="#FFFFFF", tertiary="#FFFFFF", pattern_color="#1A1A1A",
+        font="Arial", pattern=(ident, list(args)),
+    )
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], Any]
+
+
+def build_cases() -> List[Case]:
+    """
+    Every benchmark, each a zero-argument callable.
+    """
+    toks = Lexer(EXAMPLE).tokens()
+    ast = Parser(toks).parse()
+    spec = validate_jersey(Parser(Lexer(EXAMPLE).tokens()).parse())
+    opts = RenderOptions(show_debug=False)
+    front = clip_region("frontJerseyClip")
+
+    cases = [
+        Case("lexer.tokens", lambda: Lexer(EXAMPLE).tokens()),
+        Case("parser.parse", lambda: Parser(toks).parse()),
+        Case("validate_jersey", lambda: validate_jersey(ast)),
+        Case("render_svg", lambda: render_svg(spec, opts)),
+    ]
+    for ident, sizes in PATTERN_CASES.items():
+        for size, args in sizes.items():
+            pspec = spec_with_pattern(ident, args)
+            # one side's copy, as the front layer draws it
+            cases.append(Case(f"pattern.{ident}.{size}", lambda s=pspec: _pattern_layer(s, s.primary, s.pattern_color, region=front)))
+    return cases
+
+
+def _output_bytes(result: Any) -> int | None:
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return None
+
+
+def measure(case: Case, min_time: float = 0.2, rounds: int = 3) -> dict:
+    """
+    ops/sec (best of `rounds`, each running at least `min_time` seconds),
+    output bytes and peak traced memory of a single call.
+    """
+    result = case.fn()  # warm-up (font cache, regex compilation)
+
+    # calibrate: grow the loop count until one batch takes a noticeable time
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            case.fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time / 4 or loops >= 1 << 20:
+            break
+        loops *= 4
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+
+    best = float("inf")  # seconds per call
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            case.fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        case.fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    return {"ops_per_sec": 1.0 / best if best > 0 else float("inf"), "bytes": _output_bytes(result), "peak_bytes": peak}
+
+
+def run(cases: List[Case], min_time: float, rounds: int, out=sys.stdout) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    out.write(f"{'benchmark':<34} {'ops/sec':>12} {'bytes':>11} {'peak KiB':>10}\n")
+    for case in cases:
+        r = results[case.name] = measure(case, min_time=min_time, rounds=rounds)
+        size = "-" if r["bytes"] is None else str(r["bytes"])
+        out.write(f"{case.name:<34} {r['ops_per_sec']:>12.1f} {size:>11} {r['peak_bytes'] / 1024:>10.1f}\n")
+        out.flush()
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, out=sys.stdout) -> List[str]:
+    """
+    Report changes vs a baseline; returns the names of regressed benchmarks.
+    A regression is ops/sec dropping, or bytes / peak memory growing, by more than `threshold`.
+    """
+    regressions = []
+    out.write(f"\n{'benchmark':<34} {'ops/sec':>9} {'bytes':>9} {'peak':>9}\n")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            out.write(f"{name:<34} {'(new)':>9}\n")
+            continue
+        speed = r["ops_per_sec"] / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        size = (r["bytes"] / base["bytes"] - 1) if r["bytes"] and base.get("bytes") else 0.0
+        peak = (r["peak_bytes"] / base["peak_bytes"] - 1) if base.get("peak_bytes") else 0.0
+        bad = speed < -threshold or size > threshold or peak > threshold
+        if bad:
+            regressions.append(name)
+        flag = "  REGRESSION" if bad else ""
+        out.write(f"{name:<34} {speed:>+9.1%} {size:>+9.1%} {peak:>+9.1%}{flag}\n")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench", description="Jersey compiler microbenchmarks")
+    ap.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round (default: 0.2)")
+    ap.add_argument("--rounds", type=int, default=3, help="timing rounds, best is kept (default: 3)")
+    ap.add_argument("--quick", action="store_true", help="short rounds, for a smoke run")
+    ap.add_argument("--out", help="write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="BASELINE", help="compare against a JSON baseline; exit 1 on regressions")
+    ap.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression (default: 0.15)")
+    args = ap.parse_args(argv)
+
+    if args.quick:
+        args.min_time, args.rounds = 0.02, 1
+    cases = [c for c in build_cases() if args.filter in c.name]
+    results = run(cases, min_time=args.min_time, rounds=args.rounds)
+
+    if args.out:
+        doc = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
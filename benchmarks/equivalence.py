@@ -0,0 +1,518 @@
+# benchmarks/equivalence.py
+"""
+Differential check of the SVG renderer: a frozen reference against a candidate,
+over a corpus of sampled designs. Standard library only.
+
+    python -m benchmarks.equivalence                              # working tree vs HEAD
+    python -m benchmarks.equivalence --reference v1.2 --count 2000 --seed 7
+    python -m benchmarks.equivalence --candidate mypkg.fast:render --tolerance 0.05
+
+The reference is the renderer as committed at `--reference` (a git revision): its
+`src/` is extracted to a temporary directory and imported as a separate package, so
+it stays fixed while the working tree changes. Outputs are compared as parsed XML:
+same elements in the same order, same attributes, numbers equal within `--tolerance`.
+Inside a jersey clip group the candidate may leave out elements of the reference that
+the clip hides entirely (pattern culling), as judged by an independent geometric check
+against the reference's own <clipPath> outline; `--strict` turns that allowance off.
+Every candidate render is repeated with a different global RNG state and must come out
+byte-identical. The first differing element of each design is reported.
+"""
+import argparse
+import importlib
+import io
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.semantic.checks import validate_jersey, JerseySpec
+from src.interpreter.cost import estimate_cost
+from src.interpreter.svg import render_svg
+from src.sampler import Sampler, SamplerConfig, parse_weights
+
+REFERENCE_PACKAGE = "jersey_reference"
+
+# candidate renderers by name; each takes a validated JerseySpec and returns SVG text
+CANDIDATES: Dict[str, Callable[[JerseySpec], str]] = {
+    "current": lambda spec: render_svg(spec),
+}
+
+# attributes that legitimately differ between equivalent renders
+IGNORED_ATTRS = {"data-hash"}
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+_CLIP_URL = re.compile(r"url\(#([^)]+)\)")
+
+
+# --- reference ---
+def load_reference(rev: str, workdir: Path) -> Callable[[str], str]:
+    """
+    Extract `src/` (and the font it embeds) at git revision `rev` into `workdir`
+    and return its source -> SVG compile function.
+    """
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev, "src", "web/static/fonts"],
+        cwd=ROOT, capture_output=True, check=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(workdir)
+    (workdir / "src").rename(workdir / REFERENCE_PACKAGE)  # src/ only uses relative imports
+    sys.path.insert(0, str(workdir))
+
+    lexer = importlib.import_module(f"{REFERENCE_PACKAGE}.lexer.tokenizer")
+    parser = importlib.import_module(f"{REFERENCE_PACKAGE}.parser.parser")
+    checks = importlib.import_module(f"{REFERENCE_PACKAGE}.semantic.checks")
+    svg = importlib.import_module(f"{REFERENCE_PACKAGE}.interpreter.svg")
+
+    def compile_reference(source: str) -> str:
+        return svg.render_svg(checks.validate_jersey(parser.Parser(lexer.Lexer(source).tokens()).parse()))
+    return compile_reference
+
+
+def load_candidate(name: str) -> Callable[[JerseySpec], str]:
+    """
+    A name from CANDIDATES, or "package.module:function".
+    """
+    if name in CANDIDATES:
+        return CANDIDATES[name]
+    module, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"unknown candidate {name!r} (known: {', '.join(CANDIDATES)}, or module:function)")
+    return getattr(importlib.import_module(module), attr)
+
+
+# --- comparison ---
+@dataclass
+class Difference:
+    path: str       # e.g. svg/g[3]#layer-pattern-front/rect[12]
+    what: str       # human-readable description
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.what}"
+
+
+def _values_equal(a: str, b: str, tol: float) -> bool:
+    """
+    Attribute values are equal when their non-numeric parts match exactly and
+    every number differs by at most `tol` (handles x="1.5", d="M 0 0 L ..." alike).
+    """
+    if a == b:
+        return True
+    na, nb = _NUMBER.findall(a), _NUMBER.findall(b)
+    if len(na) != len(nb) or _NUMBER.sub("#", a) != _NUMBER.sub("#", b):
+        return False
+    return all(abs(float(x) - float(y)) <= tol for x, y in zip(na, nb))
+
+
+def _label(el: ET.Element, index: int) -> str:
+    tag = el.tag.rsplit("}", 1)[-1]
+    ident = el.get("id")
+    return f"{tag}[{index}]" + (f"#{ident}" if ident else "")
+
+
+def _describe(el: ET.Element) -> str:
+    tag = el.tag.rsplit("}", 1)[-1]
+    attrs = " ".join(f'{k}="{v[:40]}"' for k, v in el.attrib.items() if k not in IGNORED_ATTRS)
+    return f"<{tag} {attrs}>".replace(" >", ">")
+
+
+def _points(el: ET.Element) -> list[tuple[float, float]] | None:
+    """
+    Vertices of a polyline path (M/L/Z commands only), or None for any other path.
+    """
+    d = el.get("d", "")
+    if re.search(r"[^MLZ\d\s,.\-]", d):
+        return None
+    nums = [float(n) for n in _NUMBER.findall(d)]
+    return list(zip(nums[0::2], nums[1::2])) or None
+
+
+# --- clip oracle ---
+# Culled elements are checked against the reference's own <clipPath> outlines, flattened
+# finely and tested geometrically. Nothing here shares code with src/interpreter/geometry.py,
+# so a bug in the renderer's ClipRegion cannot vouch for itself.
+_ORACLE_TOKEN = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+ORACLE_STEPS = 64   # segments per cubic curve
+ORACLE_BAND = 8.0   # height of the y-bands edges are indexed by
+ORACLE_EPS = 0.05   # distances this small count as touching
+
+
+def _flatten(d: str) -> list[list[tuple[float, float]]]:
+    """
+    Polygons of an absolute or relative M/L/H/V/C/Z path.
+    """
+    tokens = _ORACLE_TOKEN.findall(d)
+    polys: list[list[tuple[float, float]]] = []
+    poly: list[tuple[float, float]] = []
+    x = y = sx = sy = 0.0
+    cmd, i = "", 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+            if cmd in "Zz":
+                if poly:
+                    polys.append(poly)
+                poly, (x, y) = [], (sx, sy)
+                continue
+        n = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6}[cmd.upper()]
+        v = [float(t) for t in tokens[i:i + n]]
+        i += n
+        ox, oy = (x, y) if cmd.islower() else (0.0, 0.0)
+        up = cmd.upper()
+        if up == "M":
+            if poly:
+                polys.append(poly)
+            x, y = sx, sy = ox + v[0], oy + v[1]
+            poly = [(x, y)]
+            cmd = "l" if cmd == "m" else "L"
+        elif up == "L":
+            x, y = ox + v[0], oy + v[1]
+            poly.append((x, y))
+        elif up == "H":
+            x = (x if cmd == "h" else 0.0) + v[0]
+            poly.append((x, y))
+        elif up == "V":
+            y = (y if cmd == "v" else 0.0) + v[0]
+            poly.append((x, y))
+        else:
+            p0, p1, p2, p3 = (x, y), (ox + v[0], oy + v[1]), (ox + v[2], oy + v[3]), (ox + v[4], oy + v[5])
+            for k in range(1, ORACLE_STEPS + 1):
+                t = k / ORACLE_STEPS
+                u = 1 - t
+                poly.append(tuple(u ** 3 * a + 3 * u * u * t * b + 3 * u * t * t * c + t ** 3 * e
+                                  for a, b, c, e in zip(p0, p1, p2, p3)))
+            x, y = p3
+    if poly:
+        polys.append(poly)
+    return polys
+
+
+def _seg_dist(p, q, a, b) -> float:
+    """
+    Distance between segments p-q and a-b (0 when they cross).
+    """
+    def cross(o, s, t):
+        return (s[0] - o[0]) * (t[1] - o[1]) - (s[1] - o[1]) * (t[0] - o[0])
+
+    d1, d2, d3, d4 = cross(a, b, p), cross(a, b, q), cross(p, q, a), cross(p, q, b)
+    if ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)):
+        return 0.0
+
+    def point_seg(c, s, t):
+        dx, dy = t[0] - s[0], t[1] - s[1]
+        length = dx * dx + dy * dy
+        k = 0.0 if length == 0 else max(0.0, min(1.0, ((c[0] - s[0]) * dx + (c[1] - s[1]) * dy) / length))
+        return ((c[0] - s[0] - k * dx) ** 2 + (c[1] - s[1] - k * dy) ** 2) ** 0.5
+
+    return min(point_seg(p, a, b), point_seg(q, a, b), point_seg(a, p, q), point_seg(b, p, q))
+
+
+class ClipOracle:
+    """
+    A clip outline as fine polygons, answering "does this shape overlap the clipped area?".
+    """
+
+    def __init__(self, d: str):
+        self.edges = [(poly[k - 1], poly[k]) for poly in _flatten(d) for k in range(len(poly))]
+        xs = [x for edge in self.edges for x, _ in edge]
+        ys = [y for edge in self.edges for _, y in edge]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.bands: dict[int, list] = {}
+        for edge in self.edges:
+            (_, ay), (_, by) = edge
+            for band in range(int(min(ay, by) // ORACLE_BAND), int(max(ay, by) // ORACLE_BAND) + 1):
+                self.bands.setdefault(band, []).append(edge)
+
+    def _near_edges(self, y0: float, y1: float) -> list:
+        found = {}
+        for band in range(int(y0 // ORACLE_BAND) - 1, int(y1 // ORACLE_BAND) + 2):
+            for edge in self.bands.get(band, ()):
+                found[id(edge)] = edge
+        return list(found.values())
+
+    def inside(self, x: float, y: float) -> bool:
+        """
+        Nonzero winding test, like SVG's default clip-rule.
+        """
+        winding = 0
+        for (ax, ay), (bx, by) in self._near_edges(y, y):
+            if (ay <= y) != (by <= y) and ax + (y - ay) * (bx - ax) / (by - ay) > x:
+                winding += 1 if by > ay else -1
+        return winding != 0
+
+    def touches(self, outline: list[tuple[float, float]], pad: float = 0.0, filled: bool = True) -> bool:
+        """
+        Whether a shape reaches into the clipped area. The shape is a closed polygon when
+        `filled`, else an open polyline; either is grown by `pad` (a stroke's half width).
+        """
+        xs, ys = [x for x, _ in outline], [y for _, y in outline]
+        x0, y0, x1, y1 = self.bbox
+        if max(xs) + pad < x0 or min(xs) - pad > x1 or max(ys) + pad < y0 or min(ys) - pad > y1:
+            return False
+        if self.inside(*outline[0]):
+            return True
+        segments = list(zip(outline, outline[1:])) + ([(outline[-1], outline[0])] if filled else [])
+        segments = segments or [(outline[0], outline[0])]  # a single point (circle center)
+        near = self._near_edges(min(ys) - pad, max(ys) + pad)
+        if any(_seg_dist(p, q, a, b) <= pad + ORACLE_EPS for p, q in segments for a, b in near):
+            return True
+        # a filled shape may still hold the whole outline
+        return filled and any(_inside_polygon(outline, ex, ey) for (ex, ey), _ in near)
+
+
+def _inside_polygon(poly: list[tuple[float, float]], x: float, y: float) -> bool:
+    inside = False
+    for (ax, ay), (bx, by) in zip(poly, poly[1:] + poly[:1]):
+        if (ay <= y) != (by <= y) and ax + (y - ay) * (bx - ax) / (by - ay) > x:
+            inside = not inside
+    return inside
+
+
+def clip_oracles(root: ET.Element) -> Dict[str, ClipOracle]:
+    """
+    An oracle for every <clipPath> of a rendered document that holds a single path.
+    """
+    oracles = {}
+    for el in root.iter():
+        if el.tag.rsplit("}", 1)[-1] == "clipPath" and el.get("id"):
+            paths = [p for p in el if p.tag.rsplit("}", 1)[-1] == "path" and not p.get("transform")]
+            if len(paths) == 1 and len(el) == 1:
+                oracles[el.get("id")] = ClipOracle(paths[0].get("d", ""))
+    return oracles
+
+
+def _hidden(el: ET.Element, clip: ClipOracle | None) -> bool:
+    """
+    Whether `el` (a rect, circle or polyline path) lies entirely outside the jersey
+    clip outline, so the candidate may leave it out.
+    """
+    if clip is None or el.get("transform"):
+        return False
+    tag = el.tag.rsplit("}", 1)[-1]
+    try:
+        if tag == "rect":
+            x, y = float(el.get("x", 0)), float(el.get("y", 0))
+            w, h = float(el.get("width")), float(el.get("height"))
+            return not clip.touches([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+        if tag == "circle":
+            cx, cy, r = float(el.get("cx")), float(el.get("cy")), float(el.get("r"))
+            return not clip.touches([(cx, cy)], pad=r, filled=False)
+        if tag == "path" and el.get("fill") == "none":
+            # an unfilled path is hidden when its stroke is
+            pts = _points(el)
+            if pts is None:
+                return False
+            if el.get("d").rstrip().endswith("Z"):
+                pts = pts + pts[:1]
+            return not clip.touches(pts, pad=float(el.get("stroke-width", 1)) / 2, filled=False)
+    except (TypeError, ValueError):
+        pass
+    return False
+
+
+def _trimmed(a: ET.Element, b: ET.Element, clip: ClipOracle | None, tol: float) -> bool:
+    """
+    Whether candidate path `b` is reference path `a` with hidden segments cut off its ends.
+    """
+    if clip is None or a.get("fill") != "none":
+        return False
+    pts_a, pts_b = _points(a), _points(b)
+    if not pts_a or not pts_b:
+        return False
+    for k in range(len(pts_a) - len(pts_b) + 1):
+        run = pts_a[k:k + len(pts_b)]
+        if all(abs(p - q) <= tol for pa, pb in zip(run, pts_b) for p, q in zip(pa, pb)):
+            break
+    else:
+        return False
+    pad = float(a.get("stroke-width", 1)) / 2
+    head, tail = pts_a[:k + 1], pts_a[k + len(pts_b) - 1:]
+    return all(len(part) < 2 or not clip.touches(part, pad=pad, filled=False) for part in (head, tail))
+
+
+def compare_elements(a: ET.Element, b: ET.Element, tol: float, path: str = "",
+                     clip: ClipOracle | None = None, strict: bool = False,
+                     clips: Dict[str, ClipOracle] | None = None) -> Difference | None:
+    """
+    First difference between two element trees (reference `a`, candidate `b`), or None.
+    Unless `strict`, reference children hidden by the enclosing clip (one of `clips`,
+    by id) may be missing.
+    """
+    here = path or _label(a, 0)
+    url = _CLIP_URL.match(a.get("clip-path", ""))
+    if url:
+        clip = (clips or {}).get(url.group(1))
+    if a.tag != b.tag:
+        return Difference(here, f"element {_describe(a)} became {_describe(b)}")
+
+    keys_a = set(a.attrib) - IGNORED_ATTRS
+    keys_b = set(b.attrib) - IGNORED_ATTRS
+    if keys_a != keys_b:
+        missing, extra = sorted(keys_a - keys_b), sorted(keys_b - keys_a)
+        return Difference(here, f"attributes differ (missing {missing}, extra {extra})")
+    for key in sorted(keys_a):
+        if key == "d" and not strict and _trimmed(a, b, clip, tol):
+            continue
+        if not _values_equal(a.get(key), b.get(key), tol):
+            return Difference(here, f'{key}="{a.get(key)[:80]}" became "{b.get(key)[:80]}"')
+
+    if (a.text or "").strip() != (b.text or "").strip():
+        return Difference(here, f"text {(a.text or '').strip()[:60]!r} became {(b.text or '').strip()[:60]!r}")
+
+    kids_a, kids_b = list(a), list(b)
+    i = j = 0
+    while i < len(kids_a) and j < len(kids_b):
+        diff = compare_elements(kids_a[i], kids_b[j], tol, f"{here}/{_label(kids_a[i], i)}", clip, strict, clips)
+        if diff is None:
+            j += 1
+        elif strict or not _hidden(kids_a[i], clip):
+            return diff
+        i += 1
+    if not strict:
+        while i < len(kids_a) and _hidden(kids_a[i], clip):
+            i += 1
+    if i < len(kids_a):
+        first = kids_a[i]
+        return Difference(f"{here}/{_label(first, i)}",
+                          f"missing in candidate ({len(kids_a) - i} more in reference): {_describe(first)}")
+    if j < len(kids_b):
+        first = kids_b[j]
+        return Difference(f"{here}/{_label(first, j)}",
+                          f"extra in candidate ({len(kids_b) - j} more children): {_describe(first)}")
+    return None
+
+
+def compare_svg(reference: str, candidate: str, tol: float, strict: bool = False) -> Difference | None:
+    try:
+        ref_root = ET.fromstring(reference)
+    except ET.ParseError as e:
+        return Difference("reference", f"not well-formed XML: {e}")
+    try:
+        cand_root = ET.fromstring(candidate)
+    except ET.ParseError as e:
+        return Difference("candidate", f"not well-formed XML: {e}")
+    clips = None if strict else clip_oracles(ref_root)
+    return compare_elements(ref_root, cand_root, tol, strict=strict, clips=clips)
+
+
+# --- corpus ---
+def corpus(count: int, seed: int, max_elements: int, patterns: str | None = None) -> Iterator[tuple[int, str]]:
+    """
+    (index, source) for sampled designs small enough to render quickly.
+    `patterns` restricts the sampler, e.g. "camo=0" after an intended change to camo.
+    """
+    config = SamplerConfig(patterns={**SamplerConfig().patterns, **parse_weights(patterns)}) if patterns else None
+    sampler = Sampler(seed=seed, config=config)
+    i = 0
+    produced = 0
+    while produced < count:
+        spec = sampler.spec(i)
+        if estimate_cost(spec).elements <= max_elements:
+            yield i, sampler.dsl(i)
+            produced += 1
+        i += 1
+
+
+def run(reference: Callable[[str], str], candidate: Callable[[JerseySpec], str], count: int, seed: int,
+        tol: float, max_elements: int, show: int = 5, strict: bool = False, patterns: str | None = None,
+        out=sys.stdout) -> int:
+    """
+    Compare every design in the corpus; returns the number of designs that differ or fail.
+    """
+    failures = 0
+    ref_time = cand_time = 0.0
+    ref_bytes = cand_bytes = 0
+    for i, source in corpus(count, seed, max_elements, patterns):
+        try:
+            random.seed(i)  # references from before topo was seeded draw from the global RNG
+            t0 = time.perf_counter()
+            ref_svg = reference(source)
+            ref_time += time.perf_counter() - t0
+            ref_bytes += len(ref_svg)
+        except Exception as e:
+            failures += 1
+            if failures <= show:
+                out.write(f"design {i}: reference failed: {type(e).__name__}: {e}\n")
+            continue
+        try:
+            random.seed(i)
+            spec = validate_jersey(Parser(Lexer(source).tokens()).parse())
+            t0 = time.perf_counter()
+            cand_svg = candidate(spec)
+            cand_time += time.perf_counter() - t0
+            cand_bytes += len(cand_svg)
+            diff = compare_svg(ref_svg, cand_svg, tol, strict)
+            # equal specs must render identically, whatever the global RNG state
+            random.seed(i + 1)
+            if diff is None and candidate(spec) != cand_svg:
+                diff = Difference("candidate", "not deterministic: a second render of the same spec differs")
+        except Exception as e:
+            diff = Difference("candidate", f"failed: {type(e).__name__}: {e}")
+        if diff is None:
+            continue
+        failures += 1
+        if failures <= show:
+            pattern = next((line.strip() for line in source.splitlines() if "pattern:" in line), "no pattern")
+            out.write(f"design {i} ({pattern}) differs at {diff}\n")
+
+    speedup = ref_time / cand_time if cand_time else float("inf")
+    out.write(
+        f"\n{count - failures}/{count} designs equivalent (seed {seed}, tolerance {tol}). "
+        f"Render time: reference {ref_time:.2f}s, candidate {cand_time:.2f}s ({speedup:.2f}x). "
+        f"Output: reference {ref_bytes / 1024:.0f} KiB, candidate {cand_bytes / 1024:.0f} KiB.\n"
+    )
+    return failures
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.equivalence",
+                                 description="Compare a candidate renderer against a frozen reference")
+    ap.add_argument("--reference", default="HEAD", metavar="REV", help="git revision of the reference renderer (default: HEAD)")
+    ap.add_argument("--candidate", default="current",
+                    help=f"renderer under test: {', '.join(CANDIDATES)} or module:function (default: current)")
+    ap.add_argument("--count", type=int, default=300, help="designs to compare (default: 300)")
+    ap.add_argument("--seed", type=int, default=0, help="sampler seed (default: 0)")
+    ap.add_argument("--tolerance", type=float, default=0.01, help="max difference between numbers (default: 0.01)")
+    ap.add_argument("--max-elements", type=int, default=20_000,
+                    help="skip designs estimated above this many elements (default: 20000)")
+    ap.add_argument("--show", type=int, default=5, help="differences to print (default: 5)")
+    ap.add_argument("--patterns", metavar="WEIGHTS",
+                    help='sampler pattern weights over the defaults, e.g. "camo=0" to leave camo out')
+    ap.add_argument("--strict", action="store_true", help="do not allow the candidate to cull elements hidden by the clip")
+    args = ap.parse_args(argv)
+
+    try:
+        candidate = load_candidate(args.candidate)
+    except (ValueError, ImportError, AttributeError) as e:
+        ap.error(str(e))
+
+    workdir = Path(tempfile.mkdtemp(prefix="jersey-reference-"))
+    try:
+        try:
+            reference = load_reference(args.reference, workdir)
+        except subprocess.CalledProcessError as e:
+            ap.error(f"cannot read revision {args.reference!r}: {e.stderr.decode(errors='replace').strip()}")
+        failures = run(reference, candidate, args.count, args.seed, args.tolerance, args.max_elements, args.show, args.strict,
+                       args.patterns)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
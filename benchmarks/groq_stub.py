@@ -0,0 +1,210 @@
+# benchmarks/groq_stub.py
+"""
+A local HTTP server speaking the Groq (OpenAI-compatible) chat completions API,
+with configurable latency and failures, for load tests that must not hit the real provider.
+
+    python -m benchmarks.groq_stub --port 8900 --latency lognormal:0.8,0.5 --failure-rate 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8900 GROQ_API_KEY=stub gunicorn -w 4 wsgi:app
+
+Unlike AI_BACKEND=stub (an in-process client), requests go through the real Groq SDK,
+so its HTTP client, timeouts and error mapping are part of what gets measured.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from web.ai_stub import STUB_DESIGN, parse_latency
+
+
+class GroqStub(ThreadingHTTPServer):
+    """
+    Answers POST .../chat/completions (plain and stream=true) with a fixed design.
+    Each call draws its latency from `latency`; `failure_rate` of calls get a 503
+    and `rate_limit_rate` a 429, which the SDK maps to InternalServerError / RateLimitError.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float | Callable[[], float] = 0.0,
+        failure_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        design: dict | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.content = json.dumps(design or STUB_DESIGN)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> tuple[float, int]:
+        """
+        (delay, status) for one call.
+        """
+        with self.lock:
+            self.calls += 1
+            delay = self.latency() if callable(self.latency) else self.latency
+            r = self.rng.random()
+            status = 503 if r < self.failure_rate else 429 if r < self.failure_rate + self.rate_limit_rate else 200
+            if status != 200:
+                self.failures += 1
+        return max(0.0, delay), status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            req = {}
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+            return
+
+        server: GroqStub = self.server
+        delay, status = server.draw()
+        model = req.get("model", "stub")
+        try:
+            if req.get("stream"):
+                self._stream(server.content, model, delay, status)
+                return
+            time.sleep(delay)
+            if status == 429:
+                self._json(429, {"error": {"message": "stub rate limit", "type": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            elif status != 200:
+                self._json(status, {"error": {"message": "stub upstream unavailable", "type": "server_error"}})
+            else:
+                self._json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (its timeout was shorter than our delay)
+
+    def _stream(self, content: str, model: str, delay: float, status: int, chunk_size: int = 24):
+        """
+        SSE reply in chunked encoding; a quarter of the delay passes before the first chunk.
+        A failing call returns its error status up front, like the real API.
+        """
+        time.sleep(delay * 0.25)
+        if status != 200:
+            self._json(status, {"error": {"message": "stub upstream unavailable", "type": "server_error"}})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        cid = f"chatcmpl-{uuid.uuid4().hex}"
+        pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        gap = delay * 0.75 / max(1, len(pieces))
+        for i, text in enumerate(pieces + [None]):
+            if text is None:
+                event = "data: [DONE]\n\n"
+            else:
+                event = "data: " + json.dumps({
+                    "id": cid,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": text},
+                        "finish_reason": "stop" if i == len(pieces) - 1 else None,
+                    }],
+                }) + "\n\n"
+            data = event.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+            if text is not None and gap:
+                time.sleep(gap)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve_in_background(port: int = 0, **kwargs) -> GroqStub:
+    """
+    Start a stub on 127.0.0.1 (port 0 picks a free one) in a daemon thread.
+    """
+    server = GroqStub(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="groq-stub", daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.groq_stub", description="Local Groq API stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--latency", default="lognormal:0.8,0.5",
+                    help="seconds, or fixed:S / uniform:LO,HI / normal:MEAN,SD / lognormal:MEDIAN,SIGMA")
+    ap.add_argument("--failure-rate", type=float, default=0.0, help="share of calls answered with 503")
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with 429")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    server = GroqStub(
+        (args.host, args.port),
+        latency=parse_latency(args.latency, rng),
+        failure_rate=args.failure_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print(f"Groq stub listening on {server.url} (set GROQ_BASE_URL={server.url} GROQ_API_KEY=stub)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+# benchmarks/loadtest.py
+"""
+Closed-loop HTTP load generator for the web app. Standard library only.
+
+    # against a running server
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 30 --mix render=9,ai=1
+
+    # start a Groq stub and the server under test, then load it
+    python -m benchmarks.loadtest --stub-latency lognormal:0.8,0.5 \\
+        --spawn "gunicorn -w 4 -k gthread --threads 8 -b 127.0.0.1:8000 wsgi:app"
+
+Each of `--concurrency` workers sends one request at a time, picking the route by the
+`--mix` weights, for `--duration` seconds (or until `--requests` are done). The report
+gives throughput, p50/p95/p99 latency and error rate per route.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+EXAMPLE = (ROOT / "examples" / "basic.jersey").read_text(encoding="utf-8")
+PROMPTS = [
+    "navy kit with thin white stripes",
+    "red and black hoops, retro feel",
+    "green camo away kit",
+    "gold sash on a white shirt",
+    "dark halftone dots fading to black",
+    "sky blue waves, minimalist",
+]
+
+_FAILED_BODY = re.compile(rb'"ok":\s*false|^event: error', re.MULTILINE)
+
+# route name -> (method, path, streamed response?)
+ROUTES = {
+    "render": ("POST", "/api/render", False),
+    "ai": ("POST", "/api/ai/chat-jersey", False),
+    "ai_stream": ("POST", "/api/ai/chat-jersey", True),
+}
+
+
+def render_body(rng: random.Random, variety: int) -> dict:
+    """
+    One of `variety` distinct sources: fewer distinct sources -> more render cache hits.
+    """
+    n = rng.randrange(variety)
+    return {"source": EXAMPLE.replace('"BEN"', f'"P{n}"', 1)}
+
+
+def ai_body(rng: random.Random, variety: int, stream: bool) -> dict:
+    """
+    One of `variety` distinct prompts: the AI cache is keyed by the normalized prompt.
+    """
+    n = rng.randrange(variety)
+    prompt = PROMPTS[n % len(PROMPTS)] + (f" #{n // len(PROMPTS)}" if n >= len(PROMPTS) else "")
+    return {"prompt": prompt, "stream": stream}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    "render=9,ai=1" -> {"render": 9.0, "ai": 1.0}
+    """
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"unknown route {name!r} in --mix (known: {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("--mix needs at least one route with a positive weight")
+    return mix
+
+
+# --- stats ---
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)  # seconds, successful requests
+    statuses: Dict[str, int] = field(default_factory=dict)  # "200", "503", "error:timeout", ...
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies) + self.errors
+
+    def record(self, status: str, seconds: float, ok: bool):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if ok:
+            self.latencies.append(seconds)
+        else:
+            self.errors += 1
+
+    def merge(self, other: "RouteStats"):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        for k, v in other.statuses.items():
+            self.statuses[k] = self.statuses.get(k, 0) + v
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def summarize(stats: Dict[str, RouteStats], elapsed: float) -> Dict[str, dict]:
+    out = {}
+    total = RouteStats()
+    for name, st in sorted(stats.items()):
+        total.merge(st)
+        out[name] = _summary(st, elapsed)
+    out["all"] = _summary(total, elapsed)
+    return out
+
+def _summary(st: RouteStats, elapsed: float) -> dict:
+    lat = sorted(st.latencies)
+    return {
+        "requests": st.count,
+        "throughput_rps": st.count / elapsed if elapsed else 0.0,
+        "error_rate": st.errors / st.count if st.count else 0.0,
+        "p50_ms": percentile(lat, 50) * 1000,
+        "p95_ms": percentile(lat, 95) * 1000,
+        "p99_ms": percentile(lat, 99) * 1000,
+        "max_ms": (lat[-1] if lat else 0.0) * 1000,
+        "statuses": dict(sorted(st.statuses.items())),
+    }
+
+
+def format_report(summary: Dict[str, dict], elapsed: float, concurrency: int) -> str:
+    lines = [
+        f"{elapsed:.1f}s at concurrency {concurrency}",
+        f"{'route':<10} {'requests':>9} {'req/s':>9} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses",
+    ]
+    for name, s in summary.items():
+        statuses = " ".join(f"{k}:{v}" for k, v in s["statuses"].items())
+        lines.append(
+            f"{name:<10} {s['requests']:>9} {s['throughput_rps']:>9.1f} {s['error_rate']:>8.1%} "
+            f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}  {statuses}"
+        )
+    return "\n".join(lines)
+
+
+# --- workers ---
+class Worker(threading.Thread):
+    """
+    Sends requests one after another over a kept-alive connection.
+    """
+
+    def __init__(self, index: int, target, mix: Dict[str, float], deadline: float, budget: "RequestBudget",
+                 timeout: float, render_variety: int, prompt_variety: int, seed: int):
+        super().__init__(name=f"load-{index}", daemon=True)
+        self.target = target
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.deadline = deadline
+        self.budget = budget
+        self.timeout = timeout
+        self.render_variety = max(1, render_variety)
+        self.prompt_variety = max(1, prompt_variety)
+        self.rng = random.Random(seed * 1000 + index)
+        self.stats: Dict[str, RouteStats] = {n: RouteStats() for n in self.names}
+        self.conn: http.client.HTTPConnection | None = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.target.scheme == "https" else http.client.HTTPConnection
+            self.conn = cls(self.target.hostname, self.target.port, timeout=self.timeout)
+        return self.conn
+
+    def run(self):
+        while time.monotonic() < self.deadline and self.budget.take():
+            name = self.rng.choices(self.names, self.weights)[0]
+            method, path, streamed = ROUTES[name]
+            if name == "render":
+                body = render_body(self.rng, self.render_variety)
+            else:
+                body = ai_body(self.rng, self.prompt_variety, streamed)
+            self.stats[name].record(*self.request(method, self.target.path.rstrip("/") + path, body))
+
+    def request(self, method: str, path: str, body: dict) -> tuple[str, float, bool]:
+        data = json.dumps(body).encode("utf-8")
+        t0 = time.perf_counter()
+        try:
+            conn = self._connect()
+            conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            payload = resp.read()  # a streamed reply counts once it is complete
+            seconds = time.perf_counter() - t0
+        except (OSError, http.client.HTTPException) as e:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+            kind = "timeout" if isinstance(e, TimeoutError) else type(e).__name__
+            return f"error:{kind}", time.perf_counter() - t0, False
+        if resp.will_close:
+            conn.close()
+            self.conn = None
+        # a 200 can still carry a failure (JSON "ok": false, or an SSE error event)
+        ok = 200 <= resp.status < 300 and not _FAILED_BODY.search(payload)
+        return str(resp.status), seconds, ok
+
+
+class RequestBudget:
+    """
+    Shared cap on the number of requests (None = unlimited).
+    """
+
+    def __init__(self, total: int | None):
+        self.left = total
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.left is None:
+            return True
+        with self.lock:
+            if self.left <= 0:
+                return False
+            self.left -= 1
+            return True
+
+
+def run_load(url: str, mix: Dict[str, float], concurrency: int, duration: float, requests: int | None = None,
+             timeout: float = 30.0, render_variety: int = 50, prompt_variety: int = 20, seed: int = 0):
+    """
+    Run the load and return (per-route summary, elapsed seconds).
+    """
+    target = urlsplit(url)
+    deadline = time.monotonic() + duration
+    budget = RequestBudget(requests)
+    workers = [
+        Worker(i, target, mix, deadline, budget, timeout, render_variety, prompt_variety, seed)
+        for i in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+
+    stats: Dict[str, RouteStats] = {}
+    for w in workers:
+        for name, st in w.stats.items():
+            stats.setdefault(name, RouteStats()).merge(st)
+    return summarize(stats, elapsed), elapsed
+
+
+def wait_for(url: str, timeout: float) -> None:
+    """
+    Block until the server answers at all (any status), or raise.
+    """
+    target = urlsplit(url)
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection(target.hostname, target.port, timeout=1.0)
+            conn.request("GET", "/metrics")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            if time.monotonic() > end:
+                raise RuntimeError(f"server at {url} did not come up within {timeout:.0f}s")
+            time.sleep(0.2)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="HTTP load test for the web app")
+    ap.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the server under test")
+    ap.add_argument("--mix", default="render=9,ai=1", help=f"route weights, routes: {', '.join(ROUTES)}")
+    ap.add_argument("--concurrency", type=int, default=16, help="concurrent clients (default: 16)")
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds to run (default: 20)")
+    ap.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    ap.add_argument("--timeout", type=float, default=30.0, help="client timeout per request in seconds")
+    ap.add_argument("--render-variety", type=int, default=50, help="distinct render sources (cache hit ratio)")
+    ap.add_argument("--prompt-variety", type=int, default=20, help="distinct AI prompts (cache hit ratio)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", metavar="PATH", help="also write the summary as JSON")
+    stub = ap.add_argument_group("local server (optional)")
+    stub.add_argument("--stub-latency", metavar="SPEC",
+                      help="start a Groq stub with this latency (e.g. lognormal:0.8,0.5) and point --spawn at it")
+    stub.add_argument("--stub-failure-rate", type=float, default=0.0)
+    stub.add_argument("--spawn", metavar="CMD", help="start the server under test with this command, stop it afterwards")
+    args = ap.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        ap.error(str(e))
+
+    server_proc = None
+    groq_stub = None
+    try:
+        env = dict(os.environ)
+        if args.stub_latency is not None:
+            from web.ai_stub import parse_latency
+            from benchmarks.groq_stub import serve_in_background
+            groq_stub = serve_in_background(
+                latency=parse_latency(args.stub_latency, random.Random(args.seed)),
+                failure_rate=args.stub_failure_rate,
+                seed=args.seed,
+            )
+            env.update(GROQ_BASE_URL=groq_stub.url, GROQ_API_KEY="stub")
+            env.pop("AI_BACKEND", None)
+            print(f"Groq stub at {groq_stub.url}", file=sys.stderr)
+        if args.spawn:
+            server_proc = subprocess.Popen(shlex.split(args.spawn), cwd=ROOT, env=env)
+            wait_for(args.url, timeout=30.0)
+
+        summary, elapsed = run_load(
+            args.url, mix, args.concurrency, args.duration, args.requests,
+            timeout=args.timeout, render_variety=args.render_variety,
+            prompt_variety=args.prompt_variety, seed=args.seed,
+        )
+    finally:
+        if server_proc is not None:
+            server_proc.terminate()
+            server_proc.wait(timeout=10)
+        if groq_stub is not None:
+            groq_stub.shutdown()
+
+    print(format_report(summary, elapsed, args.concurrency))
+    if groq_stub is not None:
+        print(f"Groq stub: {groq_stub.calls} upstream calls, {groq_stub.failures} failed")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"elapsed": elapsed, "concurrency": args.concurrency,
+                                               "mix": mix, "routes": summary}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
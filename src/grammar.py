@@ -17,7 +17,7 @@ SponsorSizeDecl   ::= "sponsor_size" ":" INT ";" ;
 
 PatternExpr    ::= Ident "(" ArgList? ")" ;
 ArgList        ::= Arg { "," Arg } ;
-Arg            ::= INT | COLOR | STRING ;
+Arg            ::= INT | COLOR | STRING | IDENT ;
 
 Ident          ::= IDENT ;
 COLOR          ::= "#" HEXDIGIT{3} | "#" HEXDIGIT{6} ;
@@ -0,0 +1,158 @@
+# src/incremental.py
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .lexer.tokenizer import Lexer, Token
+from .parser.parser import Parser, ParserError
+from .ast.nodes import JerseyNode, Stmt
+from .semantic.checks import validate_jersey, JerseySpec
+from .interpreter.svg import render_layers, assemble_svg, LayerMemo, RenderOptions, RenderedLayer
+from .interpreter.cost import RenderBudget
+
+
+@dataclass
+class BuildResult:
+    svg: str
+    spec: JerseySpec
+    layers: List[RenderedLayer]
+    timings: List[Tuple[str, float, str]] = field(default_factory=list)  # (stage, ms, note)
+
+    def format_timings(self) -> str:
+        """
+        One-line summary of per-stage timings, e.g. "lex 0.10ms (12/13 lines cached) | ...".
+        """
+        parts = []
+        for stage, ms, note in self.timings:
+            parts.append(f"{stage} {ms:.2f}ms" + (f" ({note})" if note else ""))
+        total = sum(ms for _, ms, _ in self.timings)
+        parts.append(f"total {total:.2f}ms")
+        return " | ".join(parts)
+
+
+class IncrementalCompiler:
+    """
+    Compiles the same document over and over, reusing work from the previous build.
+
+    - tokens are cached per source line (a whole re-lex happens only with block comments)
+    - statements are cached by their token sequence, so only edited statements are re-parsed
+    - every SVG layer is memoized on the spec fields it reads (see LayerMemo)
+
+    Editing a text statement (team/player/number/sponsor) therefore only re-lexes that line,
+    re-parses that statement, rebuilds that text layer and re-assembles the SVG.
+    Caches only keep what the latest build used, so memory does not grow over a session.
+    """
+
+    def __init__(self, opts: RenderOptions | None = None, budget: RenderBudget | None = None):
+        self.opts = opts or RenderOptions(show_debug=False)
+        self.budget = budget
+        self._line_tokens: Dict[Tuple[int, str], List[Token]] = {}
+        self._stmts: Dict[tuple, Stmt] = {}
+        self.layers = LayerMemo()
+
+    # --- stages ---
+    def _lex(self, text: str) -> Tuple[List[Token], str]:
+        """
+        Tokenize line by line, reusing tokens of unchanged lines.
+        """
+        if "/*" in text:
+            # block comments can span lines; no safe per-line split
+            self._line_tokens = {}
+            return Lexer(text).tokens(), "full"
+
+        cache: Dict[Tuple[int, str], List[Token]] = {}
+        toks: List[Token] = []
+        hits = 0
+        lines = text.split("\n")
+        for lineno, line in enumerate(lines, start=1):
+            key = (lineno, line)
+            line_toks = self._line_tokens.get(key)
+            if line_toks is None:
+                lx = Lexer(line)
+                lx.line = lineno
+                line_toks = lx.tokens()[:-1]  # drop per-line EOF
+            else:
+                hits += 1
+            cache[key] = line_toks
+            toks.extend(line_toks)
+        toks.append(Token("EOF", "", len(lines), len(lines[-1]) + 1))
+        self._line_tokens = cache
+        return toks, f"{hits}/{len(lines)} lines cached"
+
+    def _parse(self, toks: List[Token]) -> Tuple[JerseyNode, str]:
+        """
+        Parse statement by statement, reusing nodes of unchanged statements.
+        Anything unusual falls back to a full parse so errors read the same as the CLI.
+        """
+        if (
+            len(toks) < 4
+            or toks[0].type != "JERSEY" or toks[1].type != "LBRACE"
+            or toks[-2].type != "RBRACE" or toks[-1].type != "EOF"
+        ):
+            return Parser(toks).parse(), "full"
+
+        chunks: List[List[Token]] = []
+        current: List[Token] = []
+        for t in toks[2:-2]:
+            current.append(t)
+            if t.type == "SEMI":
+                chunks.append(current)
+                current = []
+        if current:
+            return Parser(toks).parse(), "full"
+
+        cache: Dict[tuple, Stmt] = {}
+        stmts: List[Stmt] = []
+        hits = 0
+        eof = toks[-1]
+        for chunk in chunks:
+            key = tuple((t.type, t.value) for t in chunk)
+            node = self._stmts.get(key)
+            if node is None:
+                try:
+                    node = Parser(chunk + [eof]).parse_stmt()
+                except ParserError:
+                    return Parser(toks).parse(), "full"
+            else:
+                hits += 1
+            cache[key] = node
+            stmts.append(node)
+        self._stmts = cache
+        return JerseyNode(stmts=stmts), f"{hits}/{len(chunks)} stmts cached"
+
+    # --- entry point ---
+    def build(self, text: str) -> BuildResult:
+        """
+        Compile `text` to SVG, recording how long each stage took and what was reused.
+        Raises the usual LexerError / ParserError / SemanticError on bad input,
+        or OverBudget when a budget is set and the design exceeds it.
+        """
+        timings: List[Tuple[str, float, str]] = []
+
+        t0 = time.perf_counter()
+        toks, note = self._lex(text)
+        t1 = time.perf_counter()
+        timings.append(("lex", (t1 - t0) * 1000, note))
+
+        ast, note = self._parse(toks)
+        t2 = time.perf_counter()
+        timings.append(("parse", (t2 - t1) * 1000, note))
+
+        spec = validate_jersey(ast)
+        note = ""
+        opts = self.opts
+        if self.budget is not None:
+            spec, opts, _, downgraded = self.budget.apply(spec, opts)
+            note = "downgraded" if downgraded else ""
+        t3 = time.perf_counter()
+        timings.append(("validate", (t3 - t2) * 1000, note))
+
+        layers = render_layers(spec, opts, memo=self.layers)
+        t4 = time.perf_counter()
+        timings.append(("layers", (t4 - t3) * 1000, f"{len(self.layers.hit_names())}/{len(layers)} cached"))
+
+        svg = assemble_svg(layers, opts)
+        t5 = time.perf_counter()
+        timings.append(("assemble", (t5 - t4) * 1000, ""))
+
+        return BuildResult(svg=svg, spec=spec, layers=layers, timings=timings)
@@ -0,0 +1,189 @@
+# src/interpreter/cost.py
+from dataclasses import dataclass, replace
+from functools import lru_cache
+import math
+
+from ..semantic.checks import JerseySpec, TextPlacement
+from .svg import W, H, FULL, LODS, Detail, RenderOptions, render_svg
+
+# Predicts how big a render will be without running it, so a server can refuse
+# or cheapen a design before spending CPU on it. The formulas mirror the loops
+# in svg.py's pattern functions, at the render's level of detail; the pattern is
+# drawn once per side in the render's view (twice for front + back).
+# Elements culled outside the jersey clip are still counted, so this is an upper bound.
+
+# approximate serialized size of one element / one path point
+RECT_BYTES = 80
+CIRCLE_BYTES = 75
+PATH_BYTES = 90
+POINT_BYTES = 15
+RUN_BYTES = 22   # one rectangle of a merged camo(..., blocks) path
+
+
+@dataclass(frozen=True)
+class RenderCost:
+    elements: int   # SVG elements in the document
+    bytes: int      # serialized SVG size
+
+    def within(self, max_elements: int, max_bytes: int) -> bool:
+        return self.elements <= max_elements and self.bytes <= max_bytes
+
+
+class OverBudget(Exception):
+    """
+    Raised when a design would cost more to render than the configured budget allows.
+    """
+    pass
+
+
+@lru_cache
+def _base_cost(lod: str = "full", view: str = "both") -> RenderCost:
+    """
+    Cost of everything but the pattern (geometry, text, embedded font), measured once per LOD and view.
+    """
+    text = TextPlacement(text="TEAM", x=0, y=0, size=10)
+    svg = render_svg(JerseySpec(
+        team=text, player=text, number=TextPlacement(text=10, x=0, y=0, size=10), sponsor=text,
+        primary="#000000", secondary="#000000", tertiary="#000000", font="Arial",
+    ), RenderOptions(lod=lod, view=view))
+    return RenderCost(elements=svg.count("<") - svg.count("</") - 1, bytes=len(svg))
+
+
+def _arg(args: list, i: int, default):
+    return args[i] if len(args) > i and isinstance(args[i], int) else default
+
+
+def pattern_cost(ident: str, args: list, detail: Detail = FULL) -> RenderCost:
+    """
+    Cost of one side's pattern layer for `ident(args)` at level of detail `detail`.
+    """
+    ident = ident.lower()
+    if ident == "stripes":
+        n = 2 * _arg(args, 0, 6)
+        return RenderCost(n, n * RECT_BYTES)
+    if ident == "hoops":
+        n = _arg(args, 0, 6)
+        return RenderCost(n, n * RECT_BYTES)
+    if ident == "sash":
+        return RenderCost(4, 4 * RECT_BYTES)
+    if ident == "checker":
+        cw, ch = max(1, _arg(args, 0, 10)), max(1, _arg(args, 1, 10))
+        if min(cw, ch) < detail.blend_below:
+            return RenderCost(1, RECT_BYTES)
+        n = ((W // cw + 2) * (H // ch + 2) + 1) // 2
+        return RenderCost(n, n * RECT_BYTES)
+    if ident == "gradient":
+        return RenderCost(25, 25 * RECT_BYTES)
+    if ident == "brush":
+        thickness = max(5, _arg(args, 0, 50))
+        step = max(15, min(80, thickness * 1.5))
+        points = 2 * (int((W + 120) / step) + 1)
+        return RenderCost(3, 3 * (PATH_BYTES + points * POINT_BYTES))
+    if ident == "waves":
+        amplitude, wavelength = max(1, _arg(args, 0, 10)), max(4, _arg(args, 1, 40))
+        if amplitude * 2 < detail.blend_below:
+            return RenderCost(1, RECT_BYTES)
+        rows = int(H / (amplitude * 2)) + 2
+        dx = wavelength / 16 * detail.sampling
+        points = int((W + dx) / dx) + 2
+        return RenderCost(rows, rows * (PATH_BYTES + points * POINT_BYTES))
+    if ident == "camo":
+        cell = max(3, _arg(args, 0, 12), math.ceil(detail.blend_below))
+        variance = max(0, min(100, _arg(args, 1, 50)))
+        n = math.ceil((W // cell + 2) * (H // cell + 2) * variance / 100)  # blobs
+        if len(args) > 2 and args[2] == "blocks":
+            paths = min(n, 8)  # one per color and tone; merging only lowers the run count
+            return RenderCost(paths, paths * PATH_BYTES + n * RUN_BYTES)
+        return RenderCost(n, n * RECT_BYTES)
+    if ident == "halftone_dots":
+        dot = max(1, _arg(args, 0, 6))
+        spacing = max(dot, _arg(args, 1, 12))
+        if spacing < detail.blend_below or dot < detail.min_feature:
+            n = H // spacing + 1  # one band per row
+            return RenderCost(n, n * RECT_BYTES)
+        n = (W // spacing + 1) * (H // spacing + 1)
+        return RenderCost(n, n * CIRCLE_BYTES)
+    if ident == "topo":
+        n = 2 * max(1, _arg(args, 0, 12))  # two contour centers
+        return RenderCost(n, n * (PATH_BYTES + 180 // detail.sampling * POINT_BYTES))
+    if ident == "half_split":
+        n = 3 if _arg(args, 0, None) == "horizontal" else 6
+        return RenderCost(n, n * RECT_BYTES)
+    return RenderCost(0, 0)
+
+
+def estimate_cost(spec: JerseySpec, opts: RenderOptions | None = None) -> RenderCost:
+    """
+    Predicts the element count and byte size of render_svg(spec, opts).
+    """
+    opts = opts or RenderOptions()
+    base = _base_cost(opts.detail.name, opts.view)
+    if not spec.pattern:
+        return base
+    side = pattern_cost(spec.pattern[0], list(spec.pattern[1]), opts.detail)
+    sides = 2 if opts.view == "both" else 1
+    return RenderCost(base.elements + sides * side.elements, base.bytes + sides * side.bytes)
+
+
+# --- downgrading ---
+# one coarsening step per pattern: fewer, larger elements, clamped to the semantic limits
+def _coarsen(ident: str, args: list) -> list | None:
+    a = list(args)
+    if ident in ("stripes", "hoops") and _arg(a, 0, 1) > 1:
+        a[0] = max(1, a[0] // 2)
+    elif ident == "checker" and min(_arg(a, 0, 200), _arg(a, 1, 200)) < 200:
+        a[0], a[1] = min(200, a[0] * 2), min(200, a[1] * 2)
+    elif ident == "halftone_dots" and _arg(a, 1, 100) < 100:
+        a[0], a[1] = min(100, a[0] * 2), min(100, a[1] * 2)
+    elif ident == "waves" and _arg(a, 0, 200) < 200:
+        a[0], a[1] = min(200, a[0] * 2), min(100, a[1] * 2)
+    elif ident == "camo" and _arg(a, 0, 100) < 100:
+        a[0] = min(100, max(3, a[0]) * 2)
+    elif ident == "topo" and _arg(a, 0, 1) > 1:
+        a[0] = max(1, a[0] // 2)
+    else:
+        return None
+    return a
+
+
+@dataclass(frozen=True)
+class RenderBudget:
+    max_elements: int = 50_000
+    max_bytes: int = 4 * 1024 * 1024
+    mode: str = "downgrade"   # "downgrade" (coarsen the pattern) or "reject"
+
+    def apply(
+        self, spec: JerseySpec, opts: RenderOptions | None = None,
+    ) -> tuple[JerseySpec, RenderOptions, RenderCost, bool]:
+        """
+        Returns (spec to render, options to render it with, its estimated cost, downgraded?).
+        A downgrade first lowers the level of detail, then coarsens the pattern at the lowest one.
+        Raises OverBudget in "reject" mode, or when even a plain kit is over budget.
+        """
+        opts = opts or RenderOptions()
+        cost = estimate_cost(spec, opts)
+        if cost.within(self.max_elements, self.max_bytes):
+            return spec, opts, cost, False
+        if self.mode == "reject":
+            raise OverBudget(
+                f"design too expensive to render (~{cost.elements} elements, ~{cost.bytes // 1024} KiB; "
+                f"limit {self.max_elements} elements, {self.max_bytes // 1024} KiB)"
+            )
+
+        lods = list(LODS)
+        for lod in lods[lods.index(opts.detail.name) + 1:]:
+            opts = replace(opts, lod=lod)
+            cost = estimate_cost(spec, opts)
+            if cost.within(self.max_elements, self.max_bytes):
+                return spec, opts, cost, True
+
+        if not spec.pattern:
+            raise OverBudget(f"design too expensive to render (~{cost.elements} elements)")
+        ident, args = spec.pattern[0].lower(), list(spec.pattern[1])
+        while args is not None:
+            args = _coarsen(ident, args)
+            candidate = replace(spec, pattern=(ident, args) if args is not None else None)
+            cost = estimate_cost(candidate, opts)
+            if cost.within(self.max_elements, self.max_bytes):
+                return candidate, opts, cost, True
+        raise OverBudget(f"design too expensive to render even without its pattern (~{cost.elements} elements)")
@@ -0,0 +1,182 @@
+# src/interpreter/geometry.py
+import math
+import re
+from dataclasses import dataclass
+
+# Numeric form of the clip outlines, so pattern generators can skip elements that
+# the jersey clip would hide anyway.
+#
+# An outline is flattened into polygons and scan-converted once into a coarse
+# coverage grid (nonzero winding, like SVG's default clip-rule), grown by a safety
+# margin and turned into a summed-area table. "Could this box show through the
+# clip?" is then four table lookups, whatever the size of the box.
+
+_PATH_TOKEN = re.compile(r"[MmLlHhVvCcZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+CURVE_STEPS = 16 # line segments per cubic Bézier
+
+Point = tuple[float, float]
+
+
+def flatten_path(d: str, steps: int = CURVE_STEPS) -> list[list[Point]]:
+    """
+    Polygons (one per subpath) approximating an SVG path made of M/L/H/V/C/Z commands.
+    """
+    tokens = _PATH_TOKEN.findall(d)
+    polygons: list[list[Point]] = []
+    current: list[Point] = []
+    x = y = 0.0
+    start = (0.0, 0.0)
+    cmd = ""
+    i = 0
+
+    def num() -> float:
+        nonlocal i
+        value = float(tokens[i])
+        i += 1
+        return value
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+            if cmd in "Zz":
+                if current:
+                    polygons.append(current)
+                current = []
+                x, y = start
+                continue
+        rel = cmd.islower()
+        ox, oy = (x, y) if rel else (0.0, 0.0)
+        op = cmd.upper()
+        if op == "M":
+            if current:
+                polygons.append(current)
+            x, y = ox + num(), oy + num()
+            start = (x, y)
+            current = [start]
+            cmd = "l" if rel else "L" # further pairs are implicit line-tos
+        elif op == "L":
+            x, y = ox + num(), oy + num()
+            current.append((x, y))
+        elif op == "H":
+            x = ox + num()
+            current.append((x, y))
+        elif op == "V":
+            y = oy + num()
+            current.append((x, y))
+        elif op == "C":
+            x1, y1 = ox + num(), oy + num()
+            x2, y2 = ox + num(), oy + num()
+            x3, y3 = ox + num(), oy + num()
+            x0, y0 = x, y
+            for s in range(1, steps + 1):
+                t = s / steps
+                u = 1 - t
+                a, b, c, e = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+                current.append((a * x0 + b * x1 + c * x2 + e * x3, a * y0 + b * y1 + c * y2 + e * y3))
+            x, y = x3, y3
+        else:
+            raise ValueError(f"unsupported path command {cmd!r}")
+    if current:
+        polygons.append(current)
+    return polygons
+
+
+@dataclass(frozen=True)
+class Box:
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+class ClipRegion:
+    """
+    Conservative coverage of a clip outline over the canvas (0, 0)-(width, height).
+
+    `visible(x0, y0, x1, y1)` is False only when the box is fully outside the outline
+    (grown by `margin`) or outside the canvas; anything touching it counts as visible.
+    """
+
+    def __init__(self, polygons: list[list[Point]], width: float, height: float, cell: float = 2.0, margin: float = 3.0):
+        self.cell = cell
+        self.cols = math.ceil(width / cell)
+        self.rows = math.ceil(height / cell)
+        points = [p for poly in polygons for p in poly]
+        self.bbox = Box(
+            min(x for x, _ in points) - margin, min(y for _, y in points) - margin,
+            max(x for x, _ in points) + margin, max(y for _, y in points) + margin,
+        )
+
+        # scanline fill at cell centers; sampling error and flattening error are covered by the margin
+        edges = [(poly[k - 1], poly[k]) for poly in polygons for k in range(len(poly))]
+        grow = math.ceil(margin / cell) + 1
+        filled = [[False] * self.cols for _ in range(self.rows)]
+        for r in range(self.rows):
+            cy = (r + 0.5) * cell
+            crossings: list[tuple[float, int]] = []
+            for (ax, ay), (bx, by) in edges:
+                if (ay <= cy) != (by <= cy):
+                    crossings.append((ax + (cy - ay) * (bx - ax) / (by - ay), 1 if by > ay else -1))
+            crossings.sort()
+            winding = 0
+            for k, (cx, direction) in enumerate(crossings[:-1]):
+                winding += direction
+                if winding:
+                    c0 = max(0, int(cx / cell) - grow)
+                    c1 = min(self.cols - 1, int(crossings[k + 1][0] / cell) + grow)
+                    for c in range(c0, c1 + 1):
+                        filled[r][c] = True
+
+        # grow vertically by the same number of cells, then sum up
+        covered = [
+            [any(filled[rr][c] for rr in range(max(0, r - grow), min(self.rows, r + grow + 1))) for c in range(self.cols)]
+            for r in range(self.rows)
+        ]
+        # covered column range per row, for span()
+        self._extent = [
+            (row.index(True), self.cols - 1 - row[::-1].index(True)) if any(row) else None
+            for row in covered
+        ]
+        table = [[0] * (self.cols + 1) for _ in range(self.rows + 1)]
+        for r in range(self.rows):
+            run = 0
+            above, row = table[r], table[r + 1]
+            for c in range(self.cols):
+                run += covered[r][c]
+                row[c + 1] = above[c + 1] + run
+        self._table = table
+
+    @classmethod
+    def from_path(cls, d: str, width: float, height: float, **kwargs) -> "ClipRegion":
+        return cls(flatten_path(d), width, height, **kwargs)
+
+    def span(self, y0: float, y1: float) -> tuple[float, float] | None:
+        """
+        Horizontal extent (x0, x1) of the coverage between y0 and y1, or None if there is none.
+        Anything in the band outside that extent is hidden; cheaper than visible() per element
+        for patterns laid out in rows.
+        """
+        r0 = max(0, int(y0 // self.cell))
+        r1 = min(self.rows, int(y1 // self.cell) + 1)
+        extents = [e for e in self._extent[r0:r1] if e is not None]
+        if not extents:
+            return None
+        return min(e[0] for e in extents) * self.cell, (max(e[1] for e in extents) + 1) * self.cell
+
+    def visible(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        """
+        Whether any part of the box (x0, y0)-(x1, y1) may show through the clip.
+        """
+        b = self.bbox
+        if x1 < b.x0 or x0 > b.x1 or y1 < b.y0 or y0 > b.y1:
+            return False
+        c0 = max(0, int(x0 // self.cell))
+        c1 = min(self.cols, int(x1 // self.cell) + 1)
+        r0 = max(0, int(y0 // self.cell))
+        r1 = min(self.rows, int(y1 // self.cell) + 1)
+        if c0 >= c1 or r0 >= r1:
+            return False
+        t = self._table
+        return t[r1][c1] - t[r0][c1] - t[r1][c0] + t[r0][c0] > 0
@@ -63,7 +63,8 @@ def jersey_json_to_dsl(data: Dict[str, Any]) -> str:
         if len(pattern_args) >= 2:
             cell = int(pattern_args[0])
             variance = int(pattern_args[1])
-            lines.append(f"  pattern: camo({cell},{variance});")
+            style = ",blocks" if len(pattern_args) >= 3 and pattern_args[2] == "blocks" else ""
+            lines.append(f"  pattern: camo({cell},{variance}{style});")
 
     elif pattern_type == "halftone_dots":
         if len(pattern_args) >= 2:
@@ -0,0 +1,149 @@
+# src/interpreter/sheet.py
+import math
+from collections import Counter
+
+from ..semantic.checks import JerseySpec
+from ..profiling import stage
+from .svg import (
+    SVG_HEADER,
+    FRONT_BODY_PATH, BACK_BODY_PATH, FRONT_SHORTS_PATH, BACK_SHORTS_PATH,
+    FRONT_LINE_PATH, BACK_LINE_PATH, FRONT_TRIM_TOP_PATH, FRONT_TRIM_BOTTOM_PATH,
+    BACK_TRIM_TOP_PATH, BACK_TRIM_BOTTOM_PATH, FRONT_COLLAR_PATH, BACK_COLLAR_PATH,
+    CLIP_PATHS, CLIP_VIEWS, Detail, RenderOptions, RenderedLayer,
+    render_layers, clip_groups, viewbox, _geom, _logo_path, _font_block,
+)
+
+# Many designs side by side in one SVG document (kit pages, league overviews).
+#
+# Every design is rendered with the usual layer graph, then the sheet shares what
+# the designs have in common: the jersey outlines are defined once in <defs> and
+# drawn with <use>, the font is embedded once, and a layer whose markup is identical
+# in several designs (outlines, logo, a shared pattern) is defined once as well.
+
+SHEET_GAP = 16          # space between designs, in SVG user units
+SHEET_MAX_DESIGNS = 48   # default cap per web request (SHEET_MAX_DESIGNS in the app config)
+
+# drawn below a single render's viewBox; in a sheet it would land on the next row
+SKIPPED_LAYERS = ("credit",)
+
+_GEOMETRY = {
+    "front-body": FRONT_BODY_PATH,
+    "back-body": BACK_BODY_PATH,
+    "front-shorts": FRONT_SHORTS_PATH,
+    "back-shorts": BACK_SHORTS_PATH,
+    "front-line": FRONT_LINE_PATH,
+    "back-line": BACK_LINE_PATH,
+    "front-trim-top": FRONT_TRIM_TOP_PATH,
+    "front-trim-bottom": FRONT_TRIM_BOTTOM_PATH,
+    "back-trim-top": BACK_TRIM_TOP_PATH,
+    "back-trim-bottom": BACK_TRIM_BOTTOM_PATH,
+    "front-collar": FRONT_COLLAR_PATH,
+    "back-collar": BACK_COLLAR_PATH,
+}
+_CLIP_GEOMETRY = {"frontJerseyClip": "front-body", "backJerseyClip": "back-body"}
+
+
+def _shared_geometry(detail: Detail) -> dict[str, str]:
+    """
+    id -> path data of every outline a layer may draw, at the precision of `detail`.
+    """
+    geometry = {f"geom-{name}": _geom(d, detail) for name, d in _GEOMETRY.items()}
+    geometry["geom-logo"] = _logo_path(detail)
+    return geometry
+
+
+def _use_geometry(markup: str, geometry: dict[str, str], used: set[str]) -> str:
+    """
+    Replaces inline outline paths with references to their shared definition.
+    Presentation attributes stay on the <use>, where the shared path inherits them.
+    """
+    for ident, d in geometry.items():
+        inline = f'<path d="{d}"'
+        if inline in markup:
+            markup = markup.replace(inline, f'<use href="#{ident}"')
+            used.add(ident)
+    return markup
+
+
+def sheet_layout(count: int, columns: int | None = None) -> tuple[int, int]:
+    """
+    (columns, rows) of the grid; roughly square unless `columns` is given.
+    """
+    columns = max(1, min(count, columns or math.ceil(math.sqrt(count))))
+    return columns, math.ceil(count / columns)
+
+
+@stage("sheet")
+def render_sheet(
+    specs: list[JerseySpec],
+    opts: RenderOptions | None = None,
+    columns: int | None = None,
+    gap: int = SHEET_GAP,
+) -> str:
+    """
+    Renders several designs into one SVG, laid out in a grid (row by row, in order).
+    `opts` applies to every design, so a sheet can be all thumbnails or all fronts.
+    """
+    if not specs:
+        raise ValueError("a sheet needs at least one design")
+    opts = opts or RenderOptions()
+    detail = opts.detail
+    vx, vy, vw, vh = viewbox(opts.view)
+    columns, rows = sheet_layout(len(specs), columns)
+
+    designs = [
+        [layer for layer in render_layers(spec, opts) if layer.markup and layer.name not in SKIPPED_LAYERS]
+        for spec in specs
+    ]
+
+    geometry = _shared_geometry(detail)
+    clips = [clip for clip in CLIP_PATHS if opts.view in ("both", CLIP_VIEWS[clip])]
+    used = {f"geom-{_CLIP_GEOMETRY[clip]}" for clip in clips}  # ids referenced so far
+
+    # layers identical in two or more designs are defined once
+    repeats = Counter(layer.hash for layers in designs for layer in layers)
+    shared: dict[str, str] = {}
+
+    def markup(layer: RenderedLayer) -> str:
+        if repeats[layer.hash] > 1:
+            if layer.hash not in shared:
+                shared[layer.hash] = (
+                    f'<g id="layer-{layer.hash}" class="layer-{layer.name}">\n'
+                    f'{_use_geometry(layer.markup, geometry, used)}\n</g>'
+                )
+            return f'<use href="#layer-{layer.hash}"/>'
+        return f'<g class="layer-{layer.name}">\n{_use_geometry(layer.markup, geometry, used)}\n</g>'
+
+    cells: list[str] = []
+    for i, layers in enumerate(designs):
+        row, col = divmod(i, columns)
+        tx, ty = col * (vw + gap) - vx, row * (vh + gap) - vy
+        cells.append(
+            f'  <g id="design-{i}" transform="translate({tx},{ty})">\n'
+            f'{"".join(clip_groups(layers, markup))}'
+            f'  </g>\n'
+        )
+
+    width = columns * vw + (columns - 1) * gap
+    height = rows * vh + (rows - 1) * gap
+    defs = (
+        "".join(f'    <path id="{ident}" d="{d}"/>\n' for ident, d in geometry.items() if ident in used)
+        + "".join(
+            f'    <clipPath id="{clip}"><use href="#geom-{_CLIP_GEOMETRY[clip]}"/></clipPath>\n'
+            for clip in clips
+        )
+        + "".join(f"    {g}\n" for g in shared.values())
+    )
+    font_style_block = _font_block() if detail.embed_font else ""
+
+    return (
+        f"{SVG_HEADER}\n"
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'viewBox="0 0 {width} {height}" width="{width}" height="{height}">\n'
+        f'{font_style_block}\n'
+        f'  <metadata>Author: Ben Nguyen | Procedural Jersey Generator © 2025 Ben Nguyen</metadata>\n'
+        f'  <rect x="0" y="0" width="{width}" height="{height}" fill="#fff"/>\n'
+        f'  <defs>\n{defs}  </defs>\n'
+        f'{"".join(cells)}'
+        f'</svg>\n'
+    )
@@ -1,8 +1,16 @@
 # src/interpreter/svg.py
 from dataclasses import dataclass
+from functools import cached_property
+import hashlib
+from itertools import groupby
 import math
 import random
-from ..semantic.checks import JerseySpec
+import re
+import time
+from typing import Callable
+from ..semantic.checks import JerseySpec, TextPlacement
+from ..profiling import stage
+from .geometry import ClipRegion
 import base64
 from functools import lru_cache
 from pathlib import Path
@@ -116,107 +124,194 @@ LOGO_PATH = (
     "m230.58 2.4199l-68.84 0.0039-68.847 0.002-18.594 18.308-18.594 18.307 0.055 42.57 0.054 42.569 18.166 17.96 18.168 17.95h64.902 64.9l8.25 7.95 8.26 7.94v28.5 28.49l-8.18 8.19-8.18 8.18h-21.79-21.78v19.34 19.34h29.86 29.86l18.8-18.52 18.81-18.53v-46.44-46.45l-17.44-17.27-17.43-17.27h-67.67-67.67l-7.972-7.96-7.973-7.96-0.019-26.358-0.018-26.354 7.137-6.896 7.135-6.897 58.83-0.01 58.83-0.009 5.88 5.824 5.88 5.824v12.451 12.45h20.18 20.19v-37.612-37.613l-16.15-0.0001h-16.15v5.4121 5.414l-5.42-5.414-5.43-5.4121zm-116.65 76.074v15.088 15.088h12.75 12.75v4.25 4.25h16.57 16.58v-4.68-4.67h13.81 13.82v-14.664-14.662h-43.14-43.14zm25.5 87.976v71.93 71.92l-7.97 7.98-7.96 7.97h-34.646-34.647l-6.264-6.27-6.263-6.28v-13.49-13.49h-19.551-19.549l0.0001 35.49v35.49h17.213 17.211v-6.48-6.47l6.486 6.47 6.487 6.48 44.408-0.02 44.405-0.02 16.9-16.72 16.89-16.73v-78.88-78.88h-16.58-16.57zm-87.125 43.35v39.52 39.53h18.275 18.275v-5.2-5.2l4.788 4.78 4.787 4.77h17.31 17.31v-19.34-19.34h-15.76-15.76l-5.915-5.59-5.91-5.59v-14.17-14.17h-18.701-18.699z"
 )
 
+CLIP_PATHS = {
+    "frontJerseyClip": FRONT_BODY_PATH,
+    "backJerseyClip": BACK_BODY_PATH,
+}
+
+# --- views ---
+# (x, y, width, height) of the canvas each view shows; the front sits left of x=242, the back right
+VIEWBOXES: dict[str, tuple[int, int, int, int]] = {
+    "both": (0, 0, W, H),
+    "front": (0, 0, W // 2, H),
+    "back": (W // 2, 0, W - W // 2, H),
+}
+CLIP_VIEWS = {"frontJerseyClip": "front", "backJerseyClip": "back"}
+
+def viewbox(view: str) -> tuple[int, int, int, int]:
+    try:
+        return VIEWBOXES[view]
+    except KeyError:
+        raise ValueError(f"unknown view {view!r} (expected one of: {', '.join(VIEWBOXES)})")
+
+def _for_view(view: str, parts: tuple[tuple[str, str], ...]) -> str:
+    """
+    Joins the (side, markup) parts drawn in `view`.
+    """
+    return "".join(markup for side, markup in parts if view in ("both", side))
+
+# --- level of detail ---
+@dataclass(frozen=True)
+class Detail:
+    """
+    How much geometry a level of detail keeps. Sizes are in SVG user units.
+    """
+    name: str
+    sampling: int = 1              # spacing multiplier for sampled curves (waves, topo)
+    min_feature: float = 0.0       # drop elements smaller than this
+    blend_below: float = 0.0       # textures with a finer period are drawn as a flat tint
+    decimals: int | None = None    # round outline coordinates (None: as authored)
+    embed_font: bool = True
+
+# thumbnails are shown at roughly a quarter of the native size, previews at half
+LODS: dict[str, Detail] = {
+    "full": Detail("full"),
+    "preview": Detail("preview", sampling=2, min_feature=1.0, blend_below=4.0, decimals=1),
+    "thumbnail": Detail("thumbnail", sampling=4, min_feature=2.0, blend_below=12.5, decimals=0, embed_font=False),
+}
+FULL = LODS["full"]
+
+_PATH_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)")
+
+@lru_cache(maxsize=128)
+def _round_path(d: str, decimals: int) -> str:
+    def fmt(m: re.Match) -> str:
+        text = f"{float(m.group()):.{decimals}f}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return _PATH_NUMBER.sub(fmt, d)
+
+def _geom(d: str, detail: Detail) -> str:
+    """
+    An outline path at the coordinate precision of `detail`.
+    """
+    return d if detail.decimals is None else _round_path(d, detail.decimals)
+
 #--- SVG Rendering ---
 @dataclass
 class RenderOptions:
     show_debug: bool = False
-
-def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
+    lod: str = "full"   # "full", "preview" or "thumbnail" (see LODS)
+    view: str = "both"  # "both", "front" or "back" (see VIEWBOXES)
+
+    @property
+    def detail(self) -> Detail:
+        try:
+            return LODS[self.lod]
+        except KeyError:
+            raise ValueError(f"unknown level of detail {self.lod!r} (expected one of: {', '.join(LODS)})")
+
+@dataclass(frozen=True)
+class RenderedLayer:
+    name: str           # stable id, emitted as <g id="layer-{name}">
+    clip: str | None    # clipPath id the layer is drawn inside, if any
+    markup: str
+
+    @cached_property
+    def hash(self) -> str:
+        """
+        Content hash of the layer; equal hashes mean identical markup.
+        """
+        return hashlib.sha256(f"{self.clip}\0{self.markup}".encode("utf-8")).hexdigest()[:16]
+
+def _colors(spec: JerseySpec) -> tuple[str, str, str]:
     """
-    Renders the JerseySpec into an SVG string.
+    Returns the (primary, secondary, tertiary) colors with renderer defaults.
     """
-    # Use default options if none provided
-    opts = opts or RenderOptions()
     prim = spec.primary or "#0033AA"
     sec  = spec.secondary or "#FFCC00"
     ter = spec.tertiary or spec.pattern_color or "#000000"
+    return prim, sec, ter
 
-    # --- jersey geometry (reusable) ---
-    front_body   = FRONT_BODY_PATH
-    front_shorts = FRONT_SHORTS_PATH
-    back_body    = BACK_BODY_PATH
-    back_shorts  = BACK_SHORTS_PATH
-    front_decors = FRONT_LINE_PATH
-    back_decors = BACK_LINE_PATH
-    logo = LOGO_PATH
-
-    # --- clipped pattern layer (mask to jersey shape) ---
-    defs = f'''
-      <defs>
-        <clipPath id="frontJerseyClip">
-        <path d="{front_body}"/>
-        </clipPath>
-        <clipPath id="backJerseyClip">
-        <path d="{back_body}"/>
-        </clipPath>
-
-        <clipPath id="frontShortsClip">
-        <path d="{front_shorts}"/>
-        </clipPath>
-        <clipPath id="backShortsClip">
-        <path d="{back_shorts}"/>
-        </clipPath>
-    </defs>
-    '''
-
-    front_shorts_fill = f'<path d="{front_shorts}" fill="{sec}"/>\n' # shorts base color
-    back_shorts_fill  = f'<path d="{back_shorts}"  fill="{sec}"/>\n' # shorts base color
-
-    front_jersey_fill = f'<path d="{front_body}"  fill="{prim}"/>\n' # jersey base color
-    back_jersey_fill  = f'<path d="{back_body}"   fill="{prim}"/>\n' # jersey base color
-    front_short_decor = f'<path d="{front_decors}" fill="{prim}"/>\n' # jersey decor
-    back_short_decor = f'<path d="{back_decors}" fill="{prim}"/>\n' # jersey decor
-    logo_decor = f'<path d="{logo}" transform="scale(0.07) translate(1900, 700)" fill="#ffffff"/>\n' # logo decor
-
-    patcol = spec.pattern_color or "#FFFFFF" # pattern color
-
-    #--- pattern layers ---
-    front_jersey_pattern = (
-        f'<g clip-path="url(#frontJerseyClip)">\n'
-        f'{_pattern_layer(spec, prim, patcol)}\n'
-        f'</g>\n'
-    )
-    back_jersey_pattern = (
-        f'<g clip-path="url(#backJerseyClip)">\n'
-        f'{_pattern_layer(spec, prim, patcol)}\n'
-        f'</g>\n'
-    )
-
-    front_shorts_pattern = ""
-    back_shorts_pattern = ""
-
-    #--- trims ---
-    trims = (
-        f'<path d="{FRONT_TRIM_TOP_PATH}"    fill="{ter}"/>\n'
-        f'<path d="{FRONT_TRIM_BOTTOM_PATH}" fill="{ter}"/>\n'
-        f'<path d="{BACK_TRIM_TOP_PATH}"     fill="{ter}"/>\n'
-        f'<path d="{BACK_TRIM_BOTTOM_PATH}"  fill="{ter}"/>\n'
-    )
-
-    # Outlines
-    shorts_outlines = (
-        f'<path d="{front_shorts}" fill="none" stroke="#111" stroke-width="2.0"/>\n'
-        f'<path d="{back_shorts}"  fill="none" stroke="#111" stroke-width="2.0"/>\n'
-    )
+@lru_cache(maxsize=None)
+def clip_region(clip: str) -> ClipRegion:
+    """
+    Numeric coverage of a jersey clip path ("frontJerseyClip" / "backJerseyClip"), built once.
+    """
+    return ClipRegion.from_path(CLIP_PATHS[clip], W, H)
 
-    jersey_outlines = (
-        f'<path d="{front_body}"   fill="none" stroke="#111" stroke-width="2.0"/>\n'
-        f'<path d="{back_body}"    fill="none" stroke="#111" stroke-width="2.0"/>\n'
-        f'<path d="{FRONT_TRIM_TOP_PATH}"    fill="none" stroke="#111" stroke-width="1.5"/>\n'
-        f'<path d="{FRONT_TRIM_BOTTOM_PATH}" fill="none" stroke="#111" stroke-width="1.5"/>\n'
-        f'<path d="{BACK_TRIM_TOP_PATH}"     fill="none" stroke="#111" stroke-width="1.5"/>\n'
-        f'<path d="{BACK_TRIM_BOTTOM_PATH}"  fill="none" stroke="#111" stroke-width="1.5"/>\n'
-        f'<path d="{FRONT_COLLAR_PATH}"      fill="white" stroke="#111" stroke-width="1.5"/>\n'
-        f'<path d="{BACK_COLLAR_PATH}"       fill="white" stroke="#111" stroke-width="1.5"/>\n'
+def _pattern(spec: JerseySpec, detail: Detail, clip: str) -> str:
+    # drawn once per side, keeping only what shows through that side's jersey body
+    prim = spec.primary or "#0033AA"
+    return _pattern_layer(spec, prim, spec.pattern_color or "#FFFFFF", detail, clip_region(clip))
+
+def _pattern_front(spec: JerseySpec, detail: Detail = FULL) -> str:
+    return _pattern(spec, detail, "frontJerseyClip")
+
+def _pattern_back(spec: JerseySpec, detail: Detail = FULL) -> str:
+    return _pattern(spec, detail, "backJerseyClip")
+
+# layers spanning both views take the view to draw; "both" keeps the original order
+def _shorts(spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> str:
+    prim, sec, _ = _colors(spec)
+    front, back = _geom(FRONT_SHORTS_PATH, detail), _geom(BACK_SHORTS_PATH, detail)
+    return _for_view(view, (
+        ("front", f'<path d="{front}" fill="{sec}"/>\n'), # shorts base color
+        ("front", f'<path d="{_geom(FRONT_LINE_PATH, detail)}" fill="{prim}"/>\n'), # jersey decor
+        ("back", f'<path d="{back}"  fill="{sec}"/>\n'), # shorts base color
+        ("back", f'<path d="{_geom(BACK_LINE_PATH, detail)}" fill="{prim}"/>\n'), # jersey decor
+        # Outlines
+        ("front", f'<path d="{front}" fill="none" stroke="#111" stroke-width="2.0"/>\n'),
+        ("back", f'<path d="{back}"  fill="none" stroke="#111" stroke-width="2.0"/>\n'),
+    ))
+
+def _body(spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> str:
+    prim, _, _ = _colors(spec)
+    return _for_view(view, (
+        ("front", f'<path d="{_geom(FRONT_BODY_PATH, detail)}"  fill="{prim}"/>\n'), # jersey base color
+        ("back", f'<path d="{_geom(BACK_BODY_PATH, detail)}"   fill="{prim}"/>\n'), # jersey base color
+    ))
+
+def _trims(spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> str:
+    _, _, ter = _colors(spec)
+    return _for_view(view, (
+        ("front", f'<path d="{_geom(FRONT_TRIM_TOP_PATH, detail)}"    fill="{ter}"/>\n'),
+        ("front", f'<path d="{_geom(FRONT_TRIM_BOTTOM_PATH, detail)}" fill="{ter}"/>\n'),
+        ("back", f'<path d="{_geom(BACK_TRIM_TOP_PATH, detail)}"     fill="{ter}"/>\n'),
+        ("back", f'<path d="{_geom(BACK_TRIM_BOTTOM_PATH, detail)}"  fill="{ter}"/>\n'),
+    ))
+
+def _outlines(spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> str:
+    parts = (
+        ("front", f'<path d="{_geom(FRONT_BODY_PATH, detail)}"   fill="none" stroke="#111" stroke-width="2.0"/>\n'),
+        ("back", f'<path d="{_geom(BACK_BODY_PATH, detail)}"    fill="none" stroke="#111" stroke-width="2.0"/>\n'),
     )
+    if 1.5 < detail.min_feature: # thin trim strokes vanish at this size; keep the collars' fill
+        return _for_view(view, parts + (
+            ("front", f'<path d="{_geom(FRONT_COLLAR_PATH, detail)}"      fill="white"/>\n'),
+            ("back", f'<path d="{_geom(BACK_COLLAR_PATH, detail)}"       fill="white"/>\n'),
+        ))
+    return _for_view(view, parts + (
+        ("front", f'<path d="{_geom(FRONT_TRIM_TOP_PATH, detail)}"    fill="none" stroke="#111" stroke-width="1.5"/>\n'),
+        ("front", f'<path d="{_geom(FRONT_TRIM_BOTTOM_PATH, detail)}" fill="none" stroke="#111" stroke-width="1.5"/>\n'),
+        ("back", f'<path d="{_geom(BACK_TRIM_TOP_PATH, detail)}"     fill="none" stroke="#111" stroke-width="1.5"/>\n'),
+        ("back", f'<path d="{_geom(BACK_TRIM_BOTTOM_PATH, detail)}"  fill="none" stroke="#111" stroke-width="1.5"/>\n'),
+        ("front", f'<path d="{_geom(FRONT_COLLAR_PATH, detail)}"      fill="white" stroke="#111" stroke-width="1.5"/>\n'),
+        ("back", f'<path d="{_geom(BACK_COLLAR_PATH, detail)}"       fill="white" stroke="#111" stroke-width="1.5"/>\n'),
+    ))
+
+LOGO_FEATURE = 1.5 # size of the logo's strokes once scaled to 7%
+
+def _logo_path(detail: Detail) -> str:
+    # the logo path is relative and drawn at 7% scale: one decimal is already sub-pixel
+    return LOGO_PATH if detail.decimals is None else _round_path(LOGO_PATH, max(1, detail.decimals))
+
+def _logo(spec: JerseySpec, detail: Detail = FULL) -> str:
+    if LOGO_FEATURE < detail.min_feature:
+        return ""
+    d = _logo_path(detail)
+    return f'<path d="{d}" transform="scale(0.07) translate(1900, 700)" fill="#ffffff"/>\n' # logo decor
 
-    # --- text layers ---
-    front_cx = 115
-    back_cx  = 365
+# --- text layers ---
+BACK_CX = 365
 
-    # Front (left): sponsor + number
-    front_sponsor = (
-    _svg_text_wrapped(
+def _front_sponsor(spec: JerseySpec, detail: Detail = FULL) -> str:
+    # Front (left): sponsor
+    if not spec.sponsor:
+        return ""
+    _, _, ter = _colors(spec)
+    return _svg_text_wrapped(
         spec.sponsor.text,
         x=spec.sponsor.x,
         y=spec.sponsor.y,
@@ -226,33 +321,27 @@ def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
         fill=ter,
         font=spec.font,
         max_width=TEXT_MAX_WIDTH_SPONSOR,
-        ) if spec.sponsor else ""
-    )
-
-    front_number = _svg_text(
-        str(spec.number.text),
-        x=145,
-        y=70,
-        size=22,
-        anchor="middle",
-        weight="bold",
-        fill=ter,
-        font=spec.font,
     )
 
+def _back_sponsor(spec: JerseySpec, detail: Detail = FULL) -> str:
     # Back (right): sponsor + player + number + team
-    back_sponsor = _svg_text(
+    if not spec.sponsor:
+        return ""
+    _, _, ter = _colors(spec)
+    return _svg_text(
         spec.sponsor.text,
-        x=back_cx,
+        x=BACK_CX,
         y=45,
         size=10,
         anchor="middle",
         weight="regular",
         fill=ter,
         font=spec.font,
-    ) if spec.sponsor else ""
+    )
 
-    back_player = _svg_text(
+def _back_player(spec: JerseySpec, detail: Detail = FULL) -> str:
+    _, _, ter = _colors(spec)
+    return _svg_text(
         spec.player.text,
         x=spec.player.x,
         y=spec.player.y,
@@ -264,7 +353,9 @@ def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
         letter_spacing="2",
     )
 
-    back_number = _svg_text(
+def _back_number(spec: JerseySpec, detail: Detail = FULL) -> str:
+    _, _, ter = _colors(spec)
+    return _svg_text(
         str(spec.number.text),
         x=spec.number.x,
         y=spec.number.y,
@@ -275,7 +366,9 @@ def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
         font=spec.font,
     )
 
-    back_team = _svg_text_wrapped(
+def _back_team(spec: JerseySpec, detail: Detail = FULL) -> str:
+    _, _, ter = _colors(spec)
+    return _svg_text_wrapped(
         spec.team.text,
         x=spec.team.x,
         y=spec.team.y,
@@ -286,9 +379,218 @@ def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
         font=spec.font,
         max_width=TEXT_MAX_WIDTH_TEAM,
     )
-    
+
+def _credit(spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> str:
+    if detail is not FULL or view != "both":  # drawn below the viewBox, so never visible
+        return ""
+    return _svg_text("© 2025 Ben Nguyen", x=W/2, y=590, size=14,
+                   anchor="middle", weight="normal", fill="#eee", font=spec.font or "Arial")
+
+# --- layer graph ---
+@dataclass(frozen=True)
+class LayerNode:
+    name: str
+    clip: str | None
+    deps: tuple[str, ...]                # JerseySpec fields the layer reads
+    build: Callable[..., str]            # (spec, detail), plus the view for layers spanning both
+
+    @property
+    def view(self) -> str | None:
+        """
+        The only view a clipped layer is drawn in; None for layers spanning both views.
+        """
+        return CLIP_VIEWS.get(self.clip)
+
+    def render(self, spec: JerseySpec, detail: Detail, view: str) -> RenderedLayer:
+        markup = self.build(spec, detail, view) if self.view is None else self.build(spec, detail)
+        return RenderedLayer(self.name, self.clip, markup)
+
+# the tertiary color falls back to pattern_color, so everything drawn in it reads both
+_TER = ("tertiary", "pattern_color")
+_TEXT = ("font",) + _TER
+
+# draw order, bottom to top
+LAYER_GRAPH: tuple[LayerNode, ...] = (
+    LayerNode("shorts", None, ("primary", "secondary"), _shorts),
+    LayerNode("body", None, ("primary",), _body),
+    LayerNode("pattern-front", "frontJerseyClip", ("pattern", "pattern_color", "primary"), _pattern_front),
+    LayerNode("pattern-back", "backJerseyClip", ("pattern", "pattern_color", "primary"), _pattern_back),
+    LayerNode("trims", None, _TER, _trims),
+    LayerNode("outlines", None, (), _outlines),
+    LayerNode("sponsor-front", "frontJerseyClip", ("sponsor",) + _TEXT, _front_sponsor),
+    LayerNode("logo", "frontJerseyClip", (), _logo),
+    LayerNode("sponsor-back", "backJerseyClip", ("sponsor",) + _TEXT, _back_sponsor),
+    LayerNode("player", "backJerseyClip", ("player",) + _TEXT, _back_player),
+    LayerNode("number", "backJerseyClip", ("number",) + _TEXT, _back_number),
+    LayerNode("team", "backJerseyClip", ("team",) + _TEXT, _back_team),
+    LayerNode("credit", None, ("font",), _credit),
+)
+
+def _freeze(value):
+    """
+    Hashable form of a spec field value (TextPlacement and pattern args are mutable).
+    """
+    if isinstance(value, TextPlacement):
+        return (value.text, value.x, value.y, value.size)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def layers_in_view(view: str, graph: tuple[LayerNode, ...] = LAYER_GRAPH) -> tuple[LayerNode, ...]:
+    """
+    The layers drawn in `view`; the other view's clipped layers are skipped entirely.
+    """
+    viewbox(view)  # raises ValueError for an unknown view
+    return tuple(node for node in graph if node.view is None or view in ("both", node.view))
+
+def layer_inputs(node: LayerNode, spec: JerseySpec) -> tuple:
+    """
+    The memo key of a layer: the values of exactly the spec fields it reads.
+    """
+    return tuple(_freeze(getattr(spec, field)) for field in node.deps)
+
+
+class LayerMemo:
+    """
+    Keeps the last build of every layer together with its inputs, so a render
+    only rebuilds the layers whose spec fields changed.
+
+    After each render `last` maps layer name -> (hit, ms), and `hits` / `misses`
+    count per layer over the memo's lifetime.
+    """
+
+    def __init__(self, graph: tuple[LayerNode, ...] = LAYER_GRAPH):
+        self.graph = graph
+        self._built: dict[str, tuple[tuple, RenderedLayer]] = {}
+        self.last: dict[str, tuple[bool, float]] = {}
+        self.hits: dict[str, int] = {node.name: 0 for node in graph}
+        self.misses: dict[str, int] = {node.name: 0 for node in graph}
+
+    def render(self, spec: JerseySpec, detail: Detail = FULL, view: str = "both") -> list[RenderedLayer]:
+        layers: list[RenderedLayer] = []
+        last: dict[str, tuple[bool, float]] = {}
+        for node in layers_in_view(view, self.graph):
+            t0 = time.perf_counter()
+            key = (detail.name, view) + layer_inputs(node, spec)
+            cached = self._built.get(node.name)
+            hit = cached is not None and cached[0] == key
+            if hit:
+                layer = cached[1]
+                self.hits[node.name] += 1
+            else:
+                layer = node.render(spec, detail, view)
+                self._built[node.name] = (key, layer)
+                self.misses[node.name] += 1
+            last[node.name] = (hit, (time.perf_counter() - t0) * 1000)
+            layers.append(layer)
+        self.last = last
+        return layers
+
+    def hit_names(self) -> list[str]:
+        """
+        Names of the layers reused by the last render.
+        """
+        return [name for name, (hit, _) in self.last.items() if hit]
+
+    def describe(self) -> list[dict]:
+        """
+        The graph with the outcome of the last render, one row per layer.
+        """
+        rows = []
+        for node in self.graph:
+            hit, ms = self.last.get(node.name, (False, 0.0))
+            rows.append({
+                "layer": node.name,
+                "deps": list(node.deps),
+                "hit": hit,
+                "ms": round(ms, 3),
+                "hits": self.hits[node.name],
+                "misses": self.misses[node.name],
+            })
+        return rows
+
+
+def render_layers(
+    spec: JerseySpec,
+    opts: RenderOptions | None = None,
+    memo: LayerMemo | None = None,
+) -> list[RenderedLayer]:
+    """
+    Renders the jersey as an ordered list of named layers (bottom to top).
+    With a LayerMemo, layers whose inputs did not change since its last render are reused.
+    """
+    opts = opts or RenderOptions()
+    detail = opts.detail
+    if memo is not None:
+        return memo.render(spec, detail, opts.view)
+    return [node.render(spec, detail, opts.view) for node in layers_in_view(opts.view)]
+
+def layer_markup(layer: RenderedLayer) -> str:
+    """
+    Returns the <g> wrapper for one layer, addressable by its stable id and content hash.
+    """
+    return f'<g id="layer-{layer.name}" data-hash="{layer.hash}">\n{layer.markup}\n</g>'
+
+def diff_layers(layers: list[RenderedLayer], known: dict[str, str]) -> list[RenderedLayer]:
+    """
+    Returns the layers whose hash differs from `known` (layer name -> hash the client holds).
+    """
+    return [layer for layer in layers if known.get(layer.name) != layer.hash]
+
+def clip_groups(layers: list[RenderedLayer], markup: Callable[[RenderedLayer], str] = layer_markup) -> list[str]:
+    """
+    Lines of the layers' markup, consecutive layers sharing a clip path wrapped in one clipped group.
+    """
+    body: list[str] = []
+    open_clip = None
+    for layer in layers:
+        if layer.clip != open_clip:
+            if open_clip is not None:
+                body.append('    </g>\n')
+            if layer.clip is not None:
+                body.append(f'    <g clip-path="url(#{layer.clip})">\n')
+            open_clip = layer.clip
+        body.append(f'    {markup(layer)}\n')
+    if open_clip is not None:
+        body.append('    </g>\n')
+    return body
+
+# not referenced by any layer; only kept in full renders so their output stays unchanged
+_SHORTS_CLIPS = f'''
+
+        <clipPath id="frontShortsClip">
+        <path d="{FRONT_SHORTS_PATH}"/>
+        </clipPath>
+        <clipPath id="backShortsClip">
+        <path d="{BACK_SHORTS_PATH}"/>
+        </clipPath>'''
+
+@stage("assemble")
+def assemble_svg(layers: list[RenderedLayer], opts: RenderOptions | None = None) -> str:
+    """
+    Wraps rendered layers into the final SVG document.
+    Consecutive layers sharing a clip path share one clipped group.
+    """
+    opts = opts or RenderOptions()
+    detail = opts.detail
+    vx, vy, vw, vh = viewbox(opts.view)
+    both = opts.view == "both"
+
+    # --- clipped pattern layer (mask to jersey shape) ---
+    clips = "".join(
+        f'''
+        <clipPath id="{clip}">
+        <path d="{_geom(path, detail)}"/>
+        </clipPath>'''
+        for clip, path in CLIP_PATHS.items() if both or CLIP_VIEWS[clip] == opts.view
+    )
+    defs = f'''
+      <defs>{clips}{_SHORTS_CLIPS if detail is FULL and both else ""}
+    </defs>
+    '''
+
     debug = (
-        f'<rect x="0" y="0" width="{W}" height="{H}" fill="none" stroke="magenta" stroke-dasharray="4,4"/>'
+        f'<rect x="{vx}" y="{vy}" width="{vw}" height="{vh}" fill="none" stroke="magenta" stroke-dasharray="4,4"/>'
         if (opts and opts.show_debug) else ""
     )
 
@@ -299,48 +601,40 @@ def render_svg(spec: JerseySpec, opts: RenderOptions | None = None) -> str:
     '</metadata>'
     )
 
-    credit = _svg_text("© 2025 Ben Nguyen", x=W/2, y=590, size=14,
-                   anchor="middle", weight="normal", fill="#eee", font=spec.font or "Arial")
-    
-    font_style_block = _font_block()
+    # without the embedded font, text falls back to a page-level @font-face or a system font
+    font_style_block = _font_block() if detail.embed_font else ""
+
+    body = clip_groups(layers)
 
     #--- final assembly ---
     return (
         f"{SVG_HEADER}\n"
         f'<svg xmlns="http://www.w3.org/2000/svg" '
-        f'viewBox="0 0 {W} {H}" width="{W}" height="{H}">\n'
-        f'{font_style_block}\n' 
+        f'viewBox="{vx} {vy} {vw} {vh}" width="{vw}" height="{vh}">\n'
+        f'{font_style_block}\n'
         f'  {meta}\n'
-        f'  <rect x="0" y="0" width="{W}" height="{H}" fill="#fff"/>\n'
+        f'  <rect x="{vx}" y="{vy}" width="{vw}" height="{vh}" fill="#fff"/>\n'
         f'  {defs}\n'
         f'  {debug}\n'
         f'  <g id="jersey">\n'
-        f'    {front_shorts_fill}\n'
-        f'    {front_short_decor}\n'
-        f'    {back_shorts_fill}\n'
-        f'    {back_short_decor}\n'
-        f'    {shorts_outlines}\n'
-        f'    {front_jersey_fill}\n'
-        f'    {back_jersey_fill}\n'
-        f'    {front_jersey_pattern}\n'
-        f'    {back_jersey_pattern}\n'
-        f'    {trims}\n'
-        f'    {jersey_outlines}\n'
-        f'    <g clip-path="url(#frontJerseyClip)">\n'
-        f'      {front_sponsor}\n'
-        f'      {logo_decor}\n'
-        f'    </g>\n'
-        f'    <g clip-path="url(#backJerseyClip)">\n'
-        f'      {back_sponsor}\n'
-        f'      {back_player}\n'
-        f'      {back_number}\n'
-        f'      {back_team}\n'
-        f'    </g>\n'
-        f'    {credit}\n'
+        f'{"".join(body)}'
         f'  </g>\n'
         f'</svg>\n'
     )
 
+def render_svg(
+    spec: JerseySpec,
+    opts: RenderOptions | None = None,
+    memo: LayerMemo | None = None,
+) -> str:
+    """
+    Renders the JerseySpec into an SVG string.
+    `memo` lets repeated renders reuse unchanged layers (see LayerMemo).
+    """
+    # Use default options if none provided
+    opts = opts or RenderOptions()
+    return assemble_svg(render_layers(spec, opts, memo=memo), opts)
+
 def _estimate_text_width(txt: str, font_size: float) -> float:
     """
     Estimates the width of the given text string at the specified font size.
@@ -440,9 +734,11 @@ def _escape(s: str) -> str:
          .replace("'", "&apos;")
     )
 
-def _pattern_layer(spec: JerseySpec, prim: str, sec: str) -> str:
+@stage("pattern", detail=lambda spec, *_: spec.pattern[0].lower() if spec.pattern else "none")
+def _pattern_layer(spec: JerseySpec, prim: str, sec: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates the SVG for the specified pattern layer of the jersey.
+    With a `region`, elements that would be clipped away entirely are left out.
     """
     if not spec.pattern:
         return ""
@@ -452,12 +748,12 @@ def _pattern_layer(spec: JerseySpec, prim: str, sec: str) -> str:
     if ident == "stripes":
         count = int(args[0]) if len(args) >= 1 else 6
         thickness = int(args[1]) if len(args) >= 2 else 20
-        return _vertical_stripes(count * 2, thickness, sec)
+        return _vertical_stripes(count * 2, thickness, sec, region)
 
     if ident == "hoops":
         count = int(args[0]) if len(args) >= 1 else 6
         thickness = int(args[1]) if len(args) >= 2 else 20
-        return _horizontal_hoops(count, thickness, sec)
+        return _horizontal_hoops(count, thickness, sec, region)
 
     if ident == "sash":
         angle = int(args[0]) if len(args) >= 1 else 30
@@ -467,12 +763,12 @@ def _pattern_layer(spec: JerseySpec, prim: str, sec: str) -> str:
     if ident == "checker":
         cw = int(args[0]) if len(args) >= 1 else 10
         ch = int(args[1]) if len(args) >= 2 else 10
-        return _checker(cw, ch, sec)
+        return _checker(cw, ch, sec, detail, region)
     
     if ident == "gradient":
         direction = args[0] if len(args) >= 1 else "down"
         intensity = int(args[1]) if len(args) >= 2 else 70
-        return _gradient(direction, intensity, sec)
+        return _gradient(direction, intensity, sec, region)
     
     if ident == "brush":
         thickness = args[0] if len(args) >= 1 else 50
@@ -482,22 +778,24 @@ def _pattern_layer(spec: JerseySpec, prim: str, sec: str) -> str:
     if ident == "waves":
         amplitude = args[0] if len(args) >= 1 else 10
         wavelength = args[1] if len(args) >= 2 else 40
-        return _waves(amplitude, wavelength, sec)
+        return _waves(amplitude, wavelength, sec, detail, region)
     
     if ident == "camo":
         cell = args[0] if len(args) >= 1 else 12
         variance = args[1] if len(args) >= 2 else 50
-        return _camo(cell, variance, sec, prim)
+        if len(args) >= 3 and args[2] == "blocks":
+            return _camo_blocks(cell, variance, sec, prim, detail, region)
+        return _camo(cell, variance, sec, prim, detail, region)
     
     if ident == "halftone_dots":
         dot_size = args[0] if len(args) >= 1 else 6
         spacing = args[1] if len(args) >= 2 else 12
-        return _halftone_dots(dot_size, spacing, sec)
+        return _halftone_dots(dot_size, spacing, sec, detail, region)
 
     if ident == "topo":
         levels = args[0] if len(args) >= 1 else 12
         base_gap = args[1] if len(args) >= 2 else 18
-        return _topo(levels, base_gap, sec)
+        return _topo(levels, base_gap, sec, detail, region)
     
     if ident == "half_split":
         direction = args[0] if len(args) >= 1 else "vertical"
@@ -509,7 +807,19 @@ def _pattern_layer(spec: JerseySpec, prim: str, sec: str) -> str:
     return ""  # unknown pattern: ignore
 
 #--- pattern implementations ---
-def _vertical_stripes(count: int, thickness: int, color: str) -> str:
+def _shows(region: ClipRegion | None, x: float, y: float, w: float, h: float) -> bool:
+    """
+    Whether an element with bounding box (x, y, w, h) can show through the clip `region`.
+    """
+    return region is None or region.visible(x, y, x + w, y + h)
+
+def _row_span(region: ClipRegion | None, y0: float, y1: float) -> tuple[float, float] | None:
+    """
+    The x-range of the band y0..y1 that can show through `region` (None: nothing can).
+    """
+    return (-math.inf, math.inf) if region is None else region.span(y0, y1)
+
+def _vertical_stripes(count: int, thickness: int, color: str, region: ClipRegion | None = None) -> str:
     """
     Generates vertical stripes for the jersey.
     """
@@ -520,10 +830,12 @@ def _vertical_stripes(count: int, thickness: int, color: str) -> str:
     # Generate stripes
     for i in range(count):
         x = left + i * gap + (gap - thickness) / 2
+        if not _shows(region, x, top, thickness, bottom - top):
+            continue
         rects.append(f'<rect x="{x:.1f}" y="{top}" width="{thickness}" height="{bottom-top}" fill="{color}" opacity="1"/>')
     return "\n".join(rects)
 
-def _horizontal_hoops(count: int, thickness: int, color: str) -> str:
+def _horizontal_hoops(count: int, thickness: int, color: str, region: ClipRegion | None = None) -> str:
     """
     Generates horizontal hoops for the jersey.
     """
@@ -534,6 +846,8 @@ def _horizontal_hoops(count: int, thickness: int, color: str) -> str:
     # Generate hoops
     for i in range(count):
         y = top + i * gap + (gap - thickness) / 2
+        if not _shows(region, left, y, right - left, thickness):
+            continue
         rects.append(f'<rect x="{left}" y="{y:.1f}" width="{right-left}" height="{thickness}" fill="{color}" opacity="1"/>')
     return "\n".join(rects)
 
@@ -551,7 +865,7 @@ def _sash(angle: int, width: int, color: str) -> str:
         f'</g>'
     )
 
-def _checker(cw: int, ch: int, color: str) -> str:
+def _checker(cw: int, ch: int, color: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates a checkerboard pattern for the jersey.
     """
@@ -560,23 +874,32 @@ def _checker(cw: int, ch: int, color: str) -> str:
     cw = max(1, cw) # ensure positive
     ch = max(1, ch) # ensure positive
 
+    if min(cw, ch) < detail.blend_below: # too fine to resolve: half the area is covered
+        return f'<rect x="{left}" y="{top}" width="{right-left}" height="{bottom-top}" fill="{color}" opacity="0.5"/>'
+
     cols = (right - left) // cw + 2 # extra to cover edges
     rows = (bottom - top) // ch + 2 # extra to cover edges
 
     rects: list[str] = []
     # Generate checker squares
     for r in range(rows):
-        for c in range(cols):
+        y = top + r * ch
+        span = _row_span(region, y, y + ch)
+        if span is None:
+            continue
+        # only the columns reaching into the visible part of the row
+        c0 = 0 if span[0] == -math.inf else max(0, int((span[0] - left) // cw) - 1)
+        c1 = cols - 1 if span[1] == math.inf else min(cols - 1, int((span[1] - left) // cw))
+        for c in range(c0, c1 + 1):
             if (r + c) % 2 == 0: # alternate squares
                 x = left + c * cw
-                y = top + r * ch
                 rects.append(
                     f'<rect x="{x}" y="{y}" width="{cw}" height="{ch}" '
                     f'fill="{color}" opacity="1"/>'
                 )
     return "\n".join(rects)
 
-def _gradient(direction: str, intensity: int, color: str) -> str:
+def _gradient(direction: str, intensity: int, color: str, region: ClipRegion | None = None) -> str:
     """
     Generates a gradient pattern for the jersey
     """
@@ -595,6 +918,8 @@ def _gradient(direction: str, intensity: int, color: str) -> str:
             alpha = (1 - center_pos) * (intensity / 100)
             y = (H / stops) * i
 
+        if not _shows(region, 0, y, W, H / stops):
+            continue
         layers.append(
             f'<rect x="0" y="{y:.1f}" width="{W}" height="{H/stops:.1f}" '
             f'fill="{color}" opacity="{alpha:.3f}"/>'
@@ -652,31 +977,43 @@ def _brush(thickness: int, roughness: int, color: str) -> str:
 
     return "\n".join(strokes)
 
-def _waves(amplitude: int, wavelength: int, color: str) -> str:
+def _waves(amplitude: int, wavelength: int, color: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates a wave pattern for the jersey.
     """
     amplitude = max(1, amplitude)
     wavelength = max(4, wavelength)
 
-    dx = wavelength / 16
+    dx = wavelength / 16 * detail.sampling
 
     row_gap = amplitude * 2
     rows = int(H / row_gap) + 2
 
+    if row_gap < detail.blend_below: # rows of 2px lines this close read as a tint
+        coverage = min(1.0, 2 / row_gap) * 0.9
+        return f'<rect x="0" y="0" width="{W}" height="{H}" fill="{color}" opacity="{coverage:.3f}"/>'
+
     paths: list[str] = []
 
     # Generate wave paths
     for row in range(rows):
         base_y = row * row_gap + amplitude
+        span = _row_span(region, base_y - amplitude - 2, base_y + amplitude + 2)
+        if span is None:
+            continue
+        # only the stretch over the jersey body is drawn, plus one point and the stroke width either side
+        x0, x1 = span[0] - dx - 2, span[1] + dx + 2
         x = 0.0
         y = base_y
-        d_parts: list[str] = [f"M {x:.1f},{y:.1f}"]
+        d_parts: list[str] = [f"M {x:.1f},{y:.1f}"] if x >= x0 else []
 
         # Create wave using sine function
         while x <= W + dx:
-            y = base_y + amplitude * math.sin(2 * math.pi * x / wavelength)
-            d_parts.append(f"L {x:.1f},{y:.1f}")
+            if x >= x0:
+                if x > x1:
+                    break
+                y = base_y + amplitude * math.sin(2 * math.pi * x / wavelength)
+                d_parts.append(f"{'L' if d_parts else 'M'} {x:.1f},{y:.1f}")
             x += dx
 
         d = " ".join(d_parts)
@@ -687,12 +1024,34 @@ def _waves(amplitude: int, wavelength: int, color: str) -> str:
 
     return "\n".join(paths)
 
-def _camo(cell: int, variance: int, color: str, base: str) -> str:
+def _camo(cell: int, variance: int, color: str, base: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates a camouflage pattern for the jersey.
     """
-    cell = max(3, cell)
+    cell = max(3, cell, math.ceil(detail.blend_below)) # coarser grid when cells would be unresolvable
     variance = max(0, min(100, variance))
+
+    spans: dict[tuple[int, int], tuple[float, float] | None] = {}
+    rects: list[str] = []
+    for y, x, w, h, fill, opacity in _camo_blobs(cell, variance, color, base):
+        span = spans.get((y, h), False)
+        if span is False:
+            span = spans[y, h] = _row_span(region, y, y + h)
+        if span is None or x + w < span[0] or x > span[1]:
+            continue
+        rects.append(
+            f'<rect x="{x}" y="{y}" width="{w}" height="{h}" '
+            f'fill="{fill}" opacity="{opacity:.2f}"/>'
+        )
+
+    return "\n".join(rects)
+
+@lru_cache(maxsize=8)
+def _camo_blobs(cell: int, variance: int, color: str, base: str) -> tuple[tuple[int, int, int, int, str, float], ...]:
+    """
+    Every blob of the classic camo as (y, x, width, height, fill, opacity), in drawing order.
+    Drawn once per design and shared by the front and back copies of the pattern.
+    """
     prob = variance / 100.0 
 
     cols = W // cell + 2
@@ -700,34 +1059,109 @@ def _camo(cell: int, variance: int, color: str, base: str) -> str:
 
     seed = f"camo-{cell}-{variance}-{color}-{base}" # unique seed
     rng = random.Random(seed) # reproducible randomness
+    rand, randrange = rng.random, rng.randrange # hot loop: same draws, fewer lookups
 
-    rects: list[str] = []
+    blobs: list[tuple[int, int, int, int, str, float]] = []
 
     # Generate camo blobs
     for r in range(rows):
+        y = r * cell
         for c in range(cols):
             # Decide randomly whether to place a blob
-            if rng.random() < prob:
-                w_cells = 1 + rng.randrange(3) # 1 to 3 cells wide
-                h_cells = 1 + rng.randrange(2) # 1 to 2 cells high
+            if rand() < prob:
+                w_cells = 1 + randrange(3) # 1 to 3 cells wide
+                h_cells = 1 + randrange(2) # 1 to 2 cells high
 
                 x = c * cell
-                y = r * cell
                 w = w_cells * cell
                 h = h_cells * cell
 
-                fill = color if rng.random() < 0.7 else base
+                fill = color if rand() < 0.7 else base
 
-                opacity = 0.55 + 0.35 * rng.random()
+                opacity = 0.55 + 0.35 * rand()
 
-                rects.append(
-                    f'<rect x="{x}" y="{y}" width="{w}" height="{h}" '
-                    f'fill="{fill}" opacity="{opacity:.2f}"/>'
-                )
+                blobs.append((y, x, w, h, fill, opacity))
 
-    return "\n".join(rects)
+    return tuple(blobs)
+
+CAMO_OPACITIES = (0.55, 0.67, 0.78, 0.90) # camo(..., blocks) tones; few, so neighbouring cells can merge
 
-def _halftone_dots(dot_size: int, spacing: int, color: str) -> str:
+@lru_cache(maxsize=8)
+def _camo_grid(cell: int, variance: int, color: str, base: str) -> tuple[tuple[int, ...], int]:
+    """
+    The painted camo grid as (cells, row stride); 0 is empty, 1 + fill * tones + tone a blob.
+    Shared by the front and back copies of the pattern.
+    """
+    prob = variance / 100.0
+    cols = W // cell + 2
+    rows = H // cell + 2
+    stride = cols + 2 # blobs at the right edge spill into two spare columns, not the next row
+
+    seed = f"camo-{cell}-{variance}-{color}-{base}" # unique seed
+    rng = random.Random(seed) # reproducible randomness
+
+    # all random decisions in bulk: which cells start a blob, then size and tone per blob
+    starts = [r * stride + c for r in range(rows) for c in range(cols) if rng.random() < prob]
+    n = len(starts)
+    widths = rng.choices((1, 2, 3), k=n)
+    tall = rng.choices((False, True), k=n)
+    fills = rng.choices((0, 1), weights=(7, 3), k=n) # 70% pattern color, 30% base
+    tones = rng.choices(range(len(CAMO_OPACITIES)), k=n)
+
+    grid = [0] * ((rows + 1) * stride) # and a spare row below
+    for i, w, t, f, tone in zip(starts, widths, tall, fills, tones):
+        run = [1 + f * len(CAMO_OPACITIES) + tone] * w
+        grid[i:i + w] = run
+        if t:
+            grid[i + stride:i + stride + w] = run
+    return tuple(grid), stride
+
+def _camo_blocks(cell: int, variance: int, color: str, base: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
+    """
+    Generates the blocky camouflage of camo(cell, variance, blocks): quicker and far smaller
+    than _camo, but a different picture for the same arguments.
+
+    Blobs of 1-3 x 1-2 cells are painted onto a grid (later blobs cover earlier ones).
+    Runs of equal cells, merged down through rows where the same run repeats, are drawn
+    as rectangles of one path per color and tone.
+    """
+    cell = max(3, cell, math.ceil(detail.blend_below)) # coarser grid when cells would be unresolvable
+    variance = max(0, min(100, variance))
+
+    cols = W // cell + 2
+    rows = H // cell + 2
+    grid, stride = _camo_grid(cell, variance, color, base)
+
+    blocks: dict[int, list[str]] = {} # key -> subpaths
+    open_runs: dict[tuple[int, int, int], int] = {} # (c0, c1, key) -> first row, for runs still growing down
+
+    for r in range(rows + 1):
+        runs: dict[tuple[int, int, int], int] = {}
+        span = _row_span(region, r * cell, (r + 1) * cell) if r < rows else None
+        if span is not None:
+            # only the cells reaching into the visible part of the row
+            lo = 0 if span[0] == -math.inf else max(0, int(span[0] // cell) - 1)
+            hi = cols if span[1] == math.inf else min(cols, int(span[1] // cell) + 1)
+            c = lo
+            for key, same in groupby(grid[r * stride + lo:r * stride + hi]):
+                end = c + len(list(same))
+                if key:
+                    run = (c, end, key)
+                    runs[run] = open_runs.pop(run, r)
+                c = end
+        for (c0, c1, key), r0 in open_runs.items(): # runs that did not continue into this row
+            w = (c1 - c0) * cell
+            blocks.setdefault(key, []).append(f"M{c0 * cell} {r0 * cell}h{w}v{(r - r0) * cell}h-{w}z")
+        open_runs = runs
+
+    colors = (color, base)
+    paths: list[str] = []
+    for key in sorted(blocks):
+        f, t = divmod(key - 1, len(CAMO_OPACITIES))
+        paths.append(f'<path d="{"".join(blocks[key])}" fill="{colors[f]}" opacity="{CAMO_OPACITIES[t]:.2f}"/>')
+    return "\n".join(paths)
+
+def _halftone_dots(dot_size: int, spacing: int, color: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates a halftone dot pattern for the jersey.
     """
@@ -735,6 +1169,9 @@ def _halftone_dots(dot_size: int, spacing: int, color: str) -> str:
     spacing = max(dot_size, spacing)
 
     radius = dot_size / 2 # radius of each dot
+    # dots too small or too dense to resolve: one band per row at the dots' average coverage
+    blend = spacing < detail.blend_below or dot_size < detail.min_feature
+    coverage = min(1.0, math.pi * radius * radius / (spacing * spacing))
 
     left, right, top, bottom = 0, W, 0, H
     width  = right - left
@@ -752,9 +1189,20 @@ def _halftone_dots(dot_size: int, spacing: int, color: str) -> str:
         alpha = 0.2 + 0.8 * t
 
         cy = top + r * spacing + spacing / 2
+        span = _row_span(region, cy - spacing / 2, cy + spacing / 2)
+        if span is None:
+            continue
+        if blend:
+            circles.append(
+                f'<rect x="{left}" y="{top + r * spacing:.1f}" width="{width}" height="{spacing}" '
+                f'fill="{color}" opacity="{alpha * coverage:.3f}"/>'
+            )
+            continue
         # Generate each dot in the row
         for c in range(cols):
             cx = left + c * spacing + spacing / 2
+            if cx + radius < span[0] or cx - radius > span[1]:
+                continue
 
             circles.append(
                 f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{radius:.1f}" '
@@ -763,7 +1211,7 @@ def _halftone_dots(dot_size: int, spacing: int, color: str) -> str:
 
     return "\n".join(circles)
 
-def _topo(levels: int, base_gap: int, color: str) -> str:
+def _topo(levels: int, base_gap: int, color: str, detail: Detail = FULL, region: ClipRegion | None = None) -> str:
     """
     Generates a topographic pattern for the jersey.
     """
@@ -776,23 +1224,25 @@ def _topo(levels: int, base_gap: int, color: str) -> str:
     levels = max(1, levels) # ensure at least 1 level
 
     paths: list[str] = []
+    rng = random.Random(f"topo-{levels}-{base_gap}-{color}") # reproducible randomness
 
     # Generate contour lines
     for ci, (cx, cy) in enumerate(centers):
-        seed = random.random() * 1000 + ci * 317.0 # unique seed for each center
+        seed = rng.random() * 1000 + ci * 317.0 # unique seed for each center
 
         radii: list[float] = []
-        r = random.uniform(base_gap * 0.4, base_gap * 1.4) # initial radius
+        r = rng.uniform(base_gap * 0.4, base_gap * 1.4) # initial radius
         # Generate radii for contour levels
         for _ in range(levels):
             radii.append(min(r, max_r * 1.2))
-            r += random.uniform(base_gap * 0.6, base_gap * 1.8)
+            r += rng.uniform(base_gap * 0.6, base_gap * 1.8)
         # Create contour lines for each radius
         for level, base_r in enumerate(radii, start=1):
             d_parts: list[str] = []
+            points: list[tuple[float, float]] = []
             first = True
             # Generate distorted circle for contour line
-            for deg in range(0, 360, 2):
+            for deg in range(0, 360, 2 * detail.sampling):
                 th = math.radians(deg)
 
                 x0 = math.cos(th)
@@ -809,6 +1259,7 @@ def _topo(levels: int, base_gap: int, color: str) -> str:
 
                 x = cx + r_cur * math.cos(th)
                 y = cy + r_cur * math.sin(th)
+                points.append((x, y))
 
                 if first:
                     d_parts.append(f"M {x:.1f},{y:.1f}")
@@ -818,9 +1269,15 @@ def _topo(levels: int, base_gap: int, color: str) -> str:
 
             d = " ".join(d_parts) + " Z"
 
-            thk = 0.30 + random.random() * 1.9 
-            op  = 0.65 + random.random() * 0.30
+            thk = 0.30 + rng.random() * 1.9
+            op  = 0.65 + rng.random() * 0.30
 
+            # a contour is hidden when every run of its outline is (checked after the draws above)
+            if region is not None and not any(
+                region.visible(min(xs) - thk, min(ys) - thk, max(xs) + thk, max(ys) + thk)
+                for xs, ys in (zip(*(points + points[:1])[k:k + 9]) for k in range(0, len(points), 8))
+            ):
+                continue
             paths.append(
                 f'<path d="{d}" fill="none" stroke="{color}" '
                 f'stroke-width="{thk:.2f}" opacity="{op:.2f}"/>'
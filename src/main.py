@@ -1,12 +1,25 @@
 import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from .lexer.tokenizer import Lexer
+from .lexer.tokenizer import Lexer, LexerError
 from .grammar import print_grammar
 from .parser.parser import Parser
 from .ast.nodes import JerseyNode
 from .semantic.checks import validate_jersey, SemanticError
-from .interpreter.svg import render_svg, RenderOptions
+from .interpreter.svg import render_svg, RenderOptions, LODS, VIEWBOXES
+from .interpreter.sheet import render_sheet
+from .interpreter.json_to_dsl import jersey_json_to_dsl
+from .incremental import IncrementalCompiler
+from .profiling import collect, collect_memory, collapsed_stacks, timed
+from .sampler import Sampler, SamplerConfig, parse_weights
 
 
 def _lex(text: str):
@@ -34,6 +47,202 @@ def parse_file(text: str) -> JerseyNode:
     parser = Parser(tokens)
     return parser.parse()
 
+def compile_source(text: str, opts: RenderOptions | None = None) -> str:
+    """
+    Compile jersey DSL text all the way to an SVG string.
+    """
+    spec = validate_jersey(parse_file(text))
+    return render_svg(spec, opts or RenderOptions(show_debug=False))
+
+def compile_sheet(texts: list[str], opts: RenderOptions | None = None, columns: int | None = None) -> str:
+    """
+    Compile several jersey DSL sources into one sprite-sheet SVG.
+    """
+    specs = [validate_jersey(parse_file(text)) for text in texts]
+    return render_sheet(specs, opts, columns=columns)
+
+def _compile_staged(text: str, opts: RenderOptions | None = None) -> str:
+    """
+    compile_source() with the lex / parse / validate stages timed, for --profile and --memprofile.
+    """
+    with timed("lex"):
+        toks = Lexer(text).tokens()
+    with timed("parse"):
+        ast = Parser(toks).parse()
+    with timed("validate"):
+        spec = validate_jersey(ast)
+    return render_svg(spec, opts or RenderOptions(show_debug=False))
+
+def profile_source(text: str, repeat: int = 1, out=None, err=None, opts: RenderOptions | None = None) -> str:
+    """
+    Compile `text` `repeat` times under cProfile with stage timings on.
+    Stage timings and the top cProfile entries go to `err` (stderr); the profile
+    goes to `out` (stdout) as collapsed stacks for flamegraph.pl / speedscope / inferno.
+    Returns the SVG.
+    """
+    out = out or sys.stdout
+    err = err or sys.stderr
+    repeat = max(1, repeat)
+    prof = cProfile.Profile()
+    with collect() as timings:
+        prof.enable()
+        try:
+            for _ in range(repeat):
+                svg = _compile_staged(text, opts)
+        finally:
+            prof.disable()
+
+    stats = pstats.Stats(prof, stream=err)
+    err.write(f"=== stage timings ({repeat} run{'s' if repeat > 1 else ''}) ===\n{timings.format()}\n\n")
+    stats.sort_stats("cumulative").print_stats(15)
+    for line in collapsed_stacks(stats):
+        out.write(line + "\n")
+    out.flush()
+    return svg
+
+def memprofile_source(text: str, err=None, opts: RenderOptions | None = None) -> str:
+    """
+    Compile `text` once with tracemalloc on and print peak / retained memory
+    per stage and per pattern, with the top allocation sites, to `err` (stderr).
+    Returns the SVG.
+    """
+    err = err or sys.stderr
+    compile_source(text, opts)  # warm-up: font loading and imports are not part of a compile
+    with collect_memory() as profile:
+        svg = _compile_staged(text, opts)
+    err.write(f"=== memory per stage ===\n{profile.format_memory()}\n\n")
+    err.write(f"=== stage timings (with tracemalloc overhead) ===\n{profile.format()}\n")
+    return svg
+
+def _error_message(e: Exception) -> str:
+    """
+    Turn a pipeline exception into the same kind of message the web API returns.
+    """
+    if isinstance(e, LexerError):
+        return f"Lexer error: {e}"
+    if isinstance(e, SemanticError):
+        return f"Semantic error: {e}"
+    if isinstance(e, SyntaxError):
+        return f"Syntax error: {e}"
+    if isinstance(e, json.JSONDecodeError):
+        return f"Invalid JSON: {e}"
+    if isinstance(e, (KeyError, TypeError, ValueError)):
+        return f"Invalid design: {e}"
+    return f"Internal error: {e}"
+
+def _stream_one(line: str, opts: RenderOptions | None = None) -> str:
+    """
+    Compile one NDJSON request line and return one NDJSON result line.
+    A request is either {"source": "<dsl>"} or an AI-style design object
+    (the JSON that jersey_json_to_dsl() understands). An optional "id" is echoed back.
+    """
+    result: dict = {}
+    try:
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError("each line must be a JSON object")
+        if "id" in data:
+            result["id"] = data["id"]
+        source = data.get("source")
+        if not isinstance(source, str):
+            source = jersey_json_to_dsl(data)
+        result["ok"] = True
+        result["svg"] = compile_source(source, opts)
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = _error_message(e)
+    return json.dumps(result, ensure_ascii=False)
+
+def run_stream(workers: int = 1, buffer: int = 0, inp=None, out=None, opts: RenderOptions | None = None) -> int:
+    """
+    Read NDJSON requests from stdin and write one NDJSON result per line to stdout.
+    With workers > 1 the lines are compiled in a process pool, but results are
+    still written in input order. At most `buffer` lines are in flight at once,
+    so memory stays bounded no matter how long the input stream is.
+    Returns the number of lines processed.
+    """
+    inp = inp or sys.stdin
+    out = out or sys.stdout
+    workers = max(1, workers)
+    buffer = max(1, buffer or workers * 4)
+
+    def emit(res: str):
+        out.write(res + "\n")
+        out.flush()
+
+    count = 0
+    if workers == 1:
+        for line in inp:
+            if not line.strip():
+                continue
+            emit(_stream_one(line, opts))
+            count += 1
+        return count
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for line in inp:
+            if not line.strip():
+                continue
+            pending.append(pool.submit(_stream_one, line, opts))
+            count += 1
+            # block on the oldest job once the window is full
+            if len(pending) >= buffer:
+                emit(pending.popleft().result())
+            # flush whatever is already finished at the head, in order
+            while pending and pending[0].done():
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return count
+
+def emit_samples(count: int, seed: int = 0, start: int = 0, patterns: str | None = None, out=None) -> int:
+    """
+    Write `count` random designs as NDJSON requests ({"id": i, "source": "..."}),
+    ready to pipe into --stream. The same seed and start always give the same lines.
+    """
+    out = out or sys.stdout
+    config = SamplerConfig(patterns=parse_weights(patterns)) if patterns else SamplerConfig()
+    sampler = Sampler(seed=seed, config=config)
+    for i in range(start, start + count):
+        out.write(json.dumps({"id": i, "source": sampler.dsl(i)}) + "\n")
+    out.flush()
+    return count
+
+def watch_file(path: Path, out_svg: Path, interval: float = 0.25, opts: RenderOptions | None = None):
+    """
+    Rebuild the SVG every time the source file changes, until Ctrl-C.
+    Change detection is plain stat() polling (mtime + size), so it needs no extra packages.
+    """
+    compiler = IncrementalCompiler(opts or RenderOptions(show_debug=False))
+    last_stat = None
+    last_text = None
+    build_no = 0
+    print(f"Watching {path} (Ctrl-C to stop)")
+    try:
+        while True:
+            try:
+                st = os.stat(path)
+                stat_key = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stat_key = None
+            if stat_key is not None and stat_key != last_stat:
+                last_stat = stat_key
+                text = path.read_text(encoding="utf-8")
+                if text != last_text:
+                    last_text = text
+                    build_no += 1
+                    try:
+                        result = compiler.build(text)
+                    except Exception as e:
+                        print(f"[{build_no}] {_error_message(e)}")
+                    else:
+                        out_svg.write_text(result.svg, encoding="utf-8")
+                        print(f"[{build_no}] {out_svg}: {result.format_timings()}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
 def main():
     ap = argparse.ArgumentParser(
         prog="python -m src.main",
@@ -46,14 +255,61 @@ def main():
     ap.add_argument("--show-ast", action="store_true", help="parse and pretty-print AST")
     ap.add_argument("--render-svg", action="store_true", help="render jersey to SVG")
     ap.add_argument("--out", help="output path for artifacts (.tokens.txt or .svg)")
+    ap.add_argument("--lod", choices=list(LODS), default="full", help="level of detail for every render (default: full)")
+    ap.add_argument("--view", choices=list(VIEWBOXES), default="both", help="side(s) to draw in every render (default: both)")
+    ap.add_argument("--sheet", nargs="+", metavar="FILE", help="render several .jersey files into one sprite-sheet SVG (--out, default sheet.svg)")
+    ap.add_argument("--columns", type=int, help="designs per row for --sheet (default: roughly square)")
+    ap.add_argument("--watch", action="store_true", help="with --render-svg: keep running and rebuild on every change")
+    ap.add_argument("--interval", type=float, default=0.25, help="polling interval in seconds for --watch")
+    ap.add_argument("--stream", action="store_true", help="read NDJSON requests from stdin, write NDJSON results to stdout")
+    ap.add_argument("--workers", type=int, default=1, help="parallel worker processes for --stream (default: 1)")
+    ap.add_argument("--buffer", type=int, default=0, help="max in-flight lines for --stream (default: 4 x workers)")
+    ap.add_argument("--profile", nargs="?", const="-", metavar="PATH",
+                    help="profile the compile: stage timings + cProfile on stderr, collapsed stacks to PATH (default: stdout)")
+    ap.add_argument("--repeat", type=int, default=1, help="compile this many times under --profile (default: 1)")
+    ap.add_argument("--memprofile", action="store_true", help="trace memory per stage and pattern (tracemalloc), report on stderr")
+    ap.add_argument("--sample", type=int, metavar="N", help="write N random valid designs as NDJSON (input for --stream)")
+    ap.add_argument("--seed", type=int, default=0, help="seed for --sample (default: 0)")
+    ap.add_argument("--sample-start", type=int, default=0, metavar="I", help="index of the first design for --sample (for sharding)")
+    ap.add_argument("--patterns", metavar="WEIGHTS", help='pattern weights for --sample, e.g. "stripes=2,camo=1,none=1"')
 
     args = ap.parse_args()
+    opts = RenderOptions(show_debug=False, lod=args.lod, view=args.view)
 
     # Case 1: Just show grammar and no file
     if args.show_grammar and not args.file:
         print_grammar()
         return
 
+    # Sampler: random designs as NDJSON, no file needed
+    if args.sample is not None:
+        try:
+            emit_samples(args.sample, seed=args.seed, start=args.sample_start, patterns=args.patterns)
+        except ValueError as e:
+            ap.error(str(e))
+        return
+
+    # Streaming pipeline mode: stdin -> stdout, no file needed
+    if args.stream:
+        run_stream(workers=args.workers, buffer=args.buffer, opts=opts)
+        return
+
+    # Sprite sheet: many files, one SVG
+    if args.sheet:
+        try:
+            svg = compile_sheet(
+                [Path(f).read_text(encoding="utf-8") for f in args.sheet],
+                opts,
+                columns=args.columns,
+            )
+        except Exception as e:
+            print(_error_message(e), file=sys.stderr)
+            return
+        out_svg = Path(args.out) if args.out else Path("sheet.svg")
+        out_svg.write_text(svg, encoding="utf-8")
+        print(f"Sheet of {len(args.sheet)} designs written to {out_svg}")
+        return
+
     # If no file is provided, show usage + examples
     if not args.file:
         ap.print_usage()
@@ -61,11 +317,45 @@ def main():
         print("  python -m src.main --show-grammar")
         print("  python -m src.main examples/basic.jersey --tokens")
         print("  python -m src.main examples/striped.jersey --render-svg --out examples/striped.svg")
+        print("  cat designs.ndjson | python -m src.main --stream --workers 4 > results.ndjson")
+        print("  python -m src.main --sample 1000 --seed 42 | python -m src.main --stream > results.ndjson")
+        print("  python -m src.main examples/striped.jersey --profile --repeat 50 > striped.folded")
+        print("  python -m src.main --sheet examples/*.jersey --lod preview --out kits.svg")
         return
 
     path = Path(args.file)
+
+    # Watch mode: incremental rebuilds on every save
+    if args.watch:
+        if not args.render_svg:
+            print("--watch needs --render-svg")
+            return
+        out_svg = Path(args.out) if args.out else path.with_suffix(".svg")
+        watch_file(path, out_svg, interval=args.interval, opts=opts)
+        return
+
     text = path.read_text(encoding="utf-8")
 
+    # Profile mode: one full compile (repeated), timings + collapsed stacks, or memory
+    if args.profile or args.memprofile:
+        try:
+            if args.memprofile:
+                svg = memprofile_source(text, opts=opts)
+            elif args.profile == "-":
+                svg = profile_source(text, repeat=args.repeat, opts=opts)
+            else:
+                with open(args.profile, "w", encoding="utf-8") as f:
+                    svg = profile_source(text, repeat=args.repeat, out=f, opts=opts)
+                print(f"Collapsed stacks written to {args.profile}", file=sys.stderr)
+        except Exception as e:
+            print(_error_message(e), file=sys.stderr)
+            return
+        if args.render_svg:
+            out_svg = Path(args.out) if args.out else path.with_suffix(".svg")
+            out_svg.write_text(svg, encoding="utf-8")
+            print(f"SVG written to {out_svg}", file=sys.stderr)
+        return
+
     # Prepare tokens if any downstream step needs them
     needs_tokens = args.tokens or args.write_tokens or args.show_ast or args.render_svg
     tokens = _lex(text) if needs_tokens else None
@@ -93,7 +383,7 @@ def main():
         except SemanticError as e:
             print(f"Semantic error: {e}")
             return
-        svg = render_svg(spec, RenderOptions(show_debug=False))
+        svg = render_svg(spec, opts)
         out_svg = Path(args.out) if args.out else path.with_suffix(".svg")
         out_svg.write_text(svg, encoding="utf-8")
         print(f"SVG written to {out_svg}")
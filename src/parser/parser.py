@@ -62,6 +62,17 @@ class Parser:
             raise ParserError(f"Extra tokens after jersey block at line {extra.line}, col {extra.col}")
         return node
 
+    def parse_stmt(self):
+        """
+        Parse exactly one statement (without the surrounding jersey block).
+        Used by incremental compilation to re-parse only the statements that changed.
+        """
+        node = self._parse_stmt()
+        extra = self._peek()
+        if extra and extra.type != "EOF":
+            raise ParserError(f"Extra tokens after statement at line {extra.line}, col {extra.col}")
+        return node
+
     # program := jersey_block
     def _parse_jersey(self) -> JerseyNode:
         """
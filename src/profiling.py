@@ -0,0 +1,313 @@
+# src/profiling.py
+import functools
+import linecache
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Per-stage timing for the compiler pipeline.
+#
+# The lex, parse and validate stages are timed by the drivers (`--profile` in
+# src/main.py, the web app) with `timed()` around each call, so the compiler front end
+# does not depend on this module. Inside the renderer, where no driver can reach,
+# _pattern_layer and assemble_svg are marked with @stage("name").
+# Nothing is recorded unless a caller opened a collection with `collect()` (timings)
+# or `collect_memory()` (timings + tracemalloc); outside of one, a marked function
+# costs one ContextVar lookup per call.
+
+_active: ContextVar["StageTimings | None"] = ContextVar("jersey_stage_timings", default=None)
+
+
+class StageTimings:
+    """
+    Timings recorded while a collection is open, in call order.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[str, float]] = []  # (stage, seconds)
+
+    def add(self, name: str, seconds: float):
+        self.entries.append((name, seconds))
+
+    def enter(self, name: str, detail: str | None = None):
+        return name, time.perf_counter()
+
+    def exit(self, state):
+        name, t0 = state
+        self.add(name, time.perf_counter() - t0)
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Seconds per stage, summed over repeated calls (e.g. front and back pattern).
+        """
+        out: Dict[str, float] = {}
+        for name, seconds in self.entries:
+            out[name] = out.get(name, 0.0) + seconds
+        return out
+
+    def format(self) -> str:
+        """
+        One line per stage, e.g. "pattern      1.234 ms  (2 calls)".
+        """
+        counts: Dict[str, int] = {}
+        for name, _ in self.entries:
+            counts[name] = counts.get(name, 0) + 1
+        return "\n".join(
+            f"{name:<12} {seconds * 1000:8.3f} ms" + (f"  ({counts[name]} calls)" if counts[name] > 1 else "")
+            for name, seconds in self.totals().items()
+        )
+
+    def server_timing(self) -> str:
+        """
+        Value for an HTTP `Server-Timing` header (durations in milliseconds).
+        """
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.totals().items())
+
+
+@contextmanager
+def collect() -> Iterator[StageTimings]:
+    """
+    Record stage timings for everything run inside the `with` block (this thread/context only).
+    """
+    timings = StageTimings()
+    token = _active.set(timings)
+    try:
+        yield timings
+    finally:
+        _active.reset(token)
+
+def start(memory: bool = False) -> Tuple[StageTimings, object]:
+    """
+    Open a collection without a `with` block (e.g. across request hooks).
+    With memory=True it is a MemoryProfile and tracemalloc is started if needed.
+    Returns (collector, token); pass both to stop().
+    """
+    if memory:
+        _tracing_acquire()
+        collector: StageTimings = MemoryProfile()
+    else:
+        collector = StageTimings()
+    return collector, _active.set(collector)
+
+def stop(collector: StageTimings, token) -> None:
+    _active.reset(token)
+    if isinstance(collector, MemoryProfile):
+        _tracing_release()
+
+
+def stage(name: str, detail: Callable[..., str] | None = None) -> Callable:
+    """
+    Decorator marking a function as a pipeline stage.
+    `detail(*args)` may name the variant (e.g. which pattern) for the memory profile.
+    """
+    def wrap(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            collector = _active.get()
+            if collector is None:
+                return fn(*args, **kwargs)
+            state = collector.enter(name, detail(*args) if detail else None)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                collector.exit(state)
+        # one code object per stage, so cProfile keeps the wrapped functions apart
+        timed.__code__ = timed.__code__.replace(co_name=f"stage_{name}")
+        return timed
+    return wrap
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Time a block as a stage (same rules as @stage).
+    """
+    collector = _active.get()
+    if collector is None:
+        yield
+        return
+    state = collector.enter(name)
+    try:
+        yield
+    finally:
+        collector.exit(state)
+
+
+# --- memory (tracemalloc) ---
+@dataclass
+class MemoryStage:
+    calls: int = 0
+    peak_bytes: int = 0        # highest traced memory above the level at entry, over all calls
+    retained_bytes: int = 0    # still allocated when the stage returned (its result, caches)
+    retained_blocks: int = 0
+    sites: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # "file:line" -> (bytes, blocks)
+
+
+class MemoryProfile(StageTimings):
+    """
+    Stage timings plus, per stage (and per pattern), tracemalloc figures: peak bytes,
+    bytes/blocks still allocated at return and the sites that allocated them.
+    Timings include tracemalloc's own overhead. tracemalloc is process-wide, so other
+    threads' allocations while a profile is open are counted too.
+    """
+
+    _IGNORE = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, linecache.__file__),
+    )
+
+    def __init__(self, top: int = 5):
+        super().__init__()
+        self.top = top
+        self.stages: Dict[str, MemoryStage] = {}
+        self._stack: List[list] = []  # per open stage: [key, start_bytes, peak_abs, snapshot, timing state]
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._IGNORE)
+
+    def enter(self, name: str, detail: str | None = None):
+        key = f"{name}[{detail}]" if detail else name
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:  # keep the enclosing stage's peak before resetting it
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        frame = [key, current, current, snapshot, super().enter(name, detail)]
+        self._stack.append(frame)
+        return frame
+
+    def exit(self, frame):
+        super().exit(frame[4])
+        key, start, peak_abs, before, _ = frame
+        current, peak = tracemalloc.get_traced_memory()
+        peak_abs = max(peak_abs, peak)
+        diff = self._snapshot().compare_to(before, "lineno")
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak_abs)
+
+        st = self.stages.setdefault(key, MemoryStage())
+        st.calls += 1
+        st.peak_bytes = max(st.peak_bytes, peak_abs - start)
+        for d in diff:
+            if d.size_diff <= 0:
+                continue
+            st.retained_bytes += d.size_diff
+            st.retained_blocks += max(0, d.count_diff)
+            tb = d.traceback[0]
+            site = f"{os.path.basename(tb.filename)}:{tb.lineno}"
+            size, blocks = st.sites.get(site, (0, 0))
+            st.sites[site] = (size + d.size_diff, blocks + max(0, d.count_diff))
+
+    def top_sites(self, key: str) -> List[Tuple[str, int, int]]:
+        st = self.stages[key]
+        return sorted(((s, b, n) for s, (b, n) in st.sites.items()), key=lambda r: -r[1])[: self.top]
+
+    def format_memory(self) -> str:
+        """
+        Table of stages with peak / retained memory and their top allocation sites.
+        """
+        lines = [f"{'stage':<24} {'calls':>5} {'peak KiB':>10} {'retained KiB':>13} {'blocks':>8}"]
+        for key, st in self.stages.items():
+            lines.append(
+                f"{key:<24} {st.calls:>5} {st.peak_bytes / 1024:>10.1f} "
+                f"{st.retained_bytes / 1024:>13.1f} {st.retained_blocks:>8}"
+            )
+            for site, size, blocks in self.top_sites(key):
+                lines.append(f"    {site:<30} {size / 1024:>9.1f} KiB {blocks:>7} blocks")
+        return "\n".join(lines)
+
+    def header(self) -> str:
+        """
+        Compact one-line form for an HTTP debug header.
+        """
+        parts = []
+        for key, st in self.stages.items():
+            top = self.top_sites(key)[:1]
+            site = f";site={top[0][0]}" if top else ""
+            parts.append(f"{key};peak={st.peak_bytes};retained={st.retained_bytes};blocks={st.retained_blocks}{site}")
+        return ", ".join(parts)
+
+
+# tracemalloc is started by the first open memory profile and stopped by the last
+# (unless something else had started it), so concurrent profiles do not cut each other off
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+def _tracing_acquire():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _tracing_release():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+@contextmanager
+def collect_memory(top: int = 5) -> Iterator[MemoryProfile]:
+    """
+    Like collect(), but also trace memory per stage. Starts tracemalloc if needed.
+    """
+    _tracing_acquire()
+    profile = MemoryProfile(top=top)
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+        _tracing_release()
+
+
+# --- cProfile -> collapsed stacks ---
+def _label(func: tuple) -> str:
+    filename, _, name = func
+    if filename == "~":  # builtins
+        return name.strip("<>").replace("'", "").replace(" ", "_")
+    return f"{os.path.basename(filename)}:{name}"
+
+def collapsed_stacks(stats, max_depth: int = 64) -> List[str]:
+    """
+    Convert pstats data into collapsed-stack lines ("a;b;c <microseconds>") that
+    flamegraph.pl, speedscope and inferno read.
+
+    cProfile only keeps caller -> callee edges, not whole stacks, so time below a
+    function shared by several callers is split in proportion to each edge's cumulative time.
+    """
+    raw = stats.stats  # func -> (cc, nc, tottime, cumtime, callers{caller: (cc, nc, tt, ct)})
+    callees: Dict[tuple, Dict[tuple, float]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    totals: Dict[str, float] = {}
+
+    def walk(func: tuple, share: float, path: Tuple[str, ...], on_stack: frozenset):
+        if os.path.basename(func[0]) != "profiling.py":  # hide the @stage wrappers
+            path = path + (_label(func),)
+        if raw[func][2] * share > 0:
+            key = ";".join(path)
+            totals[key] = totals.get(key, 0.0) + raw[func][2] * share
+        if len(path) >= max_depth:
+            return
+        for child, edge_ct in callees.get(func, {}).items():
+            child_ct = raw[child][3]
+            if child_ct > 0 and child not in on_stack:  # recursion is folded into the first frame
+                walk(child, share * edge_ct / child_ct, path, on_stack | {child})
+
+    roots = [func for func, row in raw.items() if not row[4]]
+    for root in roots:
+        walk(root, 1.0, (), frozenset([root]))
+    return [f"{key} {int(seconds * 1e6)}" for key, seconds in sorted(totals.items()) if seconds >= 1e-6]
@@ -0,0 +1,177 @@
+# src/sampler.py
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from .semantic.checks import JerseySpec, TextPlacement
+
+# Seeded generator of random, valid jersey designs.
+#
+# Design i of seed s depends only on (s, i): every design gets its own RNG seeded
+# from that pair, so a corpus can be produced in shards or in parallel and any
+# single design reproduced without generating the ones before it.
+
+ArgRange = Union[Tuple[int, int], Tuple[str, ...]]  # inclusive int range, or a set of words
+
+# argument domains per pattern, from the limits in semantic/checks.py
+PATTERN_ARGS: Dict[str, Tuple[ArgRange, ArgRange]] = {
+    "stripes": ((1, 50), (2, 120)),
+    "hoops": ((1, 50), (2, 120)),
+    "sash": ((0, 85), (10, 200)),
+    "checker": ((5, 200), (5, 200)),
+    "gradient": (("up", "down", "center"), (10, 200)),
+    "brush": ((1, 200), (5, 200)),
+    "waves": ((2, 200), (1, 100)),
+    "camo": ((1, 100), (0, 100)),
+    "halftone_dots": ((1, 100), (1, 100)),
+    "topo": ((1, 100), (1, 100)),  # levels is not checked; 100 keeps renders bounded
+    "half_split": (("vertical", "horizontal"), (1, 99)),
+}
+
+# (primary, secondary, tertiary, pattern_color)
+PALETTES: Tuple[Tuple[str, str, str, str], ...] = (
+    ("#E5A823", "#0055A2", "#FFFFFF", "#0055A2"),
+    ("#0B3D91", "#FFFFFF", "#FFFFFF", "#1A1A1A"),
+    ("#C8102E", "#000000", "#FFFFFF", "#000000"),
+    ("#006341", "#FFFFFF", "#FFD100", "#00432B"),
+    ("#6CABDD", "#1C2C5B", "#FFFFFF", "#FFFFFF"),
+    ("#FDB913", "#000000", "#000000", "#231F20"),
+    ("#FFFFFF", "#241F20", "#D4AF37", "#C0C0C0"),
+    ("#7A263A", "#1BB1E7", "#FFFFFF", "#F3D459"),
+)
+
+FONTS = ("Arial", "Sport Scholars Outline")
+
+_PLACES = ("North", "River", "Harbor", "Valley", "Summit", "Lake", "Iron", "Coast", "Union", "Royal", "Forest", "Metro")
+_SUFFIXES = ("FC", "United", "City", "Athletic", "Rovers", "SC", "Wanderers")
+_PLAYERS = ("BEN", "SILVA", "KANE", "OKAFOR", "MULLER", "TANAKA", "ROSSI", "NGUYEN", "GARCIA", "DIALLO", "LARSEN", "KIM")
+_SPONSORS = ("SJSU", "NOVA", "ORBIT", "PEAK", "VOLT", "ZENITH", "ARC", "LUMEN")
+
+
+@dataclass
+class SamplerConfig:
+    """
+    What the sampler draws from.
+
+    - `patterns`: relative weight per pattern; the key "none" means a plain kit
+    - `arg_ranges`: per-pattern overrides of PATTERN_ARGS (e.g. cheaper ranges for a catalogue)
+    - `palettes`: color sets to pick from; `random_colors` is the share of designs
+      that get four random colors instead
+    """
+    patterns: Dict[str, float] = field(default_factory=lambda: {**{p: 1.0 for p in PATTERN_ARGS}, "none": 1.0})
+    arg_ranges: Dict[str, Tuple[ArgRange, ArgRange]] = field(default_factory=dict)
+    palettes: Sequence[Tuple[str, str, str, str]] = PALETTES
+    random_colors: float = 0.25
+    fonts: Sequence[str] = FONTS
+
+    def __post_init__(self):
+        unknown = [p for p in self.patterns if p != "none" and p not in PATTERN_ARGS]
+        if unknown:
+            raise ValueError(f"unknown pattern(s): {', '.join(unknown)}")
+        if not any(w > 0 for w in self.patterns.values()):
+            raise ValueError("at least one pattern needs a positive weight")
+        if not self.palettes and self.random_colors < 1:
+            raise ValueError("no palettes to pick from (set random_colors=1.0)")
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """
+    "stripes=2,camo=1,none=1" -> {"stripes": 2.0, "camo": 1.0, "none": 1.0}
+    """
+    weights = {}
+    for part in spec.split(","):
+        name, _, w = part.strip().partition("=")
+        weights[name] = float(w or 1)
+    return weights
+
+
+class Sampler:
+    """
+    Deterministic random designs: `spec(i)` / `dsl(i)` for design i, or iterate.
+    """
+
+    def __init__(self, seed: int = 0, config: SamplerConfig | None = None):
+        self.seed = seed
+        self.config = config or SamplerConfig()
+        self._names = [p for p, w in self.config.patterns.items() if w > 0]
+        self._weights = [self.config.patterns[p] for p in self._names]
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{index}")
+
+    def _arg(self, rng: random.Random, domain: ArgRange) -> int | str:
+        if isinstance(domain[0], str):
+            return rng.choice(domain)
+        return rng.randint(domain[0], domain[1])
+
+    def _colors(self, rng: random.Random) -> Tuple[str, str, str, str]:
+        cfg = self.config
+        if not cfg.palettes or rng.random() < cfg.random_colors:
+            return tuple(f"#{rng.getrandbits(24):06X}" for _ in range(4))
+        return rng.choice(cfg.palettes)
+
+    def spec(self, index: int) -> JerseySpec:
+        """
+        Design number `index`, in the same shape validate_jersey() returns.
+        """
+        rng = self._rng(index)
+        primary, secondary, tertiary, pattern_color = self._colors(rng)
+
+        pattern = None
+        ident = rng.choices(self._names, self._weights)[0]
+        if ident != "none":
+            domains = self.config.arg_ranges.get(ident, PATTERN_ARGS[ident])
+            pattern = (ident, [self._arg(rng, d) for d in domains])
+
+        team = f"{rng.choice(_PLACES)} {rng.choice(_SUFFIXES)}"
+        return JerseySpec(
+            team=TextPlacement(text=team, x=365, y=190, size=rng.randint(14, 22)),
+            primary=primary,
+            secondary=secondary,
+            tertiary=tertiary,
+            pattern_color=pattern_color,
+            number=TextPlacement(text=rng.randint(0, 99), x=365, y=155, size=rng.randint(60, 90)),
+            player=TextPlacement(text=rng.choice(_PLAYERS), x=365, y=85, size=rng.randint(18, 30)),
+            sponsor=TextPlacement(text=rng.choice(_SPONSORS), x=115, y=125, size=rng.randint(24, 40)),
+            font=rng.choice(self.config.fonts),
+            pattern=pattern,
+        )
+
+    def dsl(self, index: int) -> str:
+        return spec_to_dsl(self.spec(index))
+
+    def specs(self, count: int, start: int = 0) -> Iterator[JerseySpec]:
+        for i in range(start, start + count):
+            yield self.spec(i)
+
+    def sources(self, count: int, start: int = 0) -> Iterator[str]:
+        for i in range(start, start + count):
+            yield self.dsl(i)
+
+
+def _arg_dsl(a: int | str) -> str:
+    return str(a) if isinstance(a, int) else f'"{a}"'
+
+def spec_to_dsl(spec: JerseySpec) -> str:
+    """
+    Jersey DSL that compiles back to `spec`.
+    """
+    lines: List[str] = ["jersey {"]
+    for key in ("primary", "secondary", "tertiary", "pattern_color"):
+        value = getattr(spec, key)
+        if value:
+            lines.append(f"  {key}: {value};")
+    if spec.font:
+        lines.append(f'  font: "{spec.font}";')
+    for key in ("team", "player", "sponsor"):
+        tp = getattr(spec, key)
+        if tp is not None:
+            lines.append(f'  {key}: "{tp.text}", ({tp.x}, {tp.y}), {tp.size};')
+    if spec.number is not None:
+        tp = spec.number
+        lines.append(f"  number: {tp.text}, ({tp.x}, {tp.y}), {tp.size};")
+    if spec.pattern:
+        ident, args = spec.pattern
+        lines.append(f"  pattern: {ident}({','.join(_arg_dsl(a) for a in args)});")
+    lines.append("}")
+    return "\n".join(lines)
@@ -142,10 +142,12 @@ def validate_jersey(ast: JerseyNode) -> JerseySpec:
                 if ((l is not None and l < 1) or (l is not None and l > 100)):
                     raise SemanticError("waves: wavelength must be between 1 and 100")
             if (ident == "camo"):
-                if len(s.args) != 2:
-                    raise SemanticError("camo: requires (cell, variance)")
+                if len(s.args) not in (2, 3):
+                    raise SemanticError("camo: requires (cell, variance) or (cell, variance, blocks)")
                 c = s.args[0]
                 v = s.args[1]
+                if (len(s.args) == 3 and s.args[2] != "blocks"):
+                    raise SemanticError("camo: the optional third argument must be 'blocks'")
                 if ((c is not None and c < 1) or (c is not None and c > 100)):
                     raise SemanticError("camo: cell must be between 1 and 100")
                 if ((v is not None and v < 0) or (v is not None and v > 100)):
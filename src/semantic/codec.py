@@ -0,0 +1,219 @@
+# src/semantic/codec.py
+import base64
+import re
+import struct
+from typing import List, Union
+
+from ..ast.nodes import (
+    JerseyNode, TeamNode, ColorNode, NumberNode, PlayerNode,
+    SponsorNode, FontNode, PatternNode, Stmt
+)
+from .checks import JerseySpec, TextPlacement, validate_jersey
+
+# Compact binary encoding of a validated JerseySpec (base64url, no padding).
+#
+# v1 layout:
+#   u8 version
+#   rgb24 primary, rgb24 secondary, rgb24 tertiary
+#   u8 flags (bit0: pattern_color present, bit1: pattern present)
+#   [rgb24 pattern_color]
+#   team, player: u16 x, u16 y, u16 size, str text
+#   number:       u8 value, u16 x, u16 y, u16 size
+#   sponsor:      u16 x, u16 y, u16 size, str text
+#   str font
+#   [pattern: u8 id (0xFF = custom, followed by str ident), u8 argc, argc * u16 arg]
+#
+# str is a varint byte length followed by UTF-8 bytes. A pattern arg is a plain
+# integer when < 0x8000, 0x8000 | i for ARG_WORDS[i], and 0xFFFF followed by a str
+# for any other string.
+
+CODEC_VERSION = 1
+
+PATTERN_IDS = (
+    "stripes", "hoops", "sash", "checker", "gradient", "brush",
+    "waves", "camo", "halftone_dots", "topo", "half_split",
+)
+ARG_WORDS = ("up", "down", "center", "vertical", "horizontal", "blocks")  # append only: codes store the index
+
+_CUSTOM_PATTERN = 0xFF
+_WORD_FLAG = 0x8000
+_RAW_STRING = 0xFFFF
+_CODE_RE = re.compile(r"[A-Za-z0-9_-]*")
+
+class CodecError(ValueError):
+    pass
+
+# --- encoding ---
+def _u16(v: int, what: str) -> bytes:
+    if not isinstance(v, int) or v < 0 or v > 0xFFFF:
+        raise CodecError(f"{what}: {v!r} does not fit in 16 bits")
+    return struct.pack(">H", v)
+
+def _rgb(c: str) -> bytes:
+    return int(c[1:7], 16).to_bytes(3, "big")
+
+def _str(s: str) -> bytes:
+    raw = s.encode("utf-8")
+    n = len(raw)
+    out = bytearray()
+    while True:  # LEB128 length
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | (0x80 if n else 0))
+        if not n:
+            break
+    return bytes(out) + raw
+
+def _placement(tp: TextPlacement, what: str) -> bytes:
+    return _u16(tp.x, f"{what}.x") + _u16(tp.y, f"{what}.y") + _u16(tp.size, f"{what}.size")
+
+def encode_spec(spec: JerseySpec) -> str:
+    """
+    Encode a validated JerseySpec into a short, URL-safe code.
+    The same spec always produces the same code.
+    """
+    if spec.team is None or spec.player is None or spec.number is None or spec.sponsor is None:
+        raise CodecError("spec must come from validate_jersey()")
+
+    out = bytearray([CODEC_VERSION])
+    out += _rgb(spec.primary) + _rgb(spec.secondary) + _rgb(spec.tertiary)
+    flags = (1 if spec.pattern_color else 0) | (2 if spec.pattern else 0)
+    out.append(flags)
+    if spec.pattern_color:
+        out += _rgb(spec.pattern_color)
+
+    out += _placement(spec.team, "team") + _str(str(spec.team.text))
+    out += _placement(spec.player, "player") + _str(str(spec.player.text))
+    number = int(spec.number.text)
+    out.append(number)
+    out += _placement(spec.number, "number")
+    out += _placement(spec.sponsor, "sponsor") + _str(str(spec.sponsor.text))
+    out += _str(spec.font or "")
+
+    if spec.pattern:
+        ident, args = spec.pattern
+        if ident in PATTERN_IDS:
+            out.append(PATTERN_IDS.index(ident))
+        else:
+            out.append(_CUSTOM_PATTERN)
+            out += _str(ident)
+        if len(args) > 0xFF:
+            raise CodecError("pattern: too many arguments")
+        out.append(len(args))
+        for a in args:
+            if isinstance(a, int):
+                if a < 0 or a >= _WORD_FLAG:
+                    raise CodecError(f"pattern: argument {a} out of range")
+                out += struct.pack(">H", a)
+            elif a in ARG_WORDS:
+                out += struct.pack(">H", _WORD_FLAG | ARG_WORDS.index(a))
+            else:
+                out += struct.pack(">H", _RAW_STRING) + _str(str(a))
+
+    return base64.urlsafe_b64encode(bytes(out)).rstrip(b"=").decode("ascii")
+
+# --- decoding ---
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def take(self, n: int) -> bytes:
+        if self.pos + n > len(self.data):
+            raise CodecError("truncated code")
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def u8(self) -> int:
+        return self.take(1)[0]
+
+    def u16(self) -> int:
+        return struct.unpack(">H", self.take(2))[0]
+
+    def rgb(self) -> str:
+        return "#" + self.take(3).hex().upper()
+
+    def str(self) -> str:
+        n, shift = 0, 0
+        while True:
+            b = self.u8()
+            n |= (b & 0x7F) << shift
+            shift += 7
+            if not b & 0x80:
+                break
+            if shift > 28:
+                raise CodecError("bad string length")
+        try:
+            return self.take(n).decode("utf-8")
+        except UnicodeDecodeError:
+            raise CodecError("bad UTF-8 in string")
+
+def decode_spec(code: str) -> JerseySpec:
+    """
+    Decode a code produced by encode_spec() back into a JerseySpec.
+    The result goes through validate_jersey() again, so a hand-crafted code
+    cannot bypass the semantic limits.
+    """
+    if not isinstance(code, str) or not _CODE_RE.fullmatch(code):
+        raise CodecError("code is not valid base64url")
+    try:
+        data = base64.b64decode(code + "=" * (-len(code) % 4), altchars=b"-_", validate=True)
+    except ValueError:
+        raise CodecError("code is not valid base64url")
+    # unused low bits in the last character would let several codes name one design
+    if base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii") != code:
+        raise CodecError("code is not in canonical form")
+
+    r = _Reader(data)
+    version = r.u8()
+    if version != CODEC_VERSION:
+        raise CodecError(f"unsupported code version {version}")
+
+    stmts: List[Stmt] = [
+        ColorNode(kind="primary", value=r.rgb()),
+        ColorNode(kind="secondary", value=r.rgb()),
+        ColorNode(kind="tertiary", value=r.rgb()),
+    ]
+    flags = r.u8()
+    if flags & 1:
+        stmts.append(ColorNode(kind="pattern_color", value=r.rgb()))
+
+    x, y, size = r.u16(), r.u16(), r.u16()
+    stmts.append(TeamNode(name=r.str(), x=x, y=y, size=size))
+    x, y, size = r.u16(), r.u16(), r.u16()
+    stmts.append(PlayerNode(name=r.str(), x=x, y=y, size=size))
+    value = r.u8()
+    x, y, size = r.u16(), r.u16(), r.u16()
+    stmts.append(NumberNode(value=value, x=x, y=y, size=size))
+    x, y, size = r.u16(), r.u16(), r.u16()
+    stmts.append(SponsorNode(name=r.str(), x=x, y=y, size=size))
+    font = r.str()
+    if font:
+        stmts.append(FontNode(name=font))
+
+    if flags & 2:
+        pid = r.u8()
+        if pid == _CUSTOM_PATTERN:
+            ident = r.str()
+        elif pid < len(PATTERN_IDS):
+            ident = PATTERN_IDS[pid]
+        else:
+            raise CodecError(f"unknown pattern id {pid}")
+        args: List[Union[int, str]] = []
+        for _ in range(r.u8()):
+            v = r.u16()
+            if v == _RAW_STRING:
+                args.append(r.str())
+            elif v & _WORD_FLAG:
+                idx = v & ~_WORD_FLAG
+                if idx >= len(ARG_WORDS):
+                    raise CodecError(f"unknown pattern word {idx}")
+                args.append(ARG_WORDS[idx])
+            else:
+                args.append(v)
+        stmts.append(PatternNode(ident=ident, args=args))
+
+    if r.pos != len(data):
+        raise CodecError("trailing bytes after spec")
+    return validate_jersey(JerseyNode(stmts=stmts))
@@ -0,0 +1,49 @@
+# src/tests/test_ai_stream.py
+import codecs
+import json
+
+import pytest
+
+from web.ai import IncrementalJSONObject
+
+DESIGN = {
+    "team": "Café {Braces} FC",
+    "player": "MÜLLER \"9\"",
+    "number": 9,
+    "primary": "#0B3D91",
+    "pattern": {"type": "stripes", "args": [6, 20]},
+    "approximationNote": "commas, brackets ] and } inside strings \\ stay text",
+}
+STREAM = "Here you go:\n```json\n" + json.dumps(DESIGN, ensure_ascii=False) + "\n```\n"
+RAW = STREAM.encode("utf-8")
+
+
+def _feed_all(chunks) -> tuple[dict, dict]:
+    parser = IncrementalJSONObject()
+    seen: dict = {}
+    for chunk in chunks:
+        seen.update(parser.feed(chunk))
+    assert parser.done
+    return parser.fields, seen
+
+
+@pytest.mark.parametrize("cut", range(len(RAW) + 1))
+def test_split_at_every_byte(cut):
+    # decode the way a streamed HTTP body is: bytes split anywhere, even inside a character
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = [decoder.decode(RAW[:cut]), decoder.decode(RAW[cut:], final=True)]
+    fields, seen = _feed_all(chunks)
+    assert fields == DESIGN
+    assert seen == DESIGN
+
+
+def test_one_character_at_a_time():
+    fields, _ = _feed_all(STREAM)
+    assert fields == DESIGN
+
+
+def test_members_arrive_before_the_object_closes():
+    parser = IncrementalJSONObject()
+    head = STREAM[:STREAM.index('"number"')]
+    assert set(parser.feed(head)) == {"team", "player"}
+    assert not parser.done
@@ -0,0 +1,58 @@
+# src/tests/test_codec.py
+from pathlib import Path
+
+import pytest
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.sampler import Sampler
+from src.semantic.checks import validate_jersey
+from src.semantic.codec import encode_spec, decode_spec, CodecError
+
+EXAMPLE = (Path(__file__).resolve().parents[2] / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+
+def compile_example(pattern: str):
+    source = EXAMPLE.replace("stripes(7,22)", pattern)
+    return validate_jersey(Parser(Lexer(source).tokens()).parse())
+
+
+@pytest.mark.parametrize("index", range(200))
+def test_round_trip_of_sampled_designs(index):
+    spec = Sampler(seed=11).spec(index)
+    code = encode_spec(spec)
+    assert decode_spec(code) == spec
+    assert encode_spec(decode_spec(code)) == code
+
+
+def test_round_trip_keeps_pattern_words():
+    for pattern in ("camo(3,100,blocks)", "gradient(center,70)", "half_split(horizontal,1)"):
+        spec = compile_example(pattern)
+        assert decode_spec(encode_spec(spec)) == spec
+
+
+def test_code_is_url_safe():
+    code = encode_spec(compile_example("gradient(center,70)"))
+    assert set(code) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("code", ["", "!!!", "AQ"])
+def test_malformed_codes_raise_codec_error(code):
+    with pytest.raises(CodecError):
+        decode_spec(code)
+
+
+def test_corrupted_codes_never_decode_to_another_design():
+    code = encode_spec(compile_example("stripes(7,22)"))
+    last = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    corrupted = [
+        code[:10] + "!" + code[10:],        # outside the alphabet
+        code[:10] + " " + code[10:],
+        code[:10] + "+" + code[11:],        # standard base64, not base64url
+        code + "==",                        # padding
+        code + "AAAA",                      # trailing bytes
+        code[:-1] + last[last.index(code[-1]) ^ 1],  # unused low bits of the last character
+    ]
+    for bad in corrupted:
+        with pytest.raises(CodecError):
+            decode_spec(bad)
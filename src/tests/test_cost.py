@@ -0,0 +1,84 @@
+# src/tests/test_cost.py
+from pathlib import Path
+
+import pytest
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.semantic.checks import validate_jersey
+from src.interpreter.cost import RenderBudget, OverBudget, estimate_cost
+from src.interpreter.svg import render_svg, RenderOptions
+
+EXAMPLE = (Path(__file__).resolve().parents[2] / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+DENSE = "halftone_dots(1,1)"  # ~330k elements in full detail
+
+
+def compile_example(pattern: str | None):
+    source = EXAMPLE.replace("pattern: stripes(7,22);", f"pattern: {pattern};" if pattern else "")
+    return validate_jersey(Parser(Lexer(source).tokens()).parse())
+
+
+def _elements(svg: str) -> int:
+    return svg.count("<") - svg.count("</") - 1
+
+
+@pytest.mark.parametrize("pattern", [None, "stripes(6,20)", "checker(5,5)", "camo(3,100)",
+                                     "camo(3,100,blocks)", "waves(2,1)", "topo(40,5)"])
+@pytest.mark.parametrize("lod", ["full", "preview", "thumbnail"])
+@pytest.mark.parametrize("view", ["both", "front"])
+def test_estimate_is_an_upper_bound(pattern, lod, view):
+    spec = compile_example(pattern)
+    opts = RenderOptions(lod=lod, view=view)
+    cost = estimate_cost(spec, opts)
+    svg = render_svg(spec, opts)
+    assert cost.elements >= _elements(svg)
+    assert cost.bytes >= len(svg) * 0.9  # base cost is measured with short texts
+
+
+def test_single_view_costs_one_side():
+    spec = compile_example("checker(5,5)")
+    both = estimate_cost(spec, RenderOptions(view="both"))
+    front = estimate_cost(spec, RenderOptions(view="front"))
+    assert front.elements < both.elements * 0.6
+
+
+def test_within_budget_is_unchanged():
+    spec = compile_example("stripes(6,20)")
+    out, opts, _, downgraded = RenderBudget().apply(spec)
+    assert out is spec and opts.lod == "full" and not downgraded
+
+
+def test_reject_mode_raises():
+    with pytest.raises(OverBudget):
+        RenderBudget(mode="reject").apply(compile_example(DENSE))
+
+
+def test_downgrade_lowers_the_level_of_detail_first():
+    spec = compile_example(DENSE)
+    out, opts, cost, downgraded = RenderBudget().apply(spec)
+    assert downgraded and out is spec and opts.lod != "full"
+    assert cost.within(50_000, 4 * 1024 * 1024)
+
+
+def test_thumbnail_of_a_dense_pattern_is_not_downgraded():
+    _, opts, _, downgraded = RenderBudget().apply(compile_example(DENSE), RenderOptions(lod="thumbnail"))
+    assert opts.lod == "thumbnail" and not downgraded
+
+
+def test_downgrade_coarsens_the_pattern_at_the_lowest_detail():
+    # stripes do not get cheaper with less detail, so the pattern has to give
+    out, opts, cost, downgraded = RenderBudget(max_elements=150).apply(compile_example("stripes(50,2)"))
+    assert downgraded and opts.lod == "thumbnail"
+    assert out.pattern[0] == "stripes" and out.pattern[1][0] < 50
+    assert cost.elements <= 150
+
+
+def test_downgrade_keeps_render_options():
+    _, opts, _, _ = RenderBudget().apply(compile_example(DENSE), RenderOptions(view="back", show_debug=True))
+    assert opts.view == "back" and opts.show_debug
+
+
+def test_plain_kit_over_budget_raises():
+    with pytest.raises(OverBudget):
+        RenderBudget(max_elements=1).apply(compile_example(None))
@@ -0,0 +1,68 @@
+# src/tests/test_geometry.py
+import random
+
+import pytest
+
+from src.interpreter.geometry import ClipRegion, flatten_path
+from src.interpreter.svg import CLIP_PATHS, W, H, clip_region
+
+
+def _inside(polygons, x: float, y: float) -> bool:
+    """
+    Nonzero winding test against the flattened outline.
+    """
+    winding = 0
+    for poly in polygons:
+        for (ax, ay), (bx, by) in zip(poly, poly[1:] + poly[:1]):
+            if (ay <= y) != (by <= y) and ax + (y - ay) * (bx - ax) / (by - ay) > x:
+                winding += 1 if by > ay else -1
+    return winding != 0
+
+
+@pytest.fixture(scope="module", params=sorted(CLIP_PATHS))
+def clip(request):
+    return flatten_path(CLIP_PATHS[request.param], steps=64), clip_region(request.param)
+
+
+def test_every_box_touching_the_outline_is_visible(clip):
+    polygons, region = clip
+    rng = random.Random(3)
+    checked = 0
+    while checked < 3000:
+        x, y = rng.uniform(-20, W + 20), rng.uniform(-20, H + 20)
+        if not _inside(polygons, x, y):
+            continue
+        checked += 1
+        w, h = rng.choice((0.1, 1, 5, 40)), rng.choice((0.1, 1, 5, 40))
+        # boxes holding the inside point (x, y) anywhere
+        bx, by = x - rng.uniform(0, w), y - rng.uniform(0, h)
+        assert region.visible(bx, by, bx + w, by + h), (x, y, w, h)
+
+
+def test_span_covers_every_inside_point(clip):
+    polygons, region = clip
+    for y in range(0, H, 3):
+        for x in range(0, W, 3):
+            if _inside(polygons, x + 0.5, y + 0.5):
+                span = region.span(y, y + 1)
+                assert span is not None and span[0] <= x + 0.5 <= span[1]
+
+
+def test_far_away_boxes_are_hidden(clip):
+    _, region = clip
+    assert not region.visible(-100, -100, -50, -50)
+    assert not region.visible(0, H + 10, W, H + 50)
+
+
+def test_culls_something(clip):
+    # conservative, but not uselessly so: the corners of the canvas are outside the shirt
+    _, region = clip
+    assert not (region.visible(0, 0, 4, 4) and region.visible(W - 4, 0, W, 4))
+
+
+def test_flatten_handles_relative_commands():
+    polys = flatten_path("m 10 10 h 20 v 20 h -20 z M 50 50 L 60 50 L 60 60 Z")
+    assert polys[0] == [(10, 10), (30, 10), (30, 30), (10, 30)]
+    assert len(polys) == 2
+    region = ClipRegion(polys, 100, 100)
+    assert region.visible(15, 15, 16, 16) and not region.visible(80, 80, 90, 90)
@@ -0,0 +1,36 @@
+# src/tests/test_jobs.py
+import threading
+
+import pytest
+
+from web.jobs import JobQueue, QueueFull, CANCELLED, DONE, FAILED
+
+
+def test_job_result_and_failure():
+    jobs = JobQueue(workers=1)
+    ok = jobs.submit(lambda a, b: a + b, 2, 3)
+    bad = jobs.submit(lambda: 1 / 0)
+    assert jobs.wait(ok.id, 5).status == DONE and ok.result == 5
+    assert jobs.wait(bad.id, 5).status == FAILED and "division" in bad.error
+
+
+def test_queue_depth_and_cancellation():
+    gate = threading.Event()
+    jobs = JobQueue(workers=1, max_depth=1)
+    running = jobs.submit(gate.wait)
+    while jobs.stats()["running"] == 0:
+        gate.wait(0.001)
+    queued = jobs.submit(lambda: "never")
+    with pytest.raises(QueueFull):
+        jobs.submit(lambda: "never")
+    assert jobs.cancel(queued.id).status == CANCELLED
+    assert jobs.stats()["queued"] == 0
+    gate.set()
+    assert jobs.wait(running.id, 5).status == DONE
+
+
+def test_job_ids_name_the_issuing_queue():
+    jobs, other = JobQueue(workers=1), JobQueue(workers=1)
+    job = jobs.submit(lambda: None)
+    assert jobs.owns(job.id) and not other.owns(job.id)
+    assert other.get(job.id) is None
@@ -0,0 +1,44 @@
+# src/tests/test_layers.py
+import random
+from pathlib import Path
+
+import pytest
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.semantic.checks import validate_jersey
+from src.interpreter.svg import render_layers, diff_layers, RenderOptions
+
+EXAMPLE = (Path(__file__).resolve().parents[2] / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+
+def compile_example(pattern: str, primary: str = "#E5A823"):
+    source = EXAMPLE.replace("stripes(7,22)", pattern).replace("#E5A823", primary)
+    return validate_jersey(Parser(Lexer(source).tokens()).parse())
+
+
+@pytest.mark.parametrize("pattern", ["topo(6,8)", "camo(12,50)", "brush(50,15)"])
+def test_layer_hashes_are_stable_across_renders(pattern):
+    spec = compile_example(pattern)
+    random.seed(1)
+    first = {layer.name: layer.hash for layer in render_layers(spec)}
+    random.seed(2)
+    second = render_layers(spec)
+    assert {layer.name: layer.hash for layer in second} == first
+    assert first["pattern-front"] and first["pattern-back"]
+    assert diff_layers(second, first) == []
+
+
+def test_diff_layers_returns_only_changed_layers():
+    before = {layer.name: layer.hash for layer in render_layers(compile_example("stripes(6,20)"))}
+    after = render_layers(compile_example("stripes(6,20)", primary="#C8102E"))
+    changed = {layer.name for layer in diff_layers(after, before)}
+    assert changed and changed < set(before)
+    assert "pattern-front" not in changed
+
+
+@pytest.mark.parametrize("view", ["front", "back"])
+def test_view_renders_only_its_side(view):
+    names = {layer.name for layer in render_layers(compile_example("topo(6,8)"), RenderOptions(view=view))}
+    other = "back" if view == "front" else "front"
+    assert f"pattern-{view}" in names and f"pattern-{other}" not in names
@@ -0,0 +1,116 @@
+# src/tests/test_live.py
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from web.live import LiveSessions, SessionsFull
+
+SOURCE = (Path(__file__).resolve().parents[2] / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+
+def _events(session, **kwargs):
+    return session.events(str, debounce=0, keepalive=0.01, **kwargs)
+
+
+def _next_event(stream) -> str:
+    """
+    The next non-keepalive event of a stream.
+    """
+    while True:
+        event = next(stream)
+        if not event.startswith(":"):
+            return event
+
+
+def test_first_build_is_full_then_patches():
+    session = LiveSessions().get("session-0001")
+    stream = _events(session)
+    session.submit(1, SOURCE)
+    assert _next_event(stream).startswith("event: full")
+    session.submit(2, SOURCE.replace('"SJSU"', '"ORBIT"'))
+    patch = _next_event(stream)
+    assert patch.startswith("event: patch") and "ORBIT" in patch
+    stream.close()
+
+
+def test_older_edits_are_ignored():
+    session = LiveSessions().get("session-0002")
+    assert session.submit(5, SOURCE)
+    assert not session.submit(4, SOURCE)
+    assert session.pending[0] == 5
+
+
+def test_newer_connection_supersedes_the_old_one():
+    session = LiveSessions().get("session-0003")
+    first = _events(session)
+    assert next(first).startswith(":")  # connected, idle
+    second = _events(session)
+    assert next(second).startswith(":")
+    with pytest.raises(StopIteration):
+        _next_event(first)
+    assert session.subscribed
+    second.close()
+    assert not session.subscribed
+
+
+def test_idle_sessions_expire_but_connected_ones_stay():
+    sessions = LiveSessions(idle_ttl=10)
+    idle, connected = sessions.get("session-idle"), sessions.get("session-live")
+    stream = _events(connected)
+    next(stream)
+    for session in (idle, connected):
+        session.last_seen -= 60
+    sessions.get("session-other")
+    assert sessions.get("session-live") is connected
+    assert sessions.get("session-idle") is not idle
+    stream.close()
+
+
+def test_cap_evicts_the_least_recently_used_idle_session():
+    sessions = LiveSessions(max_sessions=2)
+    connected = sessions.get("session-aaaa")
+    stream = _events(connected)
+    next(stream)
+    idle = sessions.get("session-bbbb")
+    sessions.get("session-cccc")
+    assert sessions.get("session-aaaa") is connected
+    assert len(sessions) == 2
+    assert sessions.get("session-bbbb") is not idle
+    stream.close()
+
+
+def test_cap_refuses_new_sessions_when_all_are_connected():
+    sessions = LiveSessions(max_sessions=1)
+    stream = _events(sessions.get("session-aaaa"))
+    next(stream)
+    with pytest.raises(SessionsFull):
+        sessions.get("session-bbbb")
+    stream.close()
+    assert sessions.get("session-bbbb") is not None
+
+
+def test_malformed_session_id():
+    assert LiveSessions().get("../etc") is None
+
+
+def test_busy_render_slot_reports_and_retries():
+    class Busy(Exception):
+        pass
+
+    calls = []
+
+    @contextmanager
+    def slot():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Busy("all render slots taken")
+        yield
+
+    session = LiveSessions(slot=slot, busy=(Busy,), retry_after=0.01).get("session-busy")
+    stream = _events(session)
+    session.submit(1, SOURCE)
+    error = _next_event(stream)
+    assert error.startswith("event: error") and '"retry_after": 0.01' in error
+    assert _next_event(stream).startswith("event: full")
+    stream.close()
@@ -0,0 +1,46 @@
+# src/tests/test_patterns.py
+import random
+import re
+
+import pytest
+
+from src.interpreter.svg import _camo, _camo_blobs, _camo_blocks, clip_region
+
+CAMO_ENGINES = [_camo, _camo_blocks]
+
+
+@pytest.mark.parametrize("engine", CAMO_ENGINES, ids=lambda f: f.__name__)
+def test_camo_is_deterministic(engine):
+    random.seed(1)
+    first = engine(12, 50, "#1A1A1A", "#0B3D91")
+    random.seed(2)
+    assert engine(12, 50, "#1A1A1A", "#0B3D91") == first
+    assert engine(12, 50, "#1A1A1A", "#C8102E") != first
+
+
+@pytest.mark.parametrize("clip", ["frontJerseyClip", "backJerseyClip"])
+def test_culled_camo_only_drops_blobs(clip):
+    full = re.findall(r"<rect [^>]*/>", _camo(12, 50, "#1A1A1A", "#0B3D91"))
+    culled = re.findall(r"<rect [^>]*/>", _camo(12, 50, "#1A1A1A", "#0B3D91", region=clip_region(clip)))
+    assert culled and len(culled) < len(full)
+    assert set(culled) <= set(full)
+
+
+def test_classic_camo_keeps_one_rect_per_blob():
+    classic = _camo(12, 50, "#1A1A1A", "#0B3D91")
+    blocks = _camo_blocks(12, 50, "#1A1A1A", "#0B3D91")
+    assert "<rect" in classic
+    assert classic != blocks
+    assert len(blocks) < len(classic)
+
+
+def test_classic_camo_draws_its_blobs_once_per_design():
+    _camo_blobs.cache_clear()
+    front = _camo(5, 60, "#1A1A1A", "#0B3D91", region=clip_region("frontJerseyClip"))
+    back = _camo(5, 60, "#1A1A1A", "#0B3D91", region=clip_region("backJerseyClip"))
+    assert _camo_blobs.cache_info().misses == 1
+    # each side only keeps the blobs it shows, in drawing order
+    full = _camo(5, 60, "#1A1A1A", "#0B3D91").split("\n")
+    for side in (front, back):
+        rects = side.split("\n")
+        assert rects == [r for r in full if r in set(rects)]
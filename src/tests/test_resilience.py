@@ -0,0 +1,67 @@
+# src/tests/test_resilience.py
+import pytest
+
+from web.resilience import CircuitBreaker, ResilientCall, CircuitOpen, RetriesExhausted, OPEN, HALF_OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _call(fn, breaker, attempts=3):
+    return ResilientCall(
+        fn, breaker=breaker, is_transient=lambda e: isinstance(e, TimeoutError),
+        attempts=attempts, base_delay=0, max_delay=0,
+    )
+
+
+def _failing(error):
+    calls = []
+
+    def fn(prompt, timeout):
+        calls.append(prompt)
+        raise error
+    return fn, calls
+
+
+def test_retries_count_once_per_call():
+    breaker = CircuitBreaker(failure_threshold=2)
+    fn, calls = _failing(TimeoutError("slow"))
+    call = _call(fn, breaker)
+    with pytest.raises(RetriesExhausted):
+        call("a")
+    assert len(calls) == 3 and breaker.failures == 1 and breaker.state != OPEN
+    with pytest.raises(RetriesExhausted):
+        call("b")
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        call("c")
+    assert len(calls) == 6
+
+
+def test_non_transient_errors_never_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    fn, calls = _failing(RuntimeError("Groq JSON parse failed"))
+    call = _call(fn, breaker)
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            call("a")
+    assert len(calls) == 5 and breaker.failures == 0 and breaker.allow()
+
+
+def test_half_open_trial_is_released_by_bad_output():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 11
+    fn, _ = _failing(RuntimeError("bad JSON"))
+    with pytest.raises(RuntimeError):
+        _call(fn, breaker)("a")
+    assert breaker.state == HALF_OPEN
+    # the next call is the new trial, and a good reply closes the breaker
+    assert _call(lambda prompt, timeout: {"ok": True}, breaker)("b") == {"ok": True}
+    assert breaker.allow() and breaker.failures == 0
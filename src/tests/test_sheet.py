@@ -0,0 +1,66 @@
+# src/tests/test_sheet.py
+import re
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.lexer.tokenizer import Lexer
+from src.parser.parser import Parser
+from src.semantic.checks import validate_jersey
+from src.interpreter.sheet import render_sheet, sheet_layout
+from src.interpreter.svg import RenderOptions
+
+EXAMPLE = (Path(__file__).resolve().parents[2] / "examples" / "basic.jersey").read_text(encoding="utf-8")
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def compile_example(pattern: str | None, primary: str = "#E5A823"):
+    source = EXAMPLE.replace("#E5A823", primary)
+    source = source.replace("pattern: stripes(7,22);", f"pattern: {pattern};" if pattern else "")
+    return validate_jersey(Parser(Lexer(source).tokens()).parse())
+
+
+@pytest.fixture(scope="module")
+def specs():
+    return [
+        compile_example("stripes(6,20)"),
+        compile_example("camo(12,50)"),
+        compile_example("stripes(6,20)", primary="#C8102E"),
+        compile_example(None),
+        compile_example("topo(6,8)"),
+    ]
+
+
+@pytest.mark.parametrize("opts", [None, RenderOptions(lod="thumbnail"), RenderOptions(view="back")],
+                         ids=["full", "thumbnail", "back"])
+def test_sheet_is_well_formed(specs, opts):
+    svg = render_sheet(specs, opts)
+    root = ET.fromstring(svg.split("\n", 1)[1] if svg.startswith("<?xml") else svg)
+    designs = [g.get("id") for g in root.iter(f"{SVG}g") if (g.get("id") or "").startswith("design-")]
+    assert designs == [f"design-{i}" for i in range(len(specs))]
+
+    ids = {el.get("id") for el in root.iter() if el.get("id")}
+    for ref in re.findall(r'href="#([^"]+)"', svg) + re.findall(r'url\(#([^)]+)\)', svg):
+        assert ref in ids, ref
+
+
+def test_sheet_shares_repeated_layers(specs):
+    svg = render_sheet(specs)
+    # the two identical stripe patterns are defined once
+    assert svg.count('class="layer-pattern-front"') < len(specs)
+
+
+def test_sheet_layout_and_size(specs):
+    assert sheet_layout(5) == (3, 2)
+    assert sheet_layout(5, columns=2) == (2, 3)
+    assert sheet_layout(2, columns=10) == (2, 1)
+    svg = render_sheet(specs[:2], RenderOptions(view="front"), columns=1, gap=10)
+    width, height = map(int, re.search(r'viewBox="0 0 (\d+) (\d+)"', svg).groups())
+    assert width < height
+
+
+def test_empty_sheet_is_rejected():
+    with pytest.raises(ValueError):
+        render_sheet([])
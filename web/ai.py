@@ -0,0 +1,198 @@
+# web/ai.py
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from web.cache import LRUCache
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a user prompt so trivially different spellings share a cache entry.
+    """
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, everyone else who arrives while it is running waits for that result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key at a time. Returns (result, shared) where `shared`
+        is True when the result came from another caller's in-flight call.
+        Errors are re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+
+class AISuggester:
+    """
+    Front door for AI jersey suggestions: a TTL/LRU cache of validated AI JSON
+    plus single-flight coalescing, in front of the raw upstream `fetch(prompt)` call.
+    `validate(ai_json)` should raise when the JSON does not compile; such results
+    are still returned (the caller reports the compile error) but never cached.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], dict],
+        cache: LRUCache,
+        validate: Callable[[dict], Any] | None = None,
+    ):
+        self.fetch = fetch
+        self.cache = cache
+        self.validate = validate
+        self.flight = SingleFlight()
+
+    def remember(self, prompt: str, ai_json: dict) -> bool:
+        """
+        Cache an AI result obtained elsewhere (e.g. a streamed reply) if it validates.
+        """
+        if self.validate is not None:
+            try:
+                self.validate(ai_json)
+            except Exception:
+                return False
+        self.cache.put(normalize_prompt(prompt), ai_json, size=len(json.dumps(ai_json)))
+        return True
+
+    def _fetch_validated(self, key: str, prompt: str) -> dict:
+        # another flight may have filled the cache between our miss and now
+        if key in self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        ai_json = self.fetch(prompt)
+        self.remember(prompt, ai_json)
+        return ai_json
+
+    def nearest(self, prompt: str, min_similarity: float = 0.3) -> dict | None:
+        """
+        Best cached result for a similar prompt (word-set Jaccard similarity),
+        used as a degraded answer when the upstream is unavailable.
+        """
+        words = set(normalize_prompt(prompt).split())
+        best, best_score = None, min_similarity
+        for key, value in self.cache.items():
+            other = set(key.split())
+            union = words | other
+            score = len(words & other) / len(union) if union else 0.0
+            if score >= best_score:
+                best, best_score = value, score
+        return best
+
+    def suggest(self, prompt: str) -> Tuple[dict, str]:
+        """
+        Return (ai_json, status) where status is "HIT", "MISS" or "SHARED".
+        """
+        key = normalize_prompt(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, "HIT"
+        result, shared = self.flight.do(key, lambda: self._fetch_validated(key, prompt))
+        return result, "SHARED" if shared else "MISS"
+
+
+class IncrementalJSONObject:
+    """
+    Incremental parser for one streamed JSON object.
+    Feed it text chunks as they arrive; every top-level member is decoded as soon
+    as its value is complete, long before the closing brace shows up.
+    Anything before the first '{' (stray prose, code fences) is skipped.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.started = False
+        self.done = False
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._member: list[str] = []
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """
+        Consume a chunk and return the members completed by it (possibly empty).
+        """
+        new: Dict[str, Any] = {}
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self._depth = 1
+                continue
+            if self._in_str:
+                self._member.append(ch)
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+            if ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(new)
+                    self.done = True
+                    continue
+            elif ch == "," and self._depth == 1:
+                self._close_member(new)
+                continue
+            self._member.append(ch)
+        return new
+
+    def _close_member(self, new: Dict[str, Any]):
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return
+        try:
+            member = json.loads("{" + text + "}")
+        except ValueError:
+            return  # malformed member: skip it, the final validation will complain
+        self.fields.update(member)
+        new.update(member)
@@ -0,0 +1,144 @@
+# web/ai_stub.py
+import json
+import math
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+# A local stand-in for the Groq client, so the AI path can be exercised without
+# network access or an API key. Select it with AI_BACKEND=stub.
+
+STUB_DESIGN = {
+    "primary": "#0B3D91",
+    "secondary": "#FFFFFF",
+    "tertiary": "#FFFFFF",
+    "pattern_color": "#1A1A1A",
+    "pattern": {"type": "hoops", "args": [7, 18]},
+    "team": "Stub United",
+    "player": "STUB",
+    "number": 10,
+    "sponsor": "NOVA",
+    "font": "Sport Scholars Outline",
+    "player_size": 24,
+    "number_size": 80,
+    "team_size": 18,
+    "sponsor_size": 24,
+    "source": {"fromText": True, "fromImage": False, "imageAnalysisConfidence": 0.0},
+    "approximationNote": "Stub response.",
+}
+
+
+def parse_latency(spec: str, rng: random.Random | None = None) -> float | Callable[[], float]:
+    """
+    Latency setting -> seconds or a sampler. Accepts a plain number of seconds or
+    "fixed:S", "uniform:LO,HI", "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA"
+    (lognormal is the usual shape of LLM response times: most calls are quick, a few are very slow).
+    """
+    spec = spec.strip()
+    kind, _, params = spec.partition(":")
+    if not params:
+        return float(spec)
+    vals = [float(v) for v in params.split(",")]
+    rng = rng or random.Random()
+    if kind == "fixed" and len(vals) == 1:
+        return vals[0]
+    if kind == "uniform" and len(vals) == 2:
+        return lambda: rng.uniform(vals[0], vals[1])
+    if kind == "normal" and len(vals) == 2:
+        return lambda: max(0.0, rng.gauss(vals[0], vals[1]))
+    if kind == "lognormal" and len(vals) == 2:
+        return lambda: vals[0] * math.exp(rng.gauss(0.0, vals[1]))
+    raise ValueError(f"bad latency spec {spec!r} (try 0.5, uniform:0.2,1.5 or lognormal:0.8,0.5)")
+
+
+class StubTimeoutError(TimeoutError):
+    pass
+
+class StubUpstreamError(ConnectionError):
+    """
+    Simulated transient provider failure (think 503 / connection reset).
+    """
+    pass
+
+
+class _Completions:
+    def __init__(self, owner: "StubGroqClient"):
+        self._owner = owner
+
+    def create(self, model: str, messages: list, **kwargs):
+        return self._owner._complete(model, messages, **kwargs)
+
+
+class StubGroqClient:
+    """
+    Mimics the `client.chat.completions.create(...)` surface of the Groq SDK.
+    Replies with a fixed design and counts upstream calls.
+
+    - `latency`: seconds per call, or a zero-arg callable drawing one (a distribution)
+    - `failure_rate`: probability that a call raises StubUpstreamError
+    - a `timeout=` kwarg is honored: a call slower than it raises StubTimeoutError
+    """
+
+    def __init__(
+        self,
+        latency: float | Callable[[], float] = 0.0,
+        design: dict | None = None,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.api_key = "stub"
+        self.latency = latency
+        self.design = design or STUB_DESIGN
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency() if callable(self.latency) else self.latency
+            fail = self.rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        return max(0.0, delay), fail
+
+    def _complete(self, model: str, messages: list, timeout: float | None = None, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(timeout)
+        delay, fail = self._draw()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise StubTimeoutError(f"stub upstream timed out after {timeout:.2f}s")
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise StubUpstreamError("stub upstream unavailable")
+        content = json.dumps(self.design)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _stream(self, timeout: float | None, chunk_size: int = 24):
+        """
+        Streaming reply: the drawn latency is spread over the chunks, with a
+        quarter of it spent before the first token (like a real provider).
+        """
+        delay, fail = self._draw()
+        content = json.dumps(self.design)
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        first_wait = delay * 0.25
+        gap = (delay - first_wait) / max(1, len(chunks))
+        for i, text in enumerate(chunks):
+            wait = first_wait if i == 0 else gap
+            if timeout is not None and wait > timeout:
+                time.sleep(timeout)
+                raise StubTimeoutError(f"stub upstream stalled for {timeout:.2f}s")
+            if wait:
+                time.sleep(wait)
+            if fail and i == len(chunks) // 2:
+                raise StubUpstreamError("stub upstream dropped the stream")
+            delta = SimpleNamespace(content=text)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
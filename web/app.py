@@ -1,8 +1,12 @@
 # web/app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from pathlib import Path
 import sys
 import os
+import time
+import threading
+from contextlib import contextmanager
+import groq
 from groq import Groq
 import json
 
@@ -12,17 +16,37 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.lexer.tokenizer import Lexer
-from src.parser.parser import Parser
-from src.semantic.checks import validate_jersey, SemanticError
-from src.interpreter.svg import render_svg, RenderOptions
+from src.lexer.tokenizer import Lexer, LexerError
+from src.parser.parser import Parser, ParserError
+from src.semantic.checks import validate_jersey, SemanticError, JerseySpec
+from src.semantic.codec import encode_spec, decode_spec, CodecError
+from src.interpreter.svg import render_svg, render_layers, diff_layers, layer_markup, RenderOptions, LODS, VIEWBOXES
+from src.interpreter.sheet import render_sheet, SHEET_MAX_DESIGNS
+from src.interpreter.cost import RenderBudget, OverBudget
+from src import profiling
 from src.interpreter.json_to_dsl import jersey_json_to_dsl
+from web.cache import LRUCache, CachedResponse, SvgStore, source_key
+from web.ai import AISuggester, IncrementalJSONObject, normalize_prompt
+from web.ai_stub import StubGroqClient, parse_latency
+from web.jobs import JobQueue, QueueFull
+from web.resilience import CircuitBreaker, ResilientCall, CircuitOpen, RetriesExhausted
+from web.live import LiveSessions, SessionsFull
+from web.metrics import Metrics, BYTES_BUCKETS
 from dotenv import load_dotenv
 load_dotenv()
 
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-if not groq_client.api_key:
-    raise RuntimeError("Missing GROQ_API_KEY in .env")
+# AI_BACKEND=stub swaps Groq for a local stand-in (no network, no key needed)
+if os.environ.get("AI_BACKEND") == "stub":
+    groq_client = StubGroqClient(
+        latency=parse_latency(os.environ.get("AI_STUB_LATENCY", "0")),
+        failure_rate=float(os.environ.get("AI_STUB_FAILURE_RATE", "0")),
+    )
+else:
+    # retries are handled by ResilientCall below, not by the SDK;
+    # the SDK reads GROQ_BASE_URL, e.g. to point it at benchmarks/groq_stub.py
+    groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"), max_retries=0)
+    if not groq_client.api_key:
+        raise RuntimeError("Missing GROQ_API_KEY in .env")
 
 AI_SYSTEM_PROMPT = """
 - You are a soccer jersey design assistant for a jersey DSL compiler.
@@ -219,9 +243,12 @@ PATTERN RULES
   - Example: brush(amplitude=120, wavelength=1) -> "args": [120, 1]
   - Both values MUST be integers.
 
-- "camo": args = [cell, variance]
+- "camo": args = [cell, variance] or [cell, variance, "blocks"]
   - Example: brush(cell=12, variance=50) -> "args": [12, 50]
-  - Both values MUST be integers.
+  - cell and variance MUST be integers.
+  - The optional third arg MUST be the STRING "blocks": a blockier camo with a much
+    smaller SVG. Prefer it for small cells (below about 6), where classic camo gets very large.
+  - Example: camo(cell=4, variance=60, blocks) -> "args": [4, 60, "blocks"]
 
 - "halftone_dots": args = [dot_size, spacing]
   - Example: brush(dot_size=6, spacing=50) -> "args": [6, 12]
@@ -259,6 +286,7 @@ Choose reasonable, visually pleasing values:
 - waves wavelength: typically between 1 and 100
 - camo cell: typically between 1 and 100
 - camo variance: typically between 0 and 100
+- camo style: omit for classic camo, "blocks" for blocky camo
 - halftone_dots dot_size: typically between 1 and 100
 - halftone_dots spacing: typically between 1 and 100
 - topo levels: typically between 1 and 100
@@ -336,6 +364,12 @@ Before you output the JSON, mentally check the object and verify:
 If any required field is missing or invalid, REVISE the JSON internally
 and ONLY output a complete, valid JSON object.
 
+========================================
+KEY ORDER
+========================================
+Write the keys in this order so the jersey can be previewed while you are still writing:
+"primary", "secondary", "tertiary", "pattern_color", "pattern", then all remaining keys.
+
 ========================================
 OUTPUT RULES
 ========================================
@@ -349,22 +383,163 @@ OUTPUT RULES
 
 
 app = Flask(__name__)
+app.config["RENDER_CACHE_MAX_BYTES"] = int(os.environ.get("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+app.config["SVG_STORE_MAX_BYTES"] = int(os.environ.get("SVG_STORE_MAX_BYTES", 128 * 1024 * 1024))
+app.config["PERMALINK_CACHE_MAX_BYTES"] = int(os.environ.get("PERMALINK_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+
+# finished /api/render responses, keyed by hash of the normalized source
+render_cache = LRUCache(app.config["RENDER_CACHE_MAX_BYTES"])
+# rendered SVG bytes (+ precompressed variants), keyed by content hash, served at /svg/<hash>.svg
+svg_store = SvgStore(app.config["SVG_STORE_MAX_BYTES"])
+# /j/<code>.svg permalinks -> content hash in svg_store, keyed by render variant + code
+permalink_cache = LRUCache(app.config["PERMALINK_CACHE_MAX_BYTES"])
+
+SVG_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+app.config["AI_CACHE_TTL"] = float(os.environ.get("AI_CACHE_TTL", 3600))
+app.config["AI_CACHE_MAX_BYTES"] = int(os.environ.get("AI_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+app.config["AI_CALL_TIMEOUT"] = float(os.environ.get("AI_CALL_TIMEOUT", 10))
+app.config["AI_DEADLINE"] = float(os.environ.get("AI_DEADLINE", 20))
+app.config["AI_ATTEMPTS"] = int(os.environ.get("AI_ATTEMPTS", 3))
+app.config["AI_BREAKER_THRESHOLD"] = int(os.environ.get("AI_BREAKER_THRESHOLD", 5))
+app.config["AI_BREAKER_RESET"] = float(os.environ.get("AI_BREAKER_RESET", 30))
+app.config["AI_JOB_WORKERS"] = int(os.environ.get("AI_JOB_WORKERS", 2))
+app.config["AI_JOB_QUEUE_DEPTH"] = int(os.environ.get("AI_JOB_QUEUE_DEPTH", 16))
+app.config["AI_JOB_RETRY_AFTER"] = int(os.environ.get("AI_JOB_RETRY_AFTER", 5))
+app.config["AI_JOB_MAX_WAIT"] = float(os.environ.get("AI_JOB_MAX_WAIT", 1))
+
+app.config["RENDER_MAX_ELEMENTS"] = int(os.environ.get("RENDER_MAX_ELEMENTS", 50_000))
+app.config["RENDER_MAX_BYTES"] = int(os.environ.get("RENDER_MAX_BYTES", 4 * 1024 * 1024))
+app.config["RENDER_OVER_BUDGET"] = os.environ.get("RENDER_OVER_BUDGET", "downgrade")  # or "reject"
+app.config["RENDER_MAX_CONCURRENCY"] = int(os.environ.get("RENDER_MAX_CONCURRENCY", 4))
+app.config["RENDER_QUEUE_TIMEOUT"] = float(os.environ.get("RENDER_QUEUE_TIMEOUT", 0.5))
+app.config["RENDER_RETRY_AFTER"] = int(os.environ.get("RENDER_RETRY_AFTER", 1))
+app.config["SHEET_MAX_DESIGNS"] = int(os.environ.get("SHEET_MAX_DESIGNS", SHEET_MAX_DESIGNS))
+app.config["DEBUG_MEMORY_PROFILE"] = os.environ.get("DEBUG_MEMORY_PROFILE", "") == "1"
+app.config["LIVE_DEBOUNCE_MS"] = int(os.environ.get("LIVE_DEBOUNCE_MS", 30))
+app.config["LIVE_MAX_SESSIONS"] = int(os.environ.get("LIVE_MAX_SESSIONS", 256))
+app.config["LIVE_IDLE_TTL"] = float(os.environ.get("LIVE_IDLE_TTL", 600))
+
+# every render is costed up front and then needs one of a fixed number of slots
+render_budget = RenderBudget(
+    max_elements=app.config["RENDER_MAX_ELEMENTS"],
+    max_bytes=app.config["RENDER_MAX_BYTES"],
+    mode=app.config["RENDER_OVER_BUDGET"],
+)
+render_slots = threading.BoundedSemaphore(max(1, app.config["RENDER_MAX_CONCURRENCY"]))
+
+class RenderBusy(Exception):
+    pass
+
+@contextmanager
+def render_slot():
+    """
+    Hold one of the RENDER_MAX_CONCURRENCY render slots, waiting at most RENDER_QUEUE_TIMEOUT.
+    """
+    if not render_slots.acquire(timeout=app.config["RENDER_QUEUE_TIMEOUT"]):
+        raise RenderBusy("too many renders in progress")
+    try:
+        yield
+    finally:
+        render_slots.release()
+
+def _busy_response(e: RenderBusy):
+    resp = jsonify({"ok": False, "error": f"Server busy: {e}"})
+    resp.headers["Retry-After"] = str(app.config["RENDER_RETRY_AFTER"])
+    return resp, 503
+
+# AI generations run here, off the request workers, so /api/render stays responsive
+ai_jobs = JobQueue(workers=app.config["AI_JOB_WORKERS"], max_depth=app.config["AI_JOB_QUEUE_DEPTH"])
+
+# --- metrics ---
+metrics = Metrics()
+metrics.histogram("jersey_stage_seconds", "Time per compiler stage and request (lex, parse, validate, pattern, assemble; render = pattern + assemble + layers).")
+metrics.histogram("jersey_pattern_render_seconds", "Render time of kits by pattern.")
+metrics.histogram("jersey_svg_bytes", "Size of rendered SVG documents by pattern.", BYTES_BUCKETS)
+metrics.counter("jersey_errors_total", "Compile/render errors by type (ai_invalid: DSL written by the AI model).")
+metrics.histogram("ai_call_seconds", "Latency of AI upstream calls by mode and outcome.")
+metrics.histogram("http_request_seconds", "HTTP request latency by endpoint and status.")
+
+def _error_type(e: Exception) -> str:
+    if isinstance(e, LexerError):
+        return "lexer"
+    if isinstance(e, ParserError):
+        return "parser"
+    if isinstance(e, SemanticError):
+        return "semantic"
+    if isinstance(e, OverBudget):
+        return "over_budget"
+    if isinstance(e, RenderBusy):
+        return "busy"
+    return "internal"
+
+def compile_to_spec(jersey_text: str, from_ai: bool = False) -> JerseySpec:
+    """
+    Compile jersey DSL text to a validated JerseySpec.
+    Errors are counted by type; DSL written by the AI model (`from_ai`) counts as
+    ai_invalid, so model failures do not show up as user DSL errors.
+    """
+    try:
+        with profiling.timed("lex"):
+            toks = Lexer(jersey_text).tokens()
+        with profiling.timed("parse"):
+            ast = Parser(toks).parse()
+        with profiling.timed("validate"):
+            return validate_jersey(ast)
+    except Exception as e:
+        metrics.inc("jersey_errors_total", type="ai_invalid" if from_ai else _error_type(e))
+        raise
+
+def _pattern_name(spec: JerseySpec) -> str:
+    return spec.pattern[0].lower() if spec.pattern else "none"
 
-def compile_and_render(jersey_text: str) -> str:
+def _observe_render(spec: JerseySpec, seconds: float, size: int):
+    pattern = _pattern_name(spec)
+    metrics.observe("jersey_pattern_render_seconds", seconds, pattern=pattern)
+    metrics.observe("jersey_svg_bytes", size, pattern=pattern)
+
+def render_options(params) -> tuple[RenderOptions, str]:
+    """
+    RenderOptions from request parameters ({"lod": ..., "view": ...}), plus a cache key
+    suffix that tells the variants apart ("" for the defaults). Raises ValueError.
+    """
+    lod = params.get("lod") or "full"
+    if lod not in LODS:
+        raise ValueError(f"'lod' must be one of: {', '.join(LODS)}")
+    view = params.get("view") or "both"
+    if view not in VIEWBOXES:
+        raise ValueError(f"'view' must be one of: {', '.join(VIEWBOXES)}")
+    variant = ("" if lod == "full" else f"{lod}:") + ("" if view == "both" else f"{view}:")
+    return RenderOptions(show_debug=False, lod=lod, view=view), variant
+
+def render_within_budget(spec: JerseySpec, opts: RenderOptions | None = None) -> tuple[str, bool]:
+    """
+    Render a spec under the render budget and concurrency limit.
+    Returns (svg, downgraded). Raises OverBudget or RenderBusy.
+    """
+    try:
+        spec, opts, _, downgraded = render_budget.apply(spec, opts or RenderOptions(show_debug=False))
+        with render_slot(), profiling.timed("render"):
+            t0 = time.perf_counter()
+            svg = render_svg(spec, opts)
+    except Exception as e:
+        metrics.inc("jersey_errors_total", type=_error_type(e))
+        raise
+    _observe_render(spec, time.perf_counter() - t0, len(svg))
+    return svg, downgraded
+
+def compile_and_render(jersey_text: str, from_ai: bool = False) -> str:
     """
     Compile jersey DSL text to SVG string.
     """
-    toks = Lexer(jersey_text).tokens()
-    ast = Parser(toks).parse()
-    spec = validate_jersey(ast)
-    svg = render_svg(spec, RenderOptions(show_debug=False))
+    svg, _ = render_within_budget(compile_to_spec(jersey_text, from_ai))
     return svg
 
 def compile_dsl_to_svg(dsl_code: str) -> str:
     """
-    Compile jersey DSL code to SVG string.
+    Compile jersey DSL code written by the AI model to SVG string.
     """
-    return compile_and_render(dsl_code)
+    return compile_and_render(dsl_code, from_ai=True)
 
 def fake_ai_suggest_jersey(message: str, image_path: str | None = None) -> dict:
     return {
@@ -395,52 +570,512 @@ def fake_ai_suggest_jersey(message: str, image_path: str | None = None) -> dict:
         ),
     }
 
-def real_ai_suggest_jersey(message: str) -> dict:
+def real_ai_suggest_jersey(message: str, timeout: float | None = None) -> dict:
     """
     Use the AI model to suggest a jersey design based on the message.
     """
-    completion = groq_client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": AI_SYSTEM_PROMPT},
-            {"role": "user", "content": message}
-        ]
-    )
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        completion = groq_client.chat.completions.create(
+            model="llama-3.1-8b-instant",
+            messages=[
+                {"role": "system", "content": AI_SYSTEM_PROMPT},
+                {"role": "user", "content": message}
+            ],
+            timeout=timeout,
+        )
+        outcome = "ok"
+    finally:
+        metrics.observe("ai_call_seconds", time.perf_counter() - t0, mode="blocking", outcome=outcome)
 
     raw = completion.choices[0].message.content
     try:
         return json.loads(raw)
     except Exception as e:
+        metrics.inc("jersey_errors_total", type="ai_invalid")
         raise RuntimeError(f"Groq JSON parse failed: {e}\nRaw: {raw}")
 
+def real_ai_stream_jersey(message: str, timeout: float | None = None):
+    """
+    Same as real_ai_suggest_jersey, but yields the raw reply text piece by piece
+    using the provider's streaming API.
+    """
+    stream = groq_client.chat.completions.create(
+        model="llama-3.1-8b-instant",
+        messages=[
+            {"role": "system", "content": AI_SYSTEM_PROMPT},
+            {"role": "user", "content": message}
+        ],
+        timeout=timeout,
+        stream=True,
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def _cached_response(entry: CachedResponse, cache_status: str):
+    """
+    Build the HTTP response for a cached render, answering 304 when the
+    client already holds this exact body (If-None-Match).
+    """
+    stats = render_cache.stats()
+    if request.if_none_match and request.if_none_match.contains_weak(entry.etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(entry.body, mimetype="application/json")
+    resp.set_etag(entry.etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Render-Cache"] = cache_status
+    resp.headers["X-Render-Cache-Hits"] = str(stats["hits"])
+    resp.headers["X-Render-Cache-Misses"] = str(stats["misses"])
+    return resp
 
 @app.post("/api/render")
 def api_render():
     """
     Render jersey DSL to SVG.
+    Identical sources (after normalization) are served from the render cache.
+    With {"format": "url"} only the content hash and /svg/<hash>.svg URL are returned.
+    With {"format": "permalink"} the spec is encoded into a /j/<code>.svg share link.
+    {"lod": "preview" | "thumbnail"} renders with less detail (galleries, thumbnails);
+    {"view": "front" | "back"} renders one side only, cropped to it.
+    """
+    data = request.get_json(silent=True) or {}
+    jersey_text = data.get("source", "")
+    if not jersey_text.strip():
+        return jsonify({"ok": False, "error": "Empty input"}), 400
+    if data.get("format") == "permalink":
+        return _permalink_response(jersey_text)
+    as_url = data.get("format") == "url"
+    try:
+        opts, variant = render_options(data)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    key = ("url:" if as_url else "svg:") + variant + source_key(jersey_text)
+    entry = render_cache.get(key)
+    # a URL response is only valid while the SVG it points at is still stored
+    if entry is not None and (not as_url or entry.etag in svg_store):
+        return _cached_response(entry, "HIT")
+    try:
+        svg, downgraded = render_within_budget(compile_to_spec(jersey_text), opts)
+        extra = {"downgraded": True} if downgraded else {}
+        if as_url:
+            stored = svg_store.put(svg)
+            payload = {"ok": True, "hash": stored.digest, "url": f"/svg/{stored.digest}.svg", **extra}
+            entry = CachedResponse(body=json.dumps(payload).encode("utf-8"), etag=stored.digest)
+        else:
+            entry = CachedResponse.from_body(json.dumps({"ok": True, "svg": svg, **extra}).encode("utf-8"))
+        render_cache.put(key, entry, size=len(entry.body))
+        return _cached_response(entry, "MISS")
+    except RenderBusy as e:
+        return _busy_response(e)
+    except OverBudget as e:
+        return jsonify({"ok": False, "error": f"Over budget: {e}"}), 422
+    except SemanticError as e:
+        return jsonify({"ok": False, "error": f"Semantic error: {e}"}), 400
+    except SyntaxError as e:
+        return jsonify({"ok": False, "error": f"Syntax error: {e}"}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"Internal error: {e}"}), 500
+
+@app.post("/api/render/diff")
+def api_render_diff():
+    """
+    Render jersey DSL but return only the layers the client does not already have.
+    Body: {"source": "...", "known": {"<layer>": "<hash>", ...}}
+    Reply: {"ok": true, "order": [...], "hashes": {...}, "layers": {"<layer>": "<g ...>...</g>"}}
     """
     data = request.get_json(silent=True) or {}
     jersey_text = data.get("source", "")
+    known = data.get("known") or {}
     if not jersey_text.strip():
         return jsonify({"ok": False, "error": "Empty input"}), 400
+    if not isinstance(known, dict):
+        return jsonify({"ok": False, "error": "'known' must be an object of layer hashes"}), 400
+
+    key = "layers:" + source_key(jersey_text)
+    layers = render_cache.get(key)
+    try:
+        if layers is None:
+            spec, opts, _, _ = render_budget.apply(compile_to_spec(jersey_text), RenderOptions(show_debug=False))
+            with render_slot(), profiling.timed("render"):
+                t0 = time.perf_counter()
+                layers = render_layers(spec, opts)
+            _observe_render(spec, time.perf_counter() - t0, sum(len(layer.markup) for layer in layers))
+            render_cache.put(key, layers, size=sum(len(layer.markup) for layer in layers))
+    except RenderBusy as e:
+        return _busy_response(e)
+    except OverBudget as e:
+        return jsonify({"ok": False, "error": f"Over budget: {e}"}), 422
+    except LexerError as e:
+        return jsonify({"ok": False, "error": f"Lexer error: {e}"}), 400
+    except SemanticError as e:
+        return jsonify({"ok": False, "error": f"Semantic error: {e}"}), 400
+    except SyntaxError as e:
+        return jsonify({"ok": False, "error": f"Syntax error: {e}"}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"Internal error: {e}"}), 500
+
+    return jsonify({
+        "ok": True,
+        "order": [layer.name for layer in layers],
+        "hashes": {layer.name: layer.hash for layer in layers},
+        "layers": {layer.name: layer_markup(layer) for layer in diff_layers(layers, known)},
+    })
+
+@app.post("/api/sheet")
+def api_sheet():
+    """
+    Render several designs into one sprite-sheet SVG (shared outlines, font and layers).
+    Body: {"sources": ["...", ...], "columns": 4, "lod": ..., "view": ...}
+    Every design is costed against the render budget on its own; the sheet takes one render slot.
+    Errors in a design carry its index: {"ok": false, "error": "...", "design": 2}.
+    """
+    data = request.get_json(silent=True) or {}
+    sources = data.get("sources")
+    if not isinstance(sources, list) or not sources or not all(isinstance(s, str) and s.strip() for s in sources):
+        return jsonify({"ok": False, "error": "'sources' must be a non-empty list of designs"}), 400
+    if len(sources) > app.config["SHEET_MAX_DESIGNS"]:
+        return jsonify({"ok": False, "error": f"at most {app.config['SHEET_MAX_DESIGNS']} designs per sheet"}), 400
+    columns = data.get("columns")
+    if columns is not None and (not isinstance(columns, int) or columns < 1):
+        return jsonify({"ok": False, "error": "'columns' must be a positive integer"}), 400
+    try:
+        opts, variant = render_options(data)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    key = f"sheet:{columns or ''}:{variant}" + source_key("\x00".join(sources))
+    entry = render_cache.get(key)
+    if entry is not None:
+        return _cached_response(entry, "HIT")
+    design = 0  # index of the design being compiled or costed, for error messages
+    try:
+        specs = []
+        for design, source in enumerate(sources):
+            specs.append(compile_to_spec(source))
+        # the sheet is drawn at one level of detail: the lowest any design needs to fit the budget
+        sheet_opts = opts
+        for design, spec in enumerate(specs):
+            sheet_opts = render_budget.apply(spec, sheet_opts)[1]
+        fitted = []
+        for design, spec in enumerate(specs):
+            fitted.append(render_budget.apply(spec, sheet_opts))
+        downgraded = sheet_opts.lod != opts.lod or any(down for *_, down in fitted)
+        with render_slot(), profiling.timed("render"):
+            svg = render_sheet([spec for spec, *_ in fitted], sheet_opts, columns=columns)
+        extra = {"downgraded": True} if downgraded else {}
+        entry = CachedResponse.from_body(json.dumps({"ok": True, "svg": svg, **extra}).encode("utf-8"))
+        render_cache.put(key, entry, size=len(entry.body))
+        return _cached_response(entry, "MISS")
+    except RenderBusy as e:
+        metrics.inc("jersey_errors_total", type=_error_type(e))
+        return _busy_response(e)
+    except OverBudget as e:
+        metrics.inc("jersey_errors_total", type=_error_type(e))
+        return jsonify({"ok": False, "error": f"Over budget: {e}", "design": design}), 422
+    except SemanticError as e:
+        return jsonify({"ok": False, "error": f"Semantic error: {e}", "design": design}), 400
+    except SyntaxError as e:
+        return jsonify({"ok": False, "error": f"Syntax error: {e}", "design": design}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"Internal error: {e}"}), 500
+
+def _permalink_response(jersey_text: str):
+    """
+    Compile (no render needed) and return the permalink code for a design.
+    """
     try:
-        svg = compile_and_render(jersey_text)
-        return jsonify({"ok": True, "svg": svg})
+        code = encode_spec(compile_to_spec(jersey_text))
     except SemanticError as e:
         return jsonify({"ok": False, "error": f"Semantic error: {e}"}), 400
     except SyntaxError as e:
         return jsonify({"ok": False, "error": f"Syntax error: {e}"}), 400
+    except CodecError as e:
+        return jsonify({"ok": False, "error": f"Cannot encode design: {e}"}), 400
     except Exception as e:
         return jsonify({"ok": False, "error": f"Internal error: {e}"}), 500
+    return jsonify({"ok": True, "code": code, "url": f"/j/{code}.svg"})
+
+def _validate_ai_json(ai_json: dict):
+    """
+    Raise if the AI JSON does not make it through JSON -> DSL -> semantic checks.
+    """
+    compile_to_spec(jersey_json_to_dsl(ai_json), from_ai=True)
+
+def _is_transient_ai_error(e: Exception) -> bool:
+    """
+    Errors worth retrying: timeouts, connection problems, rate limits, 5xx.
+    """
+    return isinstance(e, (
+        groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError,
+        TimeoutError, ConnectionError,
+    ))
+
+ai_breaker = CircuitBreaker(
+    failure_threshold=app.config["AI_BREAKER_THRESHOLD"],
+    reset_timeout=app.config["AI_BREAKER_RESET"],
+)
+# deadline + retry with jitter + circuit breaker around the raw upstream call
+ai_upstream = ResilientCall(
+    lambda prompt, timeout: real_ai_suggest_jersey(message=prompt, timeout=timeout),
+    breaker=ai_breaker,
+    is_transient=_is_transient_ai_error,
+    attempts=app.config["AI_ATTEMPTS"],
+    attempt_timeout=app.config["AI_CALL_TIMEOUT"],
+    deadline=app.config["AI_DEADLINE"],
+)
+
+# validated AI JSON keyed by normalized prompt; identical in-flight prompts share one upstream call
+ai_suggester = AISuggester(
+    fetch=ai_upstream,
+    cache=LRUCache(app.config["AI_CACHE_MAX_BYTES"], ttl=app.config["AI_CACHE_TTL"]),
+    validate=_validate_ai_json,
+)
+
+def _svg_response(entry):
+    """
+    Serve a stored SVG entry: 304 on a matching ETag, otherwise the smallest
+    precompressed variant the client accepts, cacheable forever.
+    """
+    if request.if_none_match and request.if_none_match.contains_weak(entry.digest):
+        resp = app.response_class(status=304)
+    else:
+        body, encoding = SvgStore.choose(entry, request.accept_encodings.quality)
+        resp = app.response_class(body, mimetype="image/svg+xml")
+        if encoding:
+            resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(entry.digest)
+    resp.headers["Cache-Control"] = SVG_IMMUTABLE_CACHE_CONTROL
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+@app.get("/svg/<digest>.svg")
+def get_svg(digest: str):
+    """
+    Serve a stored SVG by content hash, precompressed and cacheable forever.
+    """
+    entry = svg_store.get(digest)
+    if entry is None:
+        return jsonify({"ok": False, "error": "Unknown or expired SVG"}), 404
+    return _svg_response(entry)
+
+@app.get("/j/<code>.svg")
+def get_permalink(code: str):
+    """
+    Render a design straight from its permalink code; no database involved.
+    ?lod=preview|thumbnail renders with less detail, e.g. for <img> tags in a gallery;
+    ?view=front|back renders one side only.
+    """
+    try:
+        opts, variant = render_options(request.args)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    digest = permalink_cache.get(variant + code)
+    entry = svg_store.get(digest) if digest else None
+    if entry is None:
+        try:
+            svg, _ = render_within_budget(decode_spec(code), opts)
+        except (CodecError, SemanticError) as e:
+            return jsonify({"ok": False, "error": f"Invalid permalink: {e}"}), 404
+        except RenderBusy as e:
+            return _busy_response(e)
+        except OverBudget as e:
+            return jsonify({"ok": False, "error": f"Over budget: {e}"}), 422
+        entry = svg_store.put(svg)
+        permalink_cache.put(variant + code, entry.digest, size=len(variant) + len(code) + len(entry.digest))
+    return _svg_response(entry)
+
+def _caches() -> dict:
+    return {"render": render_cache, "permalink": permalink_cache, "svg_store": svg_store, "ai": ai_suggester.cache}
+
+def _cache_samples():
+    for name, cache in _caches().items():
+        st = cache.stats()
+        lookups = st["hits"] + st["misses"]
+        yield (("cache", name),), st["hits"] / lookups if lookups else 0.0
+
+def _cache_bytes():
+    for name, cache in _caches().items():
+        yield (("cache", name),), cache.stats()["bytes"]
+
+metrics.gauge("jersey_cache_hit_ratio", "Hit ratio of each in-memory cache since start.", _cache_samples)
+metrics.gauge("jersey_cache_bytes", "Bytes held by each in-memory cache.", _cache_bytes)
+metrics.gauge("ai_breaker_open", "1 while the AI circuit breaker is open.", lambda: [((), 1.0 if ai_breaker.retry_after() > 0 else 0.0)])
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+    # opt-in memory profile of this request (X-Debug-Memory: 1), only where enabled
+    memory = app.config["DEBUG_MEMORY_PROFILE"] and request.headers.get("X-Debug-Memory") == "1"
+    g.stage_timings, g.stage_token = profiling.start(memory=memory)
+
+@app.after_request
+def _record_request(resp):
+    started = g.get("request_started")
+    if started is None:
+        return resp
+    elapsed = time.perf_counter() - started
+    profiling.stop(g.stage_timings, g.stage_token)
+    if isinstance(g.stage_timings, profiling.MemoryProfile):
+        resp.headers["X-Memory-Profile"] = g.stage_timings.header()
+    stages = g.stage_timings.totals()
+    for name, seconds in stages.items():
+        metrics.observe("jersey_stage_seconds", seconds, stage=name)
+    metrics.observe(
+        "http_request_seconds", elapsed,
+        endpoint=request.endpoint or "unknown", status=str(resp.status_code),
+    )
+    # per-stage timings for browser devtools (Network > Timing)
+    timing = g.stage_timings.server_timing()
+    resp.headers["Server-Timing"] = (timing + ", " if timing else "") + f"total;dur={elapsed * 1000:.3f}"
+    return resp
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.get("/")
 def index():
     return app.send_static_file("index.html")
 
+def _ai_payload(ai_json: dict, ai_cache_status: str, degraded: str | None = None) -> tuple[dict, int, dict]:
+    """
+    Turn AI JSON into the endpoint payload: AI JSON -> DSL -> SVG.
+    Returns (payload, http_status, extra_headers).
+    """
+    dsl_code = jersey_json_to_dsl(ai_json)
+
+    try:
+        svg_xml = compile_dsl_to_svg(dsl_code)
+    except Exception as e:
+        return {
+            "ok": False,
+            "error": "Failed to compile DSL to SVG",
+            "details": str(e),
+            "dsl": dsl_code,
+        }, 400, {}
+
+    payload = {
+        "ok": True,
+        "spec": ai_json,
+        "dsl": dsl_code,
+        "svg": svg_xml,
+        "approximationNote": ai_json.get("approximationNote", ""),
+    }
+    headers = {"X-AI-Cache": ai_cache_status}
+    if degraded:
+        payload["degraded"] = True
+        payload["degradedReason"] = degraded
+        headers["X-AI-Degraded"] = "1"
+    return payload, 200, headers
+
+def _ai_fallback(prompt: str, reason: str) -> tuple[dict, int, dict]:
+    """
+    Upstream unavailable: serve a similar cached design, else the built-in sample.
+    """
+    ai_json = ai_suggester.nearest(prompt)
+    if ai_json is not None:
+        return _ai_payload(ai_json, "NEAREST", degraded=reason)
+    return _ai_payload(fake_ai_suggest_jersey(message=prompt, image_path=None), "FALLBACK", degraded=reason)
+
+def _ai_generate(prompt: str) -> tuple[dict, int, dict]:
+    """
+    Run the whole AI flow for one prompt: AI JSON -> DSL -> SVG.
+    Returns (payload, http_status, extra_headers); shared by the sync endpoint and AI jobs.
+    """
+    try:
+        ai_json, ai_cache_status = ai_suggester.suggest(prompt)
+    except (CircuitOpen, RetriesExhausted) as e:
+        return _ai_fallback(prompt, str(e))
+    except Exception as e:
+        return {"ok": False, "error": f"AI failed: {e}"}, 500, {}
+    return _ai_payload(ai_json, ai_cache_status)
+
+# fields that fully determine the look of the kit apart from text
+AI_PREVIEW_FIELDS = ("primary", "secondary", "tertiary", "pattern_color", "pattern")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _ai_stream_events(prompt: str):
+    """
+    Server-Sent Events for one streamed AI generation:
+    `delta` (raw model output), one `preview` as soon as colours + pattern are
+    parsed, then `final` (same payload as the JSON endpoint) or `error`.
+    """
+    cached = ai_suggester.cache.get(normalize_prompt(prompt))
+    if cached is not None:
+        yield _sse("final", _ai_payload(cached, "HIT")[0])
+        return
+    if not ai_breaker.allow():
+        yield _sse("final", _ai_fallback(prompt, "AI upstream unavailable (circuit open)")[0])
+        return
+
+    parser = IncrementalJSONObject()
+    preview_sent = False
+    settled = False  # the breaker has been told how the upstream call went
+    deadline = time.monotonic() + app.config["AI_DEADLINE"]
+    t0 = time.perf_counter()
+    upstream = real_ai_stream_jersey(prompt, timeout=app.config["AI_CALL_TIMEOUT"])
+    try:
+        try:
+            for delta in upstream:
+                yield _sse("delta", {"text": delta})
+                parser.feed(delta)
+                if not preview_sent and all(k in parser.fields for k in AI_PREVIEW_FIELDS):
+                    preview_sent = True
+                    preview = {k: parser.fields[k] for k in AI_PREVIEW_FIELDS}
+                    try:
+                        dsl_code = jersey_json_to_dsl(preview)
+                        yield _sse("preview", {"svg": compile_dsl_to_svg(dsl_code), "dsl": dsl_code, "spec": preview})
+                    except Exception:
+                        pass  # a broken partial design just means no early preview
+                if time.monotonic() > deadline:
+                    raise TimeoutError("AI stream exceeded its deadline")
+        except Exception as e:
+            metrics.observe("ai_call_seconds", time.perf_counter() - t0, mode="stream", outcome="error")
+            settled = True
+            # like ResilientCall: only an unreachable upstream counts towards opening the breaker
+            if _is_transient_ai_error(e):
+                ai_breaker.record_failure()
+                yield _sse("final", _ai_fallback(prompt, f"AI upstream failed: {e}")[0])
+            else:
+                ai_breaker.release()
+                yield _sse("error", {"ok": False, "error": f"AI failed: {e}"})
+            return
+        settled = True
+        ai_breaker.record_success()
+        metrics.observe("ai_call_seconds", time.perf_counter() - t0, mode="stream", outcome="ok")
+    finally:
+        upstream.close()
+        if not settled:
+            # the client went away mid-reply (GeneratorExit): the call did not complete,
+            # and a half-open trial must not stay in flight forever
+            metrics.observe("ai_call_seconds", time.perf_counter() - t0, mode="stream", outcome="aborted")
+            ai_breaker.record_failure()
+
+    if not parser.done:
+        metrics.inc("jersey_errors_total", type="ai_invalid")
+        yield _sse("error", {"ok": False, "error": "AI reply was not a complete JSON object"})
+        return
+    ai_suggester.remember(prompt, parser.fields)
+    yield _sse("final", _ai_payload(parser.fields, "MISS")[0])
+
 @app.route("/api/ai/chat-jersey", methods=["POST"])
 def ai_chat_jersey():
     """
     Use the AI model to suggest a jersey design based on the prompt.
+    With {"stream": true} the reply is a text/event-stream of progress events.
     """
     data = request.get_json(force=True, silent=True) or {}
 
@@ -450,32 +1085,145 @@ def ai_chat_jersey():
     if not prompt:
         return jsonify(ok=False, error="Missing prompt"), 400
 
-    try:
-        ai_json = real_ai_suggest_jersey(message=prompt)
-    except Exception as e:
-        # fallback
-        # ai_json = fake_ai_suggest_jersey(message=prompt, image_path=None)
-        return jsonify(ok=False, error=f"AI failed: {e}"), 500
+    if data.get("stream"):
+        return Response(
+            stream_with_context(_ai_stream_events(prompt)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-    dsl_code = jersey_json_to_dsl(ai_json)
+    payload, status, headers = _ai_generate(prompt)
+    resp = jsonify(payload)
+    resp.headers.update(headers)
+    return resp, status
 
-    try:
-        svg_xml = compile_dsl_to_svg(dsl_code)
-    except Exception as e:
-        return jsonify(
-            ok=False,
-            error="Failed to compile DSL to SVG",
-            details=str(e),
-            dsl=dsl_code,
-        ), 400
+def _ai_job(prompt: str) -> dict:
+    payload, _, _ = _ai_generate(prompt)
+    return payload
 
+@app.post("/api/ai/jobs")
+def ai_job_submit():
+    """
+    Queue an AI jersey generation and return its job id right away (202).
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    prompt = (data.get("prompt") or "").strip()
+    if not prompt:
+        return jsonify(ok=False, error="Missing prompt"), 400
+    try:
+        job = ai_jobs.submit(_ai_job, prompt)
+    except QueueFull as e:
+        resp = jsonify(ok=False, error=str(e))
+        resp.headers["Retry-After"] = str(app.config["AI_JOB_RETRY_AFTER"])
+        return resp, 503
+    return jsonify(ok=True, url=f"/api/ai/jobs/{job.id}", **job.to_dict()), 202
+
+def _unknown_job(job_id: str):
+    """
+    404 for a job this process never saw; 421 for one another server process issued,
+    since jobs live in process memory and need a single worker (or sticky sessions).
+    """
+    if ai_jobs.owns(job_id) or job_id.count("-") != 2:
+        return jsonify(ok=False, error="Unknown job"), 404
     return jsonify(
-        ok=True,
-        spec=ai_json,
-        dsl=dsl_code,
-        svg=svg_xml,
-        approximationNote=ai_json.get("approximationNote", ""),
+        ok=False,
+        error="Job belongs to another server process; AI jobs need a single worker or sticky sessions",
+    ), 421
+
+@app.get("/api/ai/jobs/<job_id>")
+def ai_job_status(job_id: str):
+    """
+    Poll a job. Answers right away; ?wait=<seconds> waits for the job to finish, but
+    at most AI_JOB_MAX_WAIT (default 1 s) so a poll never holds a worker for an AI call.
+    """
+    try:
+        wait = min(max(float(request.args.get("wait", 0)), 0.0), app.config["AI_JOB_MAX_WAIT"])
+    except ValueError:
+        wait = 0.0
+    job = ai_jobs.wait(job_id, wait)
+    if job is None:
+        return _unknown_job(job_id)
+    return jsonify(ok=True, **job.to_dict())
+
+@app.delete("/api/ai/jobs/<job_id>")
+def ai_job_cancel(job_id: str):
+    """
+    Cancel a queued or running job.
+    """
+    job = ai_jobs.cancel(job_id)
+    if job is None:
+        return _unknown_job(job_id)
+    return jsonify(ok=True, **job.to_dict())
+
+# --- live preview channel ---
+# editor sessions keep their own incremental compile state; edits are coalesced
+# server-side and only the layers that changed are pushed back
+live_sessions = LiveSessions(
+    max_sessions=app.config["LIVE_MAX_SESSIONS"],
+    idle_ttl=app.config["LIVE_IDLE_TTL"],
+    budget=render_budget,
+    slot=render_slot,
+    busy=(RenderBusy,),
+    retry_after=app.config["RENDER_RETRY_AFTER"],
+)
+
+def _render_error_message(e: Exception) -> str:
+    if isinstance(e, LexerError):
+        return f"Lexer error: {e}"
+    if isinstance(e, OverBudget):
+        return f"Over budget: {e}"
+    if isinstance(e, RenderBusy):
+        return f"Server busy: {e}"
+    if isinstance(e, SemanticError):
+        return f"Semantic error: {e}"
+    if isinstance(e, SyntaxError):
+        return f"Syntax error: {e}"
+    return f"Internal error: {e}"
+
+def _live_session(session_id: str):
+    """
+    (session, None), or (None, error response) for a malformed id or a full registry.
+    """
+    try:
+        session = live_sessions.get(session_id)
+    except SessionsFull as e:
+        resp = jsonify(ok=False, error=f"Too many live sessions: {e}")
+        resp.headers["Retry-After"] = str(app.config["RENDER_RETRY_AFTER"])
+        return None, (resp, 503)
+    if session is None:
+        return None, (jsonify(ok=False, error="Invalid session id"), 400)
+    return session, None
+
+@app.get("/api/live/<session_id>/events")
+def live_events(session_id: str):
+    """
+    Server-Sent Events for a live editor session: `full`, `patch` (changed layers only) or `error`.
+    """
+    session, error = _live_session(session_id)
+    if error is not None:
+        return error
+    events = session.events(_render_error_message, debounce=app.config["LIVE_DEBOUNCE_MS"] / 1000)
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+@app.post("/api/live/<session_id>/edit")
+def live_edit(session_id: str):
+    """
+    Post the editor's current source for a live session. The result arrives on the event stream.
+    """
+    session, error = _live_session(session_id)
+    if error is not None:
+        return error
+    data = request.get_json(silent=True) or {}
+    try:
+        seq = int(data.get("seq", 0))
+    except (TypeError, ValueError):
+        return jsonify(ok=False, error="Invalid seq"), 400
+    accepted = session.submit(seq, data.get("source", ""))
+    return jsonify(ok=True, accepted=accepted), 202
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
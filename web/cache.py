@@ -0,0 +1,211 @@
+# web/cache.py
+import gzip
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+try:  # optional: brotli gives the smallest payloads, zlib/deflate is the fallback
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def normalize_source(text: str) -> str:
+    """
+    Normalize DSL text so that cosmetic differences (line endings, trailing
+    whitespace, leading/trailing blank lines) map to the same cache key.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def source_key(text: str) -> str:
+    """
+    Hash of the normalized source, used as the render cache key.
+    """
+    return hashlib.sha256(normalize_source(text).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by a memory budget in bytes.
+    Each entry is charged `size` bytes (or sizeof(value) when no size is given);
+    the least recently used entries are evicted until the total fits the budget.
+    With `ttl` (seconds), entries also expire that long after they were stored.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = len, ttl: float | None = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._data: "OrderedDict[Hashable, tuple[Any, int, float | None]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value (marking it most recently used), or `default`.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[2] is not None and item[2] <= time.monotonic():
+                del self._data[key]
+                self._bytes -= item[1]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int | None = None):
+        """
+        Insert or replace an entry, evicting old entries to stay within budget.
+        Values bigger than the whole budget are not cached.
+        """
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            expires = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._data[key] = (value, size, expires)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Membership test that does not touch LRU order or hit/miss counters.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (item[2] is None or item[2] > time.monotonic())
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """
+        Snapshot of live (unexpired) entries, without touching LRU order or counters.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v) for k, (v, _, exp) in self._data.items() if exp is None or exp > now]
+
+    def stats(self) -> dict:
+        """
+        Snapshot of counters, for headers and debugging.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str  # strong validator: hash of the exact body bytes
+
+    @staticmethod
+    def from_body(body: bytes) -> "CachedResponse":
+        return CachedResponse(body=body, etag=hashlib.sha256(body).hexdigest()[:32])
+
+
+@dataclass(frozen=True)
+class StoredSvg:
+    digest: str
+    raw: bytes
+    gzip: bytes
+    alt: bytes          # brotli if available, otherwise zlib ("deflate")
+    alt_encoding: str   # "br" | "deflate"
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + len(self.gzip) + len(self.alt)
+
+
+class SvgStore:
+    """
+    Content-addressed store of rendered SVG documents.
+    Every document is compressed once when it is stored (gzip + brotli or deflate),
+    so serving it later is just picking the right byte string.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._cache = LRUCache(max_bytes)
+
+    @staticmethod
+    def digest_of(raw: bytes) -> str:
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def put(self, svg: str) -> StoredSvg:
+        """
+        Store an SVG document and return its entry (existing entries are reused).
+        """
+        raw = svg.encode("utf-8")
+        digest = self.digest_of(raw)
+        existing = self._cache.get(digest)
+        if existing is not None:
+            return existing
+        if brotli is not None:
+            alt, alt_encoding = brotli.compress(raw, quality=11), "br"
+        else:
+            alt, alt_encoding = zlib.compress(raw, 9), "deflate"
+        entry = StoredSvg(
+            digest=digest,
+            raw=raw,
+            gzip=gzip.compress(raw, compresslevel=9, mtime=0),
+            alt=alt,
+            alt_encoding=alt_encoding,
+        )
+        self._cache.put(digest, entry, size=entry.size)
+        return entry
+
+    def get(self, digest: str) -> StoredSvg | None:
+        return self._cache.get(digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._cache
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    @staticmethod
+    def choose(entry: StoredSvg, accept_quality: Callable[[str], float]) -> tuple[bytes, str | None]:
+        """
+        Pick the smallest variant the client accepts.
+        `accept_quality(encoding)` returns the client's q-value for an encoding (0 = not accepted).
+        """
+        if entry.alt_encoding == "br" and accept_quality("br") > 0:
+            return entry.alt, "br"
+        if accept_quality("gzip") > 0:
+            return entry.gzip, "gzip"
+        if entry.alt_encoding == "deflate" and accept_quality("deflate") > 0:
+            return entry.alt, "deflate"
+        return entry.raw, None
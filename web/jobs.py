@@ -0,0 +1,147 @@
+# web/jobs.py
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+class QueueFull(Exception):
+    pass
+
+@dataclass
+class Job:
+    id: str
+    fn: Callable[..., Any]
+    args: tuple
+    status: str = QUEUED
+    result: Any = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def to_dict(self) -> dict:
+        """
+        Public view of the job for API responses.
+        """
+        out = {"jobId": self.id, "status": self.status}
+        if self.status == DONE:
+            out["result"] = self.result
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class JobQueue:
+    """
+    In-process job system: a bounded queue in front of a fixed pool of worker threads.
+
+    - submit() raises QueueFull once `max_depth` jobs are waiting, so slow work
+      can never pile up unbounded behind the web workers
+    - queued jobs can be cancelled; a running job that is cancelled finishes in
+      the background but its result is dropped
+    - finished jobs are kept (oldest dropped first) so clients can still poll them
+    """
+
+    def __init__(self, workers: int = 2, max_depth: int = 16, keep_finished: int = 256):
+        # jobs live in this process only; the prefix tells our ids from another worker's
+        self.instance = uuid.uuid4().hex[:8]
+        self.max_depth = max(1, max_depth)
+        self.keep_finished = max(1, keep_finished)
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._seq = itertools.count(1)
+        self._threads = []
+        for i in range(max(1, workers)):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # --- public API ---
+    def submit(self, fn: Callable[..., Any], *args) -> Job:
+        """
+        Queue fn(*args) and return its Job right away.
+        """
+        with self._lock:
+            if self._waiting >= self.max_depth:
+                raise QueueFull(f"job queue is full ({self.max_depth} waiting)")
+            job = Job(id=f"{self.instance}-{next(self._seq):x}-{uuid.uuid4().hex[:12]}", fn=fn, args=args)
+            self._jobs[job.id] = job
+            self._waiting += 1
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def owns(self, job_id: str) -> bool:
+        """
+        Whether `job_id` was issued by this queue (known or not), as opposed to another process.
+        """
+        return job_id.startswith(self.instance + "-")
+
+    def wait(self, job_id: str, timeout: float) -> Job | None:
+        """
+        Block up to `timeout` seconds for the job to finish (long-polling), then return it.
+        """
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancel a job that has not finished yet. Returns the job, or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            if job.status == QUEUED:
+                self._waiting -= 1
+            self._finish(job, CANCELLED)
+            return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j.status == RUNNING)
+            return {"queued": self._waiting, "running": running, "max_depth": self.max_depth}
+
+    # --- internals ---
+    def _finish(self, job: Job, status: str, result: Any = None, error: str | None = None):
+        # caller holds self._lock
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.time()
+        job.done.set()
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        for old in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[old.id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if job.status != QUEUED:  # cancelled while waiting
+                    continue
+                self._waiting -= 1
+                job.status = RUNNING
+                job.started = time.time()
+            try:
+                result, error, status = job.fn(*job.args), None, DONE
+            except Exception as e:
+                result, error, status = None, str(e), FAILED
+            with self._lock:
+                if job.status == RUNNING:
+                    self._finish(job, status, result, error)
@@ -0,0 +1,223 @@
+# web/live.py
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, Iterator
+
+from src.incremental import IncrementalCompiler
+from src.interpreter.cost import RenderBudget
+from src.interpreter.svg import diff_layers, layer_markup
+
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class LiveSession:
+    """
+    Compile state for one editor session of the playground.
+
+    Edits are posted with a sequence number; only the newest pending edit is kept,
+    so a burst of keystrokes turns into a single compile. The session owns an
+    IncrementalCompiler (last tokens, statements and pattern layer) and remembers
+    the layer hashes the connected client already has, so each push carries only
+    the layers that changed.
+
+    Compiles run inside `slot()` (the server's render concurrency limit); when it
+    raises one of `busy`, the client gets an `error` event with `retry_after` and
+    the edit is retried after that many seconds.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        budget: RenderBudget | None = None,
+        slot: Callable[[], ContextManager] = nullcontext,
+        busy: tuple[type[Exception], ...] = (),
+        retry_after: float = 1.0,
+    ):
+        self.id = session_id
+        self.compiler = IncrementalCompiler(budget=budget)
+        self.slot = slot
+        self.busy = busy
+        self.retry_after = retry_after
+        self.cond = threading.Condition()
+        self.pending: tuple[int, str] | None = None
+        self.latest_seq = -1
+        self.last_seen = time.monotonic()
+        self.svg: str | None = None
+        self.seq = -1
+        self.layers: Dict[str, str] = {}  # layer name -> hash of the last pushed build
+        self._subscriber: object | None = None
+
+    def submit(self, seq: int, source: str) -> bool:
+        """
+        Queue an edit. Edits older than one already seen are ignored.
+        """
+        with self.cond:
+            self.last_seen = time.monotonic()
+            if seq <= self.latest_seq:
+                return False
+            self.latest_seq = seq
+            self.pending = (seq, source)
+            self.cond.notify_all()
+            return True
+
+    @property
+    def subscribed(self) -> bool:
+        return self._subscriber is not None
+
+    def events(
+        self,
+        format_error: Callable[[Exception], str],
+        debounce: float = 0.03,
+        keepalive: float = 15.0,
+        max_stale: float = 0.5,
+    ) -> Iterator[str]:
+        """
+        SSE stream for the session's client: `full` (whole SVG) when the client has
+        nothing yet, then `patch` events with only the changed layers, or `error`.
+        A newer connection for the same session takes over and ends this one.
+        """
+        token = object()
+        with self.cond:
+            self._subscriber = token
+            self.cond.notify_all()
+        try:
+            yield from self._stream(token, format_error, debounce, keepalive, max_stale)
+        finally:
+            with self.cond:
+                if self._subscriber is token:
+                    self._subscriber = None
+                    self.last_seen = time.monotonic()
+
+    def _stream(
+        self,
+        token: object,
+        format_error: Callable[[Exception], str],
+        debounce: float,
+        keepalive: float,
+        max_stale: float,
+    ) -> Iterator[str]:
+        sent: Dict[str, str] = {}
+        if self.svg is not None:  # reconnect: replay current state
+            yield _sse("full", {"seq": self.seq, "svg": self.svg})
+            sent = dict(self.layers)
+        last_push = time.monotonic()
+
+        while True:
+            with self.cond:
+                if self.pending is None and self._subscriber is token:
+                    self.cond.wait(timeout=keepalive)
+                if self._subscriber is not token:
+                    return
+                has_edit = self.pending is not None
+                self.last_seen = time.monotonic()  # a connected client counts as activity
+            if not has_edit:
+                yield ": keepalive\n\n"
+                continue
+
+            time.sleep(debounce)  # let the rest of a keystroke burst arrive
+            with self.cond:
+                if self.pending is None:
+                    continue
+                seq, source = self.pending
+                self.pending = None
+                self.last_seen = time.monotonic()
+
+            try:
+                with self.slot():
+                    result = self.compiler.build(source)
+            except self.busy as e:
+                with self.cond:
+                    if self.pending is None:
+                        self.pending = (seq, source)  # try again once a slot is free
+                yield _sse("error", {"seq": seq, "error": format_error(e), "retry_after": self.retry_after})
+                time.sleep(self.retry_after)
+                continue
+            except Exception as e:
+                yield _sse("error", {"seq": seq, "error": format_error(e)})
+                continue
+
+            with self.cond:
+                superseded = self.pending is not None
+            # a newer edit arrived while compiling: drop this result, unless the
+            # client would otherwise see nothing for too long
+            if superseded and time.monotonic() - last_push < max_stale:
+                continue
+
+            hashes = {layer.name: layer.hash for layer in result.layers}
+            self.svg, self.seq, self.layers = result.svg, seq, hashes
+            if not sent:
+                yield _sse("full", {"seq": seq, "svg": result.svg})
+            else:
+                changed = {layer.name: layer_markup(layer) for layer in diff_layers(result.layers, sent)}
+                yield _sse("patch", {"seq": seq, "layers": changed})
+            sent = hashes
+            last_push = time.monotonic()
+
+
+class SessionsFull(Exception):
+    pass
+
+
+class LiveSessions:
+    """
+    Registry of live sessions, capped in number and expired after `idle_ttl` seconds.
+    A session with a connected event stream is never expired or evicted; when every
+    session is connected and the cap is reached, new sessions are refused.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        idle_ttl: float = 600.0,
+        budget: RenderBudget | None = None,
+        slot: Callable[[], ContextManager] = nullcontext,
+        busy: tuple[type[Exception], ...] = (),
+        retry_after: float = 1.0,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.budget = budget
+        self.slot = slot
+        self.busy = busy
+        self.retry_after = retry_after
+        self._sessions: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> LiveSession | None:
+        """
+        Return the session (creating it if needed), or None for a malformed id.
+        Raises SessionsFull when a new session is needed but none can be evicted.
+        """
+        if not SESSION_ID_RE.match(session_id):
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for sid in [
+                s for s, sess in self._sessions.items()
+                if not sess.subscribed and now - sess.last_seen > self.idle_ttl
+            ]:
+                del self._sessions[sid]
+            session = self._sessions.get(session_id)
+            if session is None:
+                if len(self._sessions) >= self.max_sessions:
+                    # least recently used first; connected sessions stay
+                    idle = next((s for s, sess in self._sessions.items() if not sess.subscribed), None)
+                    if idle is None:
+                        raise SessionsFull(f"{len(self._sessions)} live sessions connected")
+                    del self._sessions[idle]
+                session = LiveSession(session_id, self.budget, self.slot, self.busy, self.retry_after)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,156 @@
+# web/metrics.py
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, Tuple
+
+# A small Prometheus-compatible metrics registry (text exposition format 0.0.4).
+#
+# Writes are lock-free: every thread records into its own shard, so the hot path
+# is a thread-local lookup plus a dict update. The registry lock is only taken when
+# a thread records its first sample and when /metrics is scraped (which sums shards).
+# Shards of finished threads are folded into one, so thread-per-request servers
+# do not grow the registry.
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# seconds; covers sub-millisecond lexing up to multi-second AI calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# bytes; a plain kit is ~40 KB, dense patterns reach tens of MB
+BYTES_BUCKETS = (16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+
+
+class _Shard:
+    __slots__ = ("counters", "hists")
+
+    def __init__(self):
+        self.counters: Dict[tuple, float] = {}
+        self.hists: Dict[tuple, list] = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def merge(self, other: "_Shard"):
+        for key, v in dict(other.counters).items():
+            self.counters[key] = self.counters.get(key, 0.0) + v
+        for key, h in dict(other.hists).items():
+            acc = self.hists.get(key)
+            if acc is None:
+                self.hists[key] = list(h)
+            else:
+                for i, v in enumerate(h):
+                    acc[i] += v
+
+
+class Metrics:
+    """
+    Counters and histograms, plus gauges computed at scrape time from callbacks.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[Tuple[threading.Thread, _Shard]] = []
+        self._retired = _Shard()  # samples of threads that have exited
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}                   # name -> (type, help)
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._gauges: Dict[str, Callable[[], Iterable[Tuple[Labels, float]]]] = {}
+
+    # --- declaration ---
+    def counter(self, name: str, help: str):
+        self._meta[name] = ("counter", help)
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._meta[name] = ("histogram", help)
+        self._buckets[name] = tuple(sorted(buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Iterable[Tuple[Labels, float]]]):
+        """
+        A gauge whose samples `fn()` yields as (labels, value) when scraped.
+        """
+        self._meta[name] = ("gauge", help)
+        self._gauges[name] = fn
+
+    # --- hot path ---
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                if len(self._shards) >= 64:
+                    self._fold_dead()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_dead(self):
+        # caller holds self._lock
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        hists = self._shard().hists
+        h = hists.get(key)
+        if h is None:
+            h = hists[key] = [0] * (len(self._buckets[name]) + 1) + [0.0]
+        h[bisect.bisect_left(self._buckets[name], value)] += 1
+        h[-1] += value
+
+    # --- exposition ---
+    def _collect(self) -> Tuple[Dict[tuple, float], Dict[tuple, list]]:
+        total = _Shard()
+        with self._lock:
+            self._fold_dead()
+            total.merge(self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            total.merge(shard)
+        return total.counters, total.hists
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text format.
+        """
+        counters, hists = self._collect()
+        out: list[str] = []
+        for name, (kind, help) in sorted(self._meta.items()):
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (n, labels), v in sorted(counters.items()):
+                    if n == name:
+                        out.append(f"{name}{_fmt_labels(labels)} {_num(v)}")
+            elif kind == "histogram":
+                bounds = self._buckets[name]
+                for (n, labels), h in sorted(hists.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(bounds + (float("inf"),), h[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _num(bound)
+                        out.append(f"{name}_bucket{_fmt_labels(labels + (('le', le),))} {cumulative}")
+                    out.append(f"{name}_sum{_fmt_labels(labels)} {_num(h[-1])}")
+                    out.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+            else:
+                for labels, v in self._gauges[name]():
+                    out.append(f"{name}{_fmt_labels(tuple(labels))} {_num(v)}")
+        return "\n".join(out) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
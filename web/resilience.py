@@ -0,0 +1,148 @@
+# web/resilience.py
+import random
+import threading
+import time
+from typing import Any, Callable
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpen(Exception):
+    pass
+
+class RetriesExhausted(Exception):
+    """
+    Raised when every attempt failed with a transient error (or the deadline ran out).
+    The last underlying error is kept in __cause__.
+    """
+    pass
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+    - closed: calls go through; `failure_threshold` consecutive failures open it
+    - open: calls are rejected until `reset_timeout` seconds have passed
+    - half-open: one trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go upstream right now.
+        """
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        End a call that says nothing about upstream health (bad model output, an
+        aborted caller): frees the half-open trial slot without changing the state.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """
+        Seconds until the breaker will let a trial call through (0 if not open).
+        """
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+
+class ResilientCall:
+    """
+    Wraps an upstream call `fn(*args, timeout=seconds)` with:
+    - a per-attempt timeout, capped by an overall deadline
+    - retries with full jitter for errors `is_transient(e)` accepts
+    - a circuit breaker that fails fast (CircuitOpen) after repeated failures
+    The breaker counts one failure per call whose retries all failed; non-transient
+    errors (e.g. the model returning invalid JSON) are raised as-is and not counted.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        breaker: CircuitBreaker,
+        is_transient: Callable[[Exception], bool],
+        attempts: int = 3,
+        attempt_timeout: float = 10.0,
+        deadline: float = 20.0,
+        base_delay: float = 0.25,
+        max_delay: float = 2.0,
+        rng: random.Random | None = None,
+    ):
+        self.fn = fn
+        self.breaker = breaker
+        self.is_transient = is_transient
+        self.attempts = max(1, attempts)
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def __call__(self, *args) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpen(f"AI upstream unavailable, retry in {self.breaker.retry_after():.1f}s")
+        try:
+            result = self._attempts(*args)
+        except RetriesExhausted:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def _attempts(self, *args) -> Any:
+        end = time.monotonic() + self.deadline
+        last: Exception | None = None
+        for attempt in range(self.attempts):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return self.fn(*args, timeout=min(self.attempt_timeout, remaining))
+            except Exception as e:
+                if not self.is_transient(e):
+                    raise
+                last = e
+                if attempt + 1 < self.attempts:
+                    # full jitter: sleep U(0, min(max_delay, base * 2^attempt)), but never past the deadline
+                    backoff = self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                    time.sleep(max(0.0, min(backoff, end - time.monotonic())))
+        raise RetriesExhausted(f"AI upstream failed after retries: {last}") from last